@@ -1,3 +1,5 @@
+from ._core.bulk import insertActs, insertApps
+from ._core.field import findManyOverlappingFields, findOverlappingFields
 from ._core.generated import (  # getGeom,
     getAct,
     getApp,
@@ -5,6 +7,15 @@ from ._core.generated import (  # getGeom,
     getField,
     getFieldTrial,
     getGrouper,
+    getManyAct,
+    getManyApp,
+    getManyCropType,
+    getManyField,
+    getManyFieldTrial,
+    getManyGrouper,
+    getManyNutrientSource,
+    getManyOrganization,
+    getManyPlot,
     getMaybeActId,
     getMaybeAppId,
     getMaybeCropTypeId,
@@ -26,17 +37,45 @@ from ._core.generated import (  # getGeom,
     insertOrGetFieldTrial,
     insertOrGetGeoSpatialKey,
     insertOrGetGrouper,
+    insertOrGetManyAct,
+    insertOrGetManyApp,
+    insertOrGetManyCropType,
+    insertOrGetManyField,
+    insertOrGetManyFieldTrial,
+    insertOrGetManyGeoSpatialKey,
+    insertOrGetManyGrouper,
+    insertOrGetManyNutrientSource,
+    insertOrGetManyOrganization,
+    insertOrGetManyPlot,
+    insertOrGetManyTemporalKey,
     insertOrGetNutrientSource,
     insertOrGetOrganization,
     insertOrGetPlot,
     insertOrGetTemporalKey,
+    upsertAct,
+    upsertApp,
+    upsertCropType,
+    upsertField,
+    upsertFieldTrial,
+    upsertGrouper,
+    upsertNutrientSource,
 )
 from ._core.geom import (
+    canonical_geom_hash,
+    getGeoms,
     getMaybeGeom,
     getMaybeGeomId,
     insertOrGetGeom,
+    insertOrGetGeoms,
+    normalizedEwkbHex,
+    normalizeGeometries,
+)
+from ._core.grouper import (  # searchGrouper,
+    Grouper,
+    getGrouperAncestors,
+    getGrouperDescendants,
+    getGrouperSubtreeFieldCounts,
 )
-from ._core.grouper import Grouper  # searchGrouper,
 from ._core.st_types import (
     Geom,
     GeoSpatialKey,
@@ -55,6 +94,10 @@ from ._core.types import (  # ReportType,
     Plot,
 )
 from ._observation.generated import (
+    getManyObservation,
+    getManyObservationType,
+    getManyS3,
+    getManyUnitType,
     getMaybeObservationId,
     getMaybeObservationTypeId,
     getMaybeS3Id,
@@ -63,10 +106,15 @@ from ._observation.generated import (
     getObservationType,
     getS3,
     getUnitType,
+    insertOrGetManyObservation,
+    insertOrGetManyObservationType,
+    insertOrGetManyS3,
+    insertOrGetManyUnitType,
     insertOrGetObservation,
     insertOrGetObservationType,
     insertOrGetS3,
     insertOrGetUnitType,
+    upsertS3,
 )
 from ._observation.types import (
     S3,
@@ -79,80 +127,128 @@ __all__ = (
     # Organization
     "Organization",
     "getOrganization",
+    "getManyOrganization",
     "getMaybeOrganizationId",
     "insertOrGetOrganization",
+    "insertOrGetManyOrganization",
     # Grouper
     "Grouper",
     "getGrouper",
+    "getManyGrouper",
     "getMaybeGrouperId",
     "insertOrGetGrouper",
+    "insertOrGetManyGrouper",
+    "upsertGrouper",
+    "getGrouperAncestors",
+    "getGrouperDescendants",
+    "getGrouperSubtreeFieldCounts",
     # Field
     "Field",
     "getField",
+    "getManyField",
     "getMaybeFieldId",
     "insertOrGetField",
+    "findOverlappingFields",
+    "findManyOverlappingFields",
+    "insertOrGetManyField",
+    "upsertField",
     # FieldTrial
     "FieldTrial",
     "getFieldTrial",
+    "getManyFieldTrial",
     "getMaybeFieldTrialId",
     "insertOrGetFieldTrial",
+    "insertOrGetManyFieldTrial",
+    "upsertFieldTrial",
     # Plot
     "Plot",
     "getPlot",
+    "getManyPlot",
     "getMaybePlotId",
     "insertOrGetPlot",
+    "insertOrGetManyPlot",
     # CropType
     "CropType",
     "getCropType",
+    "getManyCropType",
     "getMaybeCropTypeId",
     "insertOrGetCropType",
+    "insertOrGetManyCropType",
+    "upsertCropType",
     # Act
     "Act",
     "getAct",
+    "getManyAct",
     "getMaybeActId",
     "insertOrGetAct",
+    "insertOrGetManyAct",
+    "insertActs",
+    "upsertAct",
     # App
     "App",
     "getApp",
+    "getManyApp",
     "getMaybeAppId",
     "insertOrGetApp",
+    "insertOrGetManyApp",
+    "insertApps",
+    "upsertApp",
     # Core spatiotemporal
     "GeoSpatialKey",
     "TemporalKey",
     "Key",
     "KeyIds",
     "insertOrGetGeoSpatialKey",
+    "insertOrGetManyGeoSpatialKey",
     "getMaybeGeoSpatialKeyId",
     "insertOrGetTemporalKey",
+    "insertOrGetManyTemporalKey",
     "getMaybeTemporalKeyId",
     # Geom
     "Geom",
     "getMaybeGeomId",
+    "getGeoms",
     "getMaybeGeom",
     "insertOrGetGeom",
+    "insertOrGetGeoms",
+    "canonical_geom_hash",
+    "normalizeGeometries",
+    "normalizedEwkbHex",
     # S3
     "S3",
     "getS3",
+    "getManyS3",
     "getMaybeS3Id",
     "insertOrGetS3",
+    "insertOrGetManyS3",
+    "upsertS3",
     # CropType
     "NutrientSource",
     "getNutrientSource",
+    "getManyNutrientSource",
     "getMaybeNutrientSourceId",
     "insertOrGetNutrientSource",
+    "insertOrGetManyNutrientSource",
+    "upsertNutrientSource",
     # Observation
     "Observation",
     "getObservation",
+    "getManyObservation",
     "getMaybeObservationId",
     "insertOrGetObservation",
+    "insertOrGetManyObservation",
     # ObservationType
     "ObservationType",
     "getObservationType",
+    "getManyObservationType",
     "getMaybeObservationTypeId",
     "insertOrGetObservationType",
+    "insertOrGetManyObservationType",
     # UnitType
     "UnitType",
     "getUnitType",
+    "getManyUnitType",
     "getMaybeUnitTypeId",
     "insertOrGetUnitType",
+    "insertOrGetManyUnitType",
 )
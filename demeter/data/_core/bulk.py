@@ -0,0 +1,384 @@
+"""Columnar bulk loading of Acts and Apps from DataFrames (e.g., a season of as-applied records)"""
+import io
+import json
+from typing import (
+    Any,
+    List,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+from psycopg2.sql import SQL, Identifier
+
+from demeter.db import (
+    TableId,
+    doPgFormat,
+    doPgJoin,
+)
+from demeter.db._postgres.tools import renderPg
+
+from .types import (
+    list_act_types,
+    list_app_methods,
+    list_app_types,
+)
+
+BULK_CHUNK_SIZE = 10000
+
+_ID_COLUMNS = (
+    "crop_type_id",
+    "nutrient_source_id",
+    "field_id",
+    "field_trial_id",
+    "plot_id",
+    "geom_id",
+)
+_DETAILED_COLUMNS = ("details", "created", "last_updated")
+
+_ACT_COLUMNS = (
+    "act_type",
+    "date_performed",
+    "crop_type_id",
+    "field_id",
+    "field_trial_id",
+    "plot_id",
+    "geom_id",
+) + _DETAILED_COLUMNS
+# The UNIQUE constraint of act, split into the columns that can't be NULL (and so can be joined on with "=") and the rest
+_ACT_KEY = (
+    ("act_type", "date_performed"),
+    ("crop_type_id", "field_id", "field_trial_id", "plot_id", "geom_id"),
+)
+
+_APP_COLUMNS = (
+    "app_type",
+    "app_method",
+    "date_applied",
+    "rate",
+    "rate_unit",
+    "crop_type_id",
+    "nutrient_source_id",
+    "field_id",
+    "field_trial_id",
+    "plot_id",
+    "geom_id",
+) + _DETAILED_COLUMNS
+_APP_KEY = (
+    ("app_type", "date_applied", "rate", "rate_unit"),
+    (
+        "app_method",
+        "crop_type_id",
+        "nutrient_source_id",
+        "field_id",
+        "field_trial_id",
+        "plot_id",
+        "geom_id",
+    ),
+)
+
+
+def _raiseForRows(df: pd.DataFrame, is_bad: pd.Series, message: str) -> None:
+    if is_bad.any():
+        rows = list(df.index[is_bad.to_numpy()][:10])
+        raise AttributeError(f"{message} (rows {rows})")
+
+
+def _checkEnum(df: pd.DataFrame, column: str, values: Sequence[Any]) -> None:
+    allowed = [v for v in values if v is not None]
+    is_bad = ~df[column].isin(allowed)
+    if None in values:
+        is_bad &= df[column].notna()
+    _raiseForRows(
+        df, is_bad, f"`{column}` must be one of the following: {str(tuple(values))}"
+    )
+
+
+def _checkOneParent(df: pd.DataFrame) -> None:
+    parents = df.reindex(columns=["field_id", "field_trial_id", "plot_id"])
+    _raiseForRows(
+        df,
+        parents.notna().sum(axis=1) != 1,
+        "Exactly one of `field_id`, `field_trial_id`, or `plot_id` must be set",
+    )
+
+
+def _resolveIds(
+    cursor: Any,
+    df: pd.DataFrame,
+    table_name: str,
+    key: Tuple[str, ...],
+    id_name: str,
+) -> pd.DataFrame:
+    """
+    Fills `id_name` from the `key` columns of `df` (e.g., crop_type_id from "crop" and "product_name") with one lookup
+    for all distinct keys; rows that already have an id are left as-is.
+
+    The keys are read into records of `table_name`'s row type, so they are compared with the columns' own types and the
+    lookup can use the table's unique index on `key`. The first column of `key` is compared with "=" (rows without it
+    aren't resolved), the others with "is not distinct from" (as `UNIQUE NULLS NOT DISTINCT` does).
+    """
+    if not all(k in df.columns for k in key[:1]):
+        return df
+    df = df.copy()
+    if id_name not in df.columns:
+        df[id_name] = pd.NA
+    to_resolve = df[id_name].isna() & df[key[0]].notna()
+    if not to_resolve.any():
+        return df
+
+    keys = df.loc[to_resolve].reindex(columns=list(key))
+    keys = keys.astype({k: "Int64" for k in key if k.endswith("_id")}).astype(object)
+    keys = keys.where(keys.notna(), None)
+    distinct = keys.drop_duplicates()
+    stmt = doPgFormat(
+        """
+        select k.ordinality, T.{id_name}
+        from jsonb_populate_recordset(null::{table}, %(keys)s::jsonb) with ordinality as k
+        join {table} T on {conditions}
+        """,
+        id_name=Identifier(id_name),
+        table=Identifier(table_name),
+        conditions=doPgJoin(
+            " and ",
+            [SQL("T.{0} = k.{0}").format(Identifier(key[0]))]
+            + [
+                SQL("T.{0} is not distinct from k.{0}").format(Identifier(k))
+                for k in key[1:]
+            ],
+        ),
+    )
+    args = {
+        "keys": json.dumps(
+            [{k: v for k, v in zip(key, row)} for row in distinct.itertuples(False)],
+            default=str,
+        )
+    }
+    cursor.execute(renderPg(stmt), args)
+    found = {n - 1: table_id for n, table_id in cursor.fetchall()}
+
+    missing = [
+        tuple(row) for i, row in enumerate(distinct.itertuples(False)) if i not in found
+    ]
+    if len(missing) > 0:
+        raise ValueError(f"No {table_name} found for {key} in {missing[:10]}")
+
+    distinct = distinct.assign(**{id_name: [found[i] for i in range(len(distinct))]})
+    resolved = keys.merge(distinct, how="left", on=list(key))
+    df.loc[to_resolve, id_name] = resolved[id_name].to_numpy()
+    return df
+
+
+def _toCopyFrame(df: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """The `columns` of `df` that COPY is sent, converted to the text that Postgres expects (NULL is empty)."""
+    out = df.loc[:, list(columns)].copy()
+    for column in columns:
+        if column in _ID_COLUMNS:
+            out[column] = out[column].astype("Int64")
+        elif column == "details":
+            out[column] = out[column].map(
+                lambda v: json.dumps({} if v is None else v, default=str)
+            )
+    return out
+
+
+def _bulkInsertOrGet(
+    cursor: Any,
+    df: pd.DataFrame,
+    table_name: str,
+    table_columns: Tuple[str, ...],
+    key: Tuple[Tuple[str, ...], Tuple[str, ...]],
+    chunk_size: int,
+) -> List[TableId]:
+    """
+    COPYs the rows of `df` into a temporary staging table, then inserts them into `table_name` with one statement that
+    skips (`on conflict do nothing`) rows that already exist and returns the id of every row, inserted or existing.
+
+    A row that conflicts with one committed concurrently (after the insert's snapshot) gets its id from a second lookup;
+    if that doesn't find it either (e.g., the conflicting row was deleted since), an exception lists the rows.
+    """
+    id_name = f"{table_name}_id"
+    staging = Identifier(f"_{table_name}_staging")
+    columns = tuple(c for c in table_columns if c in df.columns)
+    column_names = doPgJoin(", ", [Identifier(c) for c in columns])
+    not_null_key, nullable_key = key
+
+    def matches(alias: str) -> Any:
+        # Key columns that `df` doesn't have are NULL in every row
+        a = SQL(alias)
+        return doPgJoin(
+            " and ",
+            [SQL("{0}.{1} = S.{1}").format(a, Identifier(k)) for k in not_null_key]
+            + [
+                SQL("{0}.{1} is not distinct from S.{1}").format(a, Identifier(k))
+                if k in columns
+                else SQL("{0}.{1} is null").format(a, Identifier(k))
+                for k in nullable_key
+            ],
+        )
+
+    create_stmt = doPgFormat(
+        "create temp table {staging} as select 0::bigint as n, {columns} from {table} with no data",
+        staging=staging,
+        columns=column_names,
+        table=Identifier(table_name),
+    )
+    copy_stmt = doPgFormat(
+        "copy {staging} (n, {columns}) from stdin with (format csv)",
+        staging=staging,
+        columns=column_names,
+    )
+    insert_stmt = doPgFormat(
+        """
+        with I as (
+          insert into {table} ({columns})
+          select {columns} from {staging} order by n
+          on conflict do nothing
+          returning {id_name}, {key_columns}
+        )
+        select S.n, coalesce(I.{id_name}, T.{id_name}) as {id_name}
+        from {staging} S
+        left join I on {i_matches}
+        left join {table} T on {t_matches}
+        order by S.n
+        """,
+        table=Identifier(table_name),
+        columns=column_names,
+        staging=staging,
+        id_name=Identifier(id_name),
+        key_columns=doPgJoin(
+            ", ", [Identifier(k) for k in not_null_key + nullable_key]
+        ),
+        i_matches=matches("I"),
+        t_matches=matches("T"),
+    )
+
+    # A row that conflicts with one committed by a concurrent transaction after the insert's snapshot was taken is
+    # skipped by `on conflict do nothing` but not visible to the statement, so it's looked up again in a new statement
+    reselect_stmt = doPgFormat(
+        """
+        select S.n, T.{id_name}
+        from {staging} S
+        join {table} T on {t_matches}
+        where S.n = any(%(ns)s)
+        """,
+        id_name=Identifier(id_name),
+        staging=staging,
+        table=Identifier(table_name),
+        t_matches=matches("T"),
+    )
+
+    copy_frame = _toCopyFrame(df, columns)
+    copy_frame.insert(0, "n", np.arange(1, len(copy_frame) + 1))
+    ids: List[TableId] = []
+    for start in range(0, len(copy_frame), chunk_size):
+        # If a statement fails, rolling back the transaction also drops the staging table
+        cursor.execute(renderPg(doPgFormat("drop table if exists {0}", staging)))
+        cursor.execute(renderPg(create_stmt))
+        buffer = io.StringIO()
+        copy_frame.iloc[start : start + chunk_size].to_csv(
+            buffer, header=False, index=False, date_format="%Y-%m-%dT%H:%M:%S.%f"
+        )
+        buffer.seek(0)
+        cursor.copy_expert(renderPg(copy_stmt), buffer)
+        cursor.execute(renderPg(insert_stmt))
+        found = {n: table_id for n, table_id in cursor.fetchall()}
+        missing = [n for n, table_id in found.items() if table_id is None]
+        if len(missing) > 0:
+            cursor.execute(renderPg(reselect_stmt), {"ns": missing})
+            found.update(cursor.fetchall())
+            missing = [n for n in missing if found[n] is None]
+            if len(missing) > 0:
+                rows = list(df.index[[n - 1 for n in missing[:10]]])
+                raise Exception(
+                    f"Failed to insert or get {table_name} for rows {rows} (conflicting row deleted concurrently?)"
+                )
+        ids += [TableId(table_id) for table_id in found.values()]
+        cursor.execute(renderPg(doPgFormat("drop table {0}", staging)))
+    return ids
+
+
+def insertActs(
+    cursor: Any,
+    df: pd.DataFrame,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[TableId]:
+    """
+    Bulk `insertOrGetAct()` for a DataFrame with one row per Act (columns named after the `Act` fields).
+
+    The checks of `Act.__post_init__()` are run on whole columns, `crop_type_id` can be given as "crop" and
+    "product_name" columns instead (resolved with one lookup on crop_type), and the rows are written with COPY into a
+    staging table and one `insert ... on conflict do nothing` per `chunk_size` rows, so Acts that already exist are
+    returned rather than duplicated.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        df (pd.DataFrame): Acts to insert.
+        chunk_size (int): Number of rows per COPY. Defaults to `BULK_CHUNK_SIZE`.
+
+    Raises:
+        AttributeError: If a row fails the checks of `Act.__post_init__()` (the error lists the offending rows).
+        ValueError: If a "crop"/"product_name" pair doesn't exist in crop_type.
+        Exception: If a row's id can't be found after the insert (e.g., the row it conflicted with was deleted
+        concurrently).
+
+    Returns:
+        List[TableId]: act_id of each row of `df`, in row order.
+    """
+    if len(df) == 0:
+        return []
+    _checkEnum(df, "act_type", list_act_types)
+    df = _resolveIds(cursor, df, "crop_type", ("crop", "product_name"), "crop_type_id")
+    needs_crop = df["act_type"].isin(["PLANT", "HARVEST"])
+    _raiseForRows(
+        df,
+        needs_crop & df.reindex(columns=["crop_type_id"])["crop_type_id"].isna(),
+        "Must pass `crop_type_id` with `act_type` = PLANT or HARVEST",
+    )
+    _checkOneParent(df)
+    return _bulkInsertOrGet(cursor, df, "act", _ACT_COLUMNS, _ACT_KEY, chunk_size)
+
+
+def insertApps(
+    cursor: Any,
+    df: pd.DataFrame,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[TableId]:
+    """
+    Bulk `insertOrGetApp()` for a DataFrame with one row per App (columns named after the `App` fields).
+
+    Like `insertActs()`: the checks of `App.__post_init__()` are run on whole columns, `crop_type_id` can be given as
+    "crop" and "product_name" columns and `nutrient_source_id` as "nutrient" and "organization_id" columns (each
+    resolved with one lookup), and rows are written with COPY and `insert ... on conflict do nothing`.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        df (pd.DataFrame): Apps to insert.
+        chunk_size (int): Number of rows per COPY. Defaults to `BULK_CHUNK_SIZE`.
+
+    Raises:
+        AttributeError: If a row fails the checks of `App.__post_init__()` (the error lists the offending rows).
+        ValueError: If a crop type or nutrient source to resolve doesn't exist.
+        Exception: If a row's id can't be found after the insert (e.g., the row it conflicted with was deleted
+        concurrently).
+
+    Returns:
+        List[TableId]: app_id of each row of `df`, in row order.
+    """
+    if len(df) == 0:
+        return []
+    if "app_method" not in df.columns:
+        df = df.assign(app_method=None)
+    _checkEnum(df, "app_type", list_app_types)
+    _checkEnum(df, "app_method", list_app_methods)
+    df = _resolveIds(cursor, df, "crop_type", ("crop", "product_name"), "crop_type_id")
+    df = _resolveIds(
+        cursor,
+        df,
+        "nutrient_source",
+        ("nutrient", "organization_id"),
+        "nutrient_source_id",
+    )
+    _checkOneParent(df)
+    return _bulkInsertOrGet(cursor, df, "app", _APP_COLUMNS, _APP_KEY, chunk_size)
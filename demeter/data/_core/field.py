@@ -0,0 +1,93 @@
+"""Spatiotemporal queries on fields (e.g., finding the existing fields that a new field would overlap)"""
+from collections import defaultdict
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from shapely.geometry.base import BaseGeometry
+
+from demeter.db import TableId
+
+from .geom import normalizedEwkbHex
+
+# A field "overlaps" a candidate when their interiors intersect (sharing only a boundary doesn't count) and their
+# date ranges intersect; `date_end` is exclusive and `None` means no end (like the 'infinity' default of field.date_end)
+_OVERLAPPING_FIELDS_STMT = """
+select c.n, O.field_id
+from unnest(%(geoms)s::text[], %(date_starts)s::timestamp[], %(date_ends)s::timestamp[])
+  with ordinality as c(wkb, date_start, date_end, n)
+cross join lateral (
+  select F.field_id
+  from geom G
+  join field F
+    on F.geom_id = G.geom_id
+    and tsrange(F.date_start, F.date_end) && tsrange(c.date_start, c.date_end)
+  where ST_Intersects(G.geom, c.wkb::geometry)
+    and not ST_Touches(G.geom, c.wkb::geometry)
+) O
+order by c.n, O.field_id
+"""
+
+
+def findManyOverlappingFields(
+    cursor: Any,
+    candidates: Sequence[Tuple[BaseGeometry, datetime, Optional[datetime]]],
+) -> List[List[TableId]]:
+    """
+    Batched `findOverlappingFields()`: finds the fields that overlap each of `candidates` with one statement.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        candidates (Sequence[Tuple[BaseGeometry, datetime, Optional[datetime]]]): (geometry, date_start, date_end) of
+        each candidate field.
+
+    Returns:
+        List[List[TableId]]: Ids of the overlapping fields of each candidate (in ascending order), in input order.
+    """
+    if len(candidates) == 0:
+        return []
+    geoms, date_starts, date_ends = zip(*candidates)
+    args = {
+        "geoms": normalizedEwkbHex(geoms),
+        "date_starts": list(date_starts),
+        "date_ends": list(date_ends),
+    }
+    cursor.execute(_OVERLAPPING_FIELDS_STMT, args)
+
+    field_ids: Dict[int, List[TableId]] = defaultdict(list)
+    for n, field_id in cursor.fetchall():
+        field_ids[n].append(TableId(field_id))
+    return [field_ids[n] for n in range(1, len(candidates) + 1)]
+
+
+def findOverlappingFields(
+    cursor: Any,
+    geom: BaseGeometry,
+    date_start: datetime,
+    date_end: Optional[datetime] = None,
+) -> List[TableId]:
+    """
+    Finds the fields that overlap `geom` spatially and [`date_start`, `date_end`) temporally, e.g. to detect conflicts
+    before inserting a new field (see the "Future behavior of finding duplicate fields" notes in types.py).
+
+    A field overlaps when its geometry shares interior with `geom` (adjacent fields that only share a boundary don't)
+    and its date range intersects the given one. The geometries are found with the spatial index on geom, and then
+    their fields with the GiST index over (geom_id, tsrange(date_start, date_end)) on field, so not every field is
+    scanned.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        geom (BaseGeometry): Boundary of the candidate field (in WGS 84).
+        date_start (datetime): Start of the candidate field's date range.
+        date_end (Optional[datetime]): End (exclusive) of the candidate field's date range; `None` for no end.
+
+    Returns:
+        List[TableId]: Ids of the overlapping fields, in ascending order.
+    """
+    return findManyOverlappingFields(cursor, [(geom, date_start, date_end)])[0]
@@ -10,8 +10,10 @@ function generation functions to the right ID and table. More specific functions
 from ...db import SQLGenerator
 from ...db._generic_types import (
     GetId,
+    GetManyTable,
     GetTable,
     ReturnId,
+    ReturnManyId,
 )
 from .._core import lookups as _lookups
 from .._core.types import (
@@ -56,6 +58,16 @@ getAct: GetTable[Act] = g.getTableFunction(Act)
 getApp: GetTable[App] = g.getTableFunction(App)
 getNutrientSource: GetTable[NutrientSource] = g.getTableFunction(NutrientSource)
 
+getManyOrganization: GetManyTable[Organization] = g.getManyFunction(Organization)
+getManyGrouper: GetManyTable[Grouper] = g.getManyFunction(Grouper)
+getManyField: GetManyTable[Field] = g.getManyFunction(Field)
+getManyFieldTrial: GetManyTable[FieldTrial] = g.getManyFunction(FieldTrial)
+getManyPlot: GetManyTable[Plot] = g.getManyFunction(Plot)
+getManyCropType: GetManyTable[CropType] = g.getManyFunction(CropType)
+getManyAct: GetManyTable[Act] = g.getManyFunction(Act)
+getManyApp: GetManyTable[App] = g.getManyFunction(App)
+getManyNutrientSource: GetManyTable[NutrientSource] = g.getManyFunction(NutrientSource)
+
 insertOrganization: ReturnId[Organization] = g.getInsertReturnIdFunction(Organization)
 insertGrouper: ReturnId[Grouper] = g.getInsertReturnIdFunction(Grouper)
 insertField: ReturnId[Field] = g.getInsertReturnIdFunction(Field)
@@ -98,6 +110,38 @@ insertOrGetNutrientSource: ReturnId[NutrientSource] = g.partialInsertOrGetId(
     getMaybeNutrientSourceId, insertNutrientSource
 )
 
+# bulk variants of the insertOrGet functions above (one call for a whole sequence of objects)
+insertOrGetManyOrganization: ReturnManyId[Organization] = g.getInsertOrGetManyFunction(
+    Organization
+)
+insertOrGetManyGrouper: ReturnManyId[Grouper] = g.getInsertOrGetManyFunction(Grouper)
+insertOrGetManyField: ReturnManyId[Field] = g.getInsertOrGetManyFunction(Field)
+insertOrGetManyFieldTrial: ReturnManyId[FieldTrial] = g.getInsertOrGetManyFunction(
+    FieldTrial
+)
+insertOrGetManyPlot: ReturnManyId[Plot] = g.getInsertOrGetManyFunction(Plot)
+insertOrGetManyCropType: ReturnManyId[CropType] = g.getInsertOrGetManyFunction(CropType)
+insertOrGetManyAct: ReturnManyId[Act] = g.getInsertOrGetManyFunction(Act)
+insertOrGetManyApp: ReturnManyId[App] = g.getInsertOrGetManyFunction(App)
+insertOrGetManyNutrientSource: ReturnManyId[
+    NutrientSource
+] = g.getInsertOrGetManyFunction(NutrientSource)
+
+
+# single-statement insert-or-update for tables with a NULLS NOT DISTINCT natural key (unique constraint); rows are
+# matched on that key and concurrent loaders can't insert the same row twice, but each call takes a value from the
+# table's id sequence. There is no upsertPlot: plot's UNIQUE (name, field_id, field_trial_id) is NULLS DISTINCT, so
+# plots without a field_trial_id would never conflict.
+upsertGrouper: ReturnId[Grouper] = g.getUpsertReturnIdFunction(Grouper)
+upsertField: ReturnId[Field] = g.getUpsertReturnIdFunction(Field)
+upsertFieldTrial: ReturnId[FieldTrial] = g.getUpsertReturnIdFunction(FieldTrial)
+upsertCropType: ReturnId[CropType] = g.getUpsertReturnIdFunction(CropType)
+upsertAct: ReturnId[Act] = g.getUpsertReturnIdFunction(Act)
+upsertApp: ReturnId[App] = g.getUpsertReturnIdFunction(App)
+upsertNutrientSource: ReturnId[NutrientSource] = g.getUpsertReturnIdFunction(
+    NutrientSource
+)
+
 
 # spatiotemporal types
 getMaybeGeoSpatialKeyId: GetId[GeoSpatialKey] = g.getMaybeIdFunction(GeoSpatialKey)
@@ -117,3 +161,10 @@ insertOrGetGeoSpatialKey = g.partialInsertOrGetId(
 insertOrGetTemporalKey = g.partialInsertOrGetId(
     getMaybeTemporalKeyId, insertTemporalKey
 )
+
+insertOrGetManyGeoSpatialKey: ReturnManyId[
+    GeoSpatialKey
+] = g.getInsertOrGetManyFunction(GeoSpatialKey)
+insertOrGetManyTemporalKey: ReturnManyId[TemporalKey] = g.getInsertOrGetManyFunction(
+    TemporalKey
+)
@@ -1,10 +1,16 @@
+import hashlib
 from typing import (
     Any,
+    List,
     Optional,
+    Sequence,
     Union,
 )
 
+import numpy as np
+import shapely
 from geo_utils.world import round_geometry
+from geopandas import GeoDataFrame
 from shapely.geometry import (
     GeometryCollection,
     LineString,
@@ -14,10 +20,98 @@ from shapely.geometry import (
     Point,
     Polygon,
 )
+from shapely.geometry.base import BaseGeometry
 from shapely.wkb import loads as wkb_loads
 
 from demeter.db import TableId
 
+# Geometries are stored in WGS 84
+GEOM_SRID = 4326
+
+# Decimal places that geometries are stored with (9 digits is ~0.1 mm at the equator)
+GEOM_PRECISION = 9
+
+# Decimal places of the canonical form that geometries are compared in (see canonical_geom() in schema_demeter.sql);
+# 7 digits has 1.11 cm accuracy at the equator
+CANONICAL_PRECISION = 7
+
+
+def _quantizeCoordinates(coords: np.ndarray, precision: int) -> np.ndarray:
+    """`ST_QuantizeCoordinates()`: zeroes the mantissa bits of each coordinate that aren't needed to keep `precision`
+    decimal places."""
+    coords = np.asarray(coords, dtype=np.float64)
+    is_zero = coords == 0
+    digits_left_of_decimal = np.trunc(
+        1 + np.log10(np.abs(np.where(is_zero, 1.0, coords)))
+    )
+    bits_needed = np.clip(
+        np.ceil((precision + digits_left_of_decimal) / np.log10(2)), 1, 52
+    ).astype(np.uint64)
+    mask = np.left_shift(np.uint64(0xFFFFFFFFFFFFFFFF), np.uint64(52) - bits_needed)
+    quantized = np.bitwise_and(coords.view(np.uint64), mask).view(np.float64)
+    return np.where(is_zero, 0.0, quantized)
+
+
+def _reduceAndQuantize(geometries: np.ndarray, precision: int) -> np.ndarray:
+    """`ST_QuantizeCoordinates(ST_ReducePrecision(geom, 1e-{precision}), {precision})` for an array of geometries."""
+    reduced = shapely.set_precision(geometries, 10**-precision)
+    return shapely.transform(
+        reduced, lambda coords: _quantizeCoordinates(coords, precision)
+    )
+
+
+def normalizeGeometries(
+    geometries: Union[Sequence[BaseGeometry], np.ndarray],
+) -> np.ndarray:
+    """
+    Prepares geometries for storing in the geom table, as an array operation: invalid geometries are repaired with
+    `make_valid` and coordinates are reduced and quantized to `GEOM_PRECISION` decimal places (what the database used to
+    do with ST_MakeValid/ST_ReducePrecision/ST_QuantizeCoordinates on every insert and lookup).
+
+    Geometries must be in WGS 84: a geometry with an SRID (see `shapely.set_srid()`) other than `GEOM_SRID` raises,
+    and geometries without one are assumed to be WGS 84.
+
+    Args:
+        geometries (Union[Sequence[BaseGeometry], np.ndarray]): Geometries to normalize.
+
+    Raises:
+        ValueError: If a geometry has an SRID other than `GEOM_SRID`.
+
+    Returns:
+        np.ndarray: Normalized geometries (with SRID `GEOM_SRID`), in input order.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    srids = shapely.get_srid(geometries)
+    other_srids = {int(srid) for srid in np.unique(srids)} - {0, GEOM_SRID}
+    if len(other_srids) > 0:
+        raise ValueError(
+            f"Geometries must be in EPSG:{GEOM_SRID}; got SRIDs {sorted(other_srids)}"
+        )
+    is_invalid = ~shapely.is_valid(geometries)
+    if np.any(is_invalid):
+        geometries = geometries.copy()
+        geometries[is_invalid] = shapely.make_valid(geometries[is_invalid])
+    normalized = _reduceAndQuantize(geometries, GEOM_PRECISION)
+    return shapely.set_srid(normalized, GEOM_SRID)
+
+
+def normalizedEwkbHex(
+    geometries: Union[Sequence[BaseGeometry], np.ndarray],
+) -> List[str]:
+    """
+    Normalizes geometries with `normalizeGeometries()` and encodes them as hex EWKB, the form in which they are sent to
+    the database (e.g., as a `geometry` or `text[]` parameter).
+
+    Args:
+        geometries (Union[Sequence[BaseGeometry], np.ndarray]): Geometries to normalize and encode.
+
+    Returns:
+        List[str]: Hex EWKB of each normalized geometry, in input order.
+    """
+    return list(
+        shapely.to_wkb(normalizeGeometries(geometries), hex=True, include_srid=True)
+    )
+
 
 def getMaybeGeomId(
     cursor: Any,
@@ -32,29 +126,22 @@ def getMaybeGeomId(
     ],
 ) -> Optional[TableId]:
     """
-    Because ST_QuantizeCoordinates and ST_ReducePrecision were used for upserting geometries, they must also be used for
-    checking for duplicates.
+    The geometry is normalized the same way as in `insertOrGetGeom()` (see `normalizeGeometries()`) and looked up by
+    its `canonical_geom_hash()` (an index probe on geom.geom_hash); `ST_Equals` on the canonical forms only guards
+    against hash collisions.
     """
+    return _getMaybeGeomIdByWkb(cursor, normalizedEwkbHex([geometry])[0])
+
+
+def _getMaybeGeomIdByWkb(cursor: Any, wkb: str) -> Optional[TableId]:
+    """Looks up a geometry that has already been normalized, by its hex EWKB."""
     stmt = """
     select G.geom_id
     FROM geom G
-    where ST_Equals(
-        ST_QuantizeCoordinates(ST_ReducePrecision(G.geom, 1e-%(precision)s), %(precision)s),
-        ST_QuantizeCoordinates(
-            ST_ReducePrecision(
-                ST_MakeValid(
-                    ST_Transform(
-                        ST_SetSRID(%(geom)s::geometry, %(srid)s),
-                        4326
-                    )
-                ), 1e-%(precision)s
-            ), %(precision)s
-        )
-    )
+    where G.geom_hash = canonical_geom_hash(%(geom)s::geometry)
+      and ST_Equals(canonical_geom(G.geom), canonical_geom(%(geom)s::geometry))
     """
-    precision = 7
-    # args = {"geom": round_geometry(geometry, n_decimal_places=precision).wkb_hex, "srid": 4326, "precision": precision}
-    args = {"geom": geometry.wkb_hex, "srid": 4326, "precision": precision}
+    args = {"geom": wkb}
     cursor.execute(stmt, args)
     result = cursor.fetchall()
     assert len(result) <= 1, "Returned result is expected to be <= 1"
@@ -72,7 +159,7 @@ def getMaybeGeom(
     FROM geom G
     WHERE G.geom_id = %(geom_id)s;
     """
-    precision = 7
+    precision = CANONICAL_PRECISION
     args = {"geom_id": geom_id}
     cursor.execute(stmt, args)
 
@@ -84,7 +171,48 @@ def getMaybeGeom(
         )
 
 
-# TODO: Warn the user when the geometry is modified by ST_MakeValid
+def getGeoms(
+    cursor: Any,
+    geom_ids: Sequence[int],
+    n_decimal_places: int = CANONICAL_PRECISION,
+) -> GeoDataFrame:
+    """
+    Bulk `getMaybeGeom()`: fetches the geometries of `geom_ids` with one query and decodes them as an array.
+
+    The geometries are sent as binary WKB (`ST_AsBinary`) rather than hex, decoded with `shapely.from_wkb()` and
+    rounded to `n_decimal_places` with a single `shapely.transform()` over all coordinates.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        geom_ids (Sequence[int]): Ids of the geometries to get; ids that don't exist are left out of the result.
+        n_decimal_places (int): Decimal places to round coordinates to. Defaults to `CANONICAL_PRECISION`.
+
+    Returns:
+        GeoDataFrame: "geom_id" and "geom" (the geometry column, EPSG:4326) columns, in the order of `geom_ids`.
+    """
+    stmt = """
+    select u.geom_id, ST_AsBinary(G.geom) as geom
+    from unnest(%(geom_ids)s::bigint[]) with ordinality as u(geom_id, n)
+    join geom G
+      on G.geom_id = u.geom_id
+    order by u.n
+    """
+    args = {"geom_ids": [int(geom_id) for geom_id in geom_ids]}
+    cursor.execute(stmt, args)
+    result = cursor.fetchall()
+
+    ids = np.array([row[0] for row in result], dtype=np.int64)
+    wkbs = np.array([bytes(row[1]) for row in result], dtype=object)
+    geoms = shapely.transform(
+        shapely.from_wkb(wkbs),
+        lambda coords: np.round(coords, n_decimal_places),
+    )
+    return GeoDataFrame(
+        {"geom_id": ids, "geom": geoms}, geometry="geom", crs=f"EPSG:{GEOM_SRID}"
+    )
+
+
+# TODO: Warn the user when the geometry is modified by make_valid
 def insertOrGetGeom(
     cursor: Any,
     geometry: Union[
@@ -98,37 +226,105 @@ def insertOrGetGeom(
     ],
 ) -> TableId:
     """
-    Use https://postgis.net/docs/ST_QuantizeCoordinates.html for upserting geometries.
+    The geometry is made valid and reduced/quantized to `GEOM_PRECISION` decimal places before it is sent (see
+    `normalizeGeometries()`), so the database stores the WKB as-is.
 
-    ST_ReducePrecision is to be used for reducing precision further than was actually passed. Both
-    ST_QuantizeCoordinates and ST_ReducePrecision are necessary for checking for equality via ST_Equals.
+    Quantizing (https://postgis.net/docs/ST_QuantizeCoordinates.html) after reducing the precision makes the stored
+    coordinates compress well; duplicates are compared in their canonical form (see `canonical_geom_hash()`).
     """
-    maybe_geom_id = getMaybeGeomId(cursor, geometry)
+    wkb = normalizedEwkbHex([geometry])[0]
+    maybe_geom_id = _getMaybeGeomIdByWkb(cursor, wkb)
     if maybe_geom_id is not None:
         return maybe_geom_id
     stmt = """
     insert into geom(geom)
-    values(
-        ST_QuantizeCoordinates(
-            ST_ReducePrecision(
-                ST_MakeValid(
-                    ST_Transform(
-                        ST_SetSRID(%(geom)s::geometry, %(srid)s),
-                        4326
-                    )
-                ), 1e-%(precision)s
-            ), %(precision)s
-        )
-    )
+    values(%(geom)s::geometry)
     returning geom_id
     """
-    precision = 9
-    args = {
-        # "geom": round_geometry(geometry, n_decimal_places=precision).wkb_hex,
-        "geom": geometry.wkb_hex,
-        "srid": 4326,
-        "precision": precision,
-    }  # 7 digits has 1.11 cm accuracy at the equator
+    args = {"geom": wkb}
     cursor.execute(stmt, args)
     result = cursor.fetchone()
     return TableId(result.geom_id)
+
+
+GEOM_BATCH_SIZE = 1000
+
+
+def insertOrGetGeoms(
+    cursor: Any,
+    geometries: Sequence[
+        Union[
+            LineString,
+            Point,
+            Polygon,
+            MultiLineString,
+            MultiPoint,
+            MultiPolygon,
+            GeometryCollection,
+        ]
+    ],
+    batch_size: int = GEOM_BATCH_SIZE,
+) -> List[TableId]:
+    """
+    Batched `insertOrGetGeom()`: gets the geom_id of each geometry, inserting the ones that don't exist yet, with one
+    statement per `batch_size` geometries. Ids are returned in input order.
+
+    The geometries are normalized together (see `normalizeGeometries()`). Each statement looks them up by
+    `canonical_geom_hash()` (with `ST_Equals` on the canonical forms as a collision check) and inserts only the misses.
+    Geometries within a batch that have the same canonical form are inserted once. The ids of the inserted rows are
+    drawn from the geom_id sequence up front, so they can be matched back to the inputs.
+    """
+    stmt = """
+    with I as materialized (
+      select u.n, u.wkb::geometry as geom, canonical_geom_hash(u.wkb::geometry) as geom_hash
+      from unnest(%(geoms)s::text[]) with ordinality as u(wkb, n)
+    ),
+    F as (
+      select distinct on (I.n) I.n, G.geom_id
+      from I
+      join geom G
+        on G.geom_hash = I.geom_hash
+        and ST_Equals(canonical_geom(G.geom), canonical_geom(I.geom))
+      order by I.n, G.geom_id
+    ),
+    M as materialized (
+      select D.geom_hash, D.geom, nextval(pg_get_serial_sequence('geom', 'geom_id')) as geom_id
+      from (
+        select distinct on (I.geom_hash) I.geom_hash, I.geom
+        from I
+        where not exists (select 1 from F where F.n = I.n)
+        order by I.geom_hash, I.n
+      ) D
+    ),
+    N as (
+      insert into geom (geom_id, geom)
+      select M.geom_id, M.geom from M
+    )
+    select I.n, coalesce(F.geom_id, M.geom_id) as geom_id
+    from I
+    left join F on F.n = I.n
+    left join M on M.geom_hash = I.geom_hash and F.n is null
+    order by I.n
+    """
+    wkbs = normalizedEwkbHex(geometries)
+    geom_ids: List[TableId] = []
+    for start in range(0, len(wkbs), batch_size):
+        cursor.execute(stmt, {"geoms": wkbs[start : start + batch_size]})
+        geom_ids += [TableId(geom_id) for _, geom_id in cursor.fetchall()]
+    return geom_ids
+
+
+def canonical_geom_hash(geometry: BaseGeometry) -> bytes:
+    """
+    Python counterpart of the `canonical_geom_hash()` SQL function (which fills geom.geom_hash): the SHA-256 of the WKB
+    of the geometry reduced and quantized to `CANONICAL_PRECISION` decimal places and normalized.
+
+    The geometry is first prepared with `normalizeGeometries()`, as `insertOrGetGeom()` does before storing it, so the
+    result is the geom_hash of the row the geometry is (or would be) stored in. Useful for finding duplicates before
+    sending geometries to the database; the values match those computed by PostGIS as long as both use the same GEOS
+    precision-reduction and normalization.
+    """
+    canonical = _reduceAndQuantize(normalizeGeometries([geometry]), CANONICAL_PRECISION)
+    canonical = shapely.normalize(canonical)
+    wkb = shapely.to_wkb(canonical[0], output_dimension=2, byte_order=1)
+    return hashlib.sha256(wkb).digest()
@@ -1,10 +1,15 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Sequence,
+)
 
 from demeter import db
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=db.TABLE_SLOTS)
 class Grouper(db.Detailed):
     """Arbitrary collection of Field, FieldTrial, Plot, or other Grouper objects which allows demeter to represent any
     grouping of objects, which allows for a flexible organization scheme across customers.
@@ -13,3 +18,107 @@ class Grouper(db.Detailed):
     name: str
     organization_id: db.TableId
     parent_grouper_id: Optional[db.TableId] = None
+
+
+def _toGroupers(results: Sequence[Any]) -> Dict[db.TableId, Grouper]:
+    return {
+        db.TableId(r.grouper_id): Grouper(
+            **{k: v for k, v in r._asdict().items() if k not in ("grouper_id", "depth")}
+        )
+        for r in results
+    }
+
+
+def getGrouperAncestors(
+    cursor: Any,
+    grouper_id: db.TableId,
+    include_self: bool = False,
+) -> Dict[db.TableId, Grouper]:
+    """
+    Gets the ancestors of a grouper (its parent, the parent's parent, and so on up to the root).
+
+    One lookup on grouper_closure, which the schema keeps up to date as groupers are inserted or re-parented, so the
+    cost does not depend on the depth of the tree.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        grouper_id (TableId): Grouper to get the ancestors of.
+        include_self (bool): Whether to include `grouper_id` itself. Defaults to False.
+
+    Returns:
+        Dict[TableId, Grouper]: Ancestors keyed by grouper_id, nearest first.
+    """
+    stmt = """
+    select G.*, C.depth
+    from grouper_closure C
+    join grouper G on G.grouper_id = C.ancestor_grouper_id
+    where C.descendant_grouper_id = %(grouper_id)s
+      and C.depth >= %(min_depth)s
+    order by C.depth
+    """
+    args = {"grouper_id": grouper_id, "min_depth": 0 if include_self else 1}
+    cursor.execute(stmt, args)
+    return _toGroupers(cursor.fetchall())
+
+
+def getGrouperDescendants(
+    cursor: Any,
+    grouper_id: db.TableId,
+    include_self: bool = False,
+    max_depth: Optional[int] = None,
+) -> Dict[db.TableId, Grouper]:
+    """
+    Gets the descendants of a grouper (its children, their children, and so on), with one lookup on grouper_closure.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        grouper_id (TableId): Grouper to get the descendants of.
+        include_self (bool): Whether to include `grouper_id` itself. Defaults to False.
+        max_depth (Optional[int]): Only get descendants up to this many levels below `grouper_id` (e.g., 1 for its
+        children). Defaults to all levels.
+
+    Returns:
+        Dict[TableId, Grouper]: Descendants keyed by grouper_id, by level (nearest first) and then by grouper_id.
+    """
+    stmt = """
+    select G.*, C.depth
+    from grouper_closure C
+    join grouper G on G.grouper_id = C.descendant_grouper_id
+    where C.ancestor_grouper_id = %(grouper_id)s
+      and C.depth >= %(min_depth)s
+      and (%(max_depth)s::int is null or C.depth <= %(max_depth)s::int)
+    order by C.depth, G.grouper_id
+    """
+    args = {
+        "grouper_id": grouper_id,
+        "min_depth": 0 if include_self else 1,
+        "max_depth": max_depth,
+    }
+    cursor.execute(stmt, args)
+    return _toGroupers(cursor.fetchall())
+
+
+def getGrouperSubtreeFieldCounts(
+    cursor: Any,
+    grouper_ids: Sequence[db.TableId],
+) -> Dict[db.TableId, int]:
+    """
+    Counts the fields of each grouper's subtree (the fields of the grouper and of all of its descendants).
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        grouper_ids (Sequence[TableId]): Groupers to count the fields of.
+
+    Returns:
+        Dict[TableId, int]: Number of fields keyed by grouper_id (groupers that don't exist are left out).
+    """
+    stmt = """
+    select C.ancestor_grouper_id as grouper_id, count(F.field_id) as field_count
+    from grouper_closure C
+    left join field F on F.grouper_id = C.descendant_grouper_id
+    where C.ancestor_grouper_id = any(%(grouper_ids)s::bigint[])
+    group by C.ancestor_grouper_id
+    """
+    args = {"grouper_ids": list(grouper_ids)}
+    cursor.execute(stmt, args)
+    return {db.TableId(r.grouper_id): int(r.field_count) for r in cursor.fetchall()}
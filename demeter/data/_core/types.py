@@ -5,13 +5,14 @@ from datetime import datetime
 from typing import Optional
 
 from demeter.db import (
+    TABLE_SLOTS,
     Detailed,
     TableId,
     TypeTable,
 )
 
 """Future behavior of finding duplicate fields in Demeter (1/9/2023):
-1. Query the field table for a field_id that spatially intersects a spatiotemporal unit of interest. This requires that we have both a geometry, and a range of dates (remember, date_end defaults to infinity).
+1. Query the field table for a field_id that spatially intersects a spatiotemporal unit of interest (see `findOverlappingFields()`). This requires that we have both a geometry, and a range of dates (remember, date_end defaults to infinity).
 2. If no spatiotemporal intersection: Add in the new field, setting geom_id, date_start, and date_end (same as was performed on the query above.
 3. If there is a spatial intersection, but not a temporal intersection: Still not a problem, we just would add the field using the attributes used for the query.
 Note that if we tend to use infinity as date_end, this is probably a pretty rare scenario. It would mean that either the existing field that this intersects with or the potential field to add has a non-infinity value for date_end, which would have been explicitly set. There will probably be some logic here, that may be rather complicated. However, I think the level of complexity will probably be related to the level of complexity we decide to impose via setting date_start and date_end based on other data, like Acts.
@@ -19,14 +20,14 @@ Note that if we tend to use infinity as date_end, this is probably a pretty rare
 """
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class Organization(Detailed):
     """Parent object that segregates all information/data in the database."""
 
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class Field(Detailed):
     """Arbitrary spatiotemporal unit representing an agronomically-relevant area that is generally, but not always,
     managed as a single unit within the defined spatial and temporal constraints."""
@@ -39,7 +40,7 @@ class Field(Detailed):
     grouper_id: Optional[TableId] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class FieldTrial(Detailed):
     """A group of treatment plots geometrically organized according to an experimental design, whereby one and only one
     treatment is assigned to each plot. Two field trials shall not overlap one another spatially nor temporally, and a
@@ -54,7 +55,7 @@ class FieldTrial(Detailed):
     grouper_id: Optional[TableId] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class Plot(Detailed):
     """A spatiotemporal unit having a specified experimental treatment, usually defined by its management (planting,
     tillage, application, irrigation, and/or harvest). The management within a Plot shall be uniform across its
@@ -70,7 +71,7 @@ class Plot(Detailed):
     replication_id: Optional[int] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class CropType(TypeTable, Detailed):
     """Information related to the plant cultivated through a Planting activity."""
 
@@ -78,7 +79,7 @@ class CropType(TypeTable, Detailed):
     product_name: str = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class NutrientSource(TypeTable, Detailed):
     """
     Information related to nutrients, particularly the primary and secondary macro-nutrients, as well as micro-nutrients
@@ -105,7 +106,7 @@ class NutrientSource(TypeTable, Detailed):
 list_act_types = ("APPLY", "HARVEST", "MECHANICAL", "PLANT", "TILL")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class Act(Detailed):
     """Spatiotemporal information for a management activity on a field.
     Types of management activities are limited to the types listed in `ActType`."""
@@ -173,7 +174,7 @@ list_app_methods = (
 )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class App(Detailed):
     """
     Spatiotemporal information for a application to a field.
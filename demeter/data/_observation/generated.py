@@ -1,8 +1,10 @@
 from ...db import SQLGenerator
 from ...db._generic_types import (
     GetId,
+    GetManyTable,
     GetTable,
     ReturnId,
+    ReturnManyId,
 )
 from .._observation.types import (
     S3,
@@ -24,6 +26,13 @@ getUnitType: GetTable[UnitType] = g.getTableFunction(UnitType)
 getObservationType: GetTable[ObservationType] = g.getTableFunction(ObservationType)
 getObservation: GetTable[Observation] = g.getTableFunction(Observation)
 
+getManyS3: GetManyTable[S3] = g.getManyFunction(S3)
+getManyUnitType: GetManyTable[UnitType] = g.getManyFunction(UnitType)
+getManyObservationType: GetManyTable[ObservationType] = g.getManyFunction(
+    ObservationType
+)
+getManyObservation: GetManyTable[Observation] = g.getManyFunction(Observation)
+
 getMaybeS3Id: GetId[S3] = g.getMaybeIdFunction(S3)
 getMaybeUnitTypeId: GetId[UnitType] = g.getMaybeIdFunction(UnitType)
 getMaybeObservationTypeId: GetId[ObservationType] = g.getMaybeIdFunction(
@@ -48,3 +57,13 @@ insertOrGetObservationType: ReturnId[ObservationType] = g.partialInsertOrGetId(
 insertOrGetObservation: ReturnId[Observation] = g.partialInsertOrGetId(
     getMaybeObservationId, insertObservation
 )
+
+insertOrGetManyS3: ReturnManyId[S3] = g.getInsertOrGetManyFunction(S3)
+upsertS3: ReturnId[S3] = g.getUpsertReturnIdFunction(S3)
+insertOrGetManyUnitType: ReturnManyId[UnitType] = g.getInsertOrGetManyFunction(UnitType)
+insertOrGetManyObservationType: ReturnManyId[
+    ObservationType
+] = g.getInsertOrGetManyFunction(ObservationType)
+insertOrGetManyObservation: ReturnManyId[Observation] = g.getInsertOrGetManyFunction(
+    Observation
+)
@@ -17,7 +17,7 @@ list_category_type = (
 )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=db.TABLE_SLOTS)
 class S3(db.Detailed):
     """A reference to a file stored in S3."""
 
@@ -45,7 +45,7 @@ class S3(db.Detailed):
             )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=db.TABLE_SLOTS)
 class Observation(db.Detailed):
     """An arbitrary observation/measurement of ObservationType that is spatiotemporal in nature
     and agronomically relevant. This observation can, but does not have to align with a specific
@@ -72,7 +72,7 @@ class Observation(db.Detailed):
 
 # TODO: We need to impose constraints on which values can be passed to `type_name` to ensure that we aren't
 # creating duplicates of types.
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=db.TABLE_SLOTS)
 class ObservationType(db.Detailed):
     """Measurement type as it relates to collection methodology and/or agronomic interpretation."""
 
@@ -85,7 +85,7 @@ class ObservationType(db.Detailed):
     # masked: bool = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=db.TABLE_SLOTS)
 class UnitType(db.TypeTable):
     """Reported units of an observation as should be interpreted in the scope of the observation type."""
 
@@ -3,6 +3,7 @@ from typing import TypeAlias
 from psycopg2.extensions import connection
 
 from ._base_types import (
+    TABLE_SLOTS,
     Detailed,
     SelfKey,
     SomeKey,
@@ -11,16 +12,38 @@ from ._base_types import (
     TableKey,
     TypeTable,
 )
-from ._json_type import EMPTY_JSON, JSON
+from ._json_type import (
+    EMPTY_JSON,
+    JSON,
+    jsonDefault,
+)
+from ._postgres.async_connection import (
+    disposeAsyncEngines,
+    getAsyncConnection,
+    getAsyncEngine,
+    getExistingSearchPathAsync,
+)
+from ._postgres.async_generator import AsyncSQLGenerator
+from ._postgres.bulk_copy import copyTables
+from ._postgres.cache import clearStatementCache, getStatementCacheInfo
 from ._postgres.connection import (  # unlikely that anything besides Postgres will ever be supported
+    disposeEngines,
     getConnection,
     getEngine,
     getExistingSearchPath,
     getSession,
 )
+from ._postgres.explain import LookupPlan, explainMaybeId
 from ._postgres.generator import SQLGenerator
+from ._postgres.get import clearIdentityMap
 from ._postgres.insert import generateInsertMany
+from ._postgres.stats import (
+    dumpStats,
+    resetStats,
+    stats,
+)
 from ._postgres.tools import doPgFormat, doPgJoin
+from ._postgres.type_cache import clearTypeCache, getTypeCacheInfo
 from ._register import register_sql_adapters
 
 Connection: TypeAlias = connection
@@ -31,13 +54,31 @@ __all__ = [
     "getEngine",
     "getExistingSearchPath",
     "getSession",
+    "disposeEngines",
+    "getAsyncEngine",
+    "getAsyncConnection",
+    "disposeAsyncEngines",
     "SQLGenerator",
+    "AsyncSQLGenerator",
+    "getExistingSearchPathAsync",
+    "clearIdentityMap",
+    "explainMaybeId",
+    "LookupPlan",
     "generateInsertMany",
+    "copyTables",
+    "getStatementCacheInfo",
+    "clearStatementCache",
+    "clearTypeCache",
+    "getTypeCacheInfo",
+    "stats",
+    "resetStats",
+    "dumpStats",
     "doPgFormat",
     "doPgJoin",
     "Connection",
     "JSON",
     "EMPTY_JSON",
+    "jsonDefault",
     # Base Types
     "Table",
     "Detailed",
@@ -46,6 +87,7 @@ __all__ = [
     "TableId",
     "SelfKey",
     "SomeKey",
+    "TABLE_SLOTS",
 ]
 
 
@@ -1,3 +1,5 @@
+import datetime as dt
+import sys
 from collections import OrderedDict
 from dataclasses import (
     dataclass,
@@ -7,11 +9,18 @@ from dataclasses import (
 from datetime import datetime
 from typing import (
     Any,
+    Dict,
+    FrozenSet,
+    NamedTuple,
     NewType,
     Sequence,
+    Tuple,
+    Type,
     TypeVar,
     Union,
     cast,
+    get_args,
+    get_origin,
 )
 
 import pytz
@@ -21,15 +30,62 @@ from . import _json_type as json_type
 D = TypeVar("D")
 
 
-@dataclass(frozen=True)
+class TableMeta(NamedTuple):
+    """Field metadata of a `Table` class, computed once per class (see `tableMeta()`)."""
+
+    # all fields, in order
+    names: Tuple[str, ...]
+    # Optional[...] or hash=False fields (may be omitted from inserts and lookups)
+    optional: FrozenSet[str]
+    # fields typed as `datetime.date` or `datetime.time`
+    date_or_time: FrozenSet[str]
+    # the remaining (non-optional) fields, which identify a row
+    key_names: Tuple[str, ...]
+
+
+_TABLE_META: Dict[type, TableMeta] = {}
+
+# Whether `Table` dataclasses are declared with `slots=True`. Before Python 3.11, slotted frozen dataclasses can't be
+# pickled (which joblib needs to send them to worker processes) and a slotted subclass re-declares the slots of its
+# bases, so they are only slotted from 3.11 on.
+TABLE_SLOTS = sys.version_info >= (3, 11)
+
+
+def tableMeta(table: Union["Table", Type["Table"]]) -> TableMeta:
+    """Gets the cached `TableMeta` for a `Table` instance or class, computing it on first use."""
+    cls = table if isinstance(table, type) else type(table)
+    meta = _TABLE_META.get(cls)
+    if meta is None:
+        names = []
+        optional = set()
+        date_or_time = set()
+        for f in fields(cls):
+            names.append(f.name)
+            t = f.type
+            if (
+                get_origin(t) is Union and type(None) in get_args(t)
+            ) or f.hash is False:
+                optional.add(f.name)
+            if t in [dt.time, dt.date]:
+                date_or_time.add(f.name)
+        meta = TableMeta(
+            names=tuple(names),
+            optional=frozenset(optional),
+            date_or_time=frozenset(date_or_time),
+            key_names=tuple(n for n in names if n not in optional),
+        )
+        _TABLE_META[cls] = meta
+    return meta
+
+
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class Table:
     def names(self) -> Sequence[str]:
-        return [f.name for f in fields(self)]
+        return tableMeta(self).names
 
     # TODO: Simplify this and the register_adapter for Table and OrderedDict
     def __call__(self) -> OrderedDict[str, Any]:
-        out = [(f.name, getattr(self, f.name)) for f in fields(self)]
-        return OrderedDict(out)
+        return OrderedDict([(n, getattr(self, n)) for n in tableMeta(self).names])
 
     def get(self, k: str) -> D:
         return cast(D, self.__getattribute__(k))
@@ -51,7 +107,7 @@ def _datetime_now_utc():
     return datetime.now(tz=tz_utc).replace(tzinfo=None)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class Detailed(Table):
     details: json_type.JSON = field(
         default_factory=lambda: json_type.EMPTY_JSON, hash=False, kw_only=True
@@ -64,22 +120,22 @@ class Detailed(Table):
     )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class TypeTable(Table):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class TableKey(Table):
     @classmethod
     def names(cls) -> Sequence[str]:
-        return [f.name for f in fields(cls)]
+        return tableMeta(cls).names
 
 
 TableId = NewType("TableId", int)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=TABLE_SLOTS)
 class SelfKey(TableKey):
     pass
 
@@ -1,9 +1,12 @@
 from typing import (
     Any,
     Callable,
+    Dict,
     Generic,
+    List,
     Mapping,
     Optional,
+    Sequence,
     Type,
     TypeVar,
     Union,
@@ -28,7 +31,9 @@ InsertFn = Callable[[Any, T], R]
 I = TypeVar("I", bound=union_types.AnyIdTable)
 GetId = Callable[[Any, I], Optional[base_types.TableId]]
 GetTable = Callable[[Any, base_types.TableId], I]
+GetManyTable = Callable[..., Dict[base_types.TableId, I]]
 ReturnId = Callable[[Any, I], base_types.TableId]
+ReturnManyId = Callable[[Any, Sequence[I]], List[base_types.TableId]]
 
 IdFunction = Union[GetId[I], GetTable[I], ReturnId[I]]
 
@@ -1,4 +1,5 @@
 from typing import (
+    Any,
     Mapping,
     NewType,
     Optional,
@@ -21,3 +22,9 @@ JsonDepth2 = _JsonObject[JsonDepth3]
 JSON = _JsonObject[JsonDepth2]
 
 EMPTY_JSON: JSON = {}
+
+
+def jsonDefault(value: Any) -> Any:
+    """`default` for `json.dumps()`: serializes mappings other than `dict` (e.g., `MappingProxyType`) as objects and
+    anything else `json` can't handle as its string."""
+    return dict(value) if isinstance(value, Mapping) else str(value)
@@ -0,0 +1,218 @@
+"""Async counterparts of `getEngine()`/`getConnection()`.
+
+Connection details come from the same environment dictionaries as `connection.py`. The `search_path` is the same too
+(the user's default unless the environment sets one), and SSH tunnels are shared. The default dialect uses psycopg 3,
+which is part of the "async" extra (``pip install "demeter[async]"``, which also installs greenlet for SQLAlchemy's
+asyncio extension); "postgresql+asyncpg" also works for SQLAlchemy Core use, but the functions built by
+`AsyncSQLGenerator` need psycopg 3 cursors.
+"""
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Optional,
+    Tuple,
+)
+
+import psycopg2.extras
+
+from .connection import (
+    _CACHE_LOCK,
+    POOL_MAX_OVERFLOW,
+    POOL_PRE_PING,
+    POOL_RECYCLE,
+    POOL_SIZE,
+    _get_connection_details,
+    _get_url,
+)
+from .stats import INSTRUMENT_QUERIES, instrumentEngine
+from .tunnel import TunnelKey, ssh_tunnels
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+ASYNC_DIALECT = "postgresql+psycopg"
+
+AsyncEngineKey = Tuple[str, Optional[str], str, bool]
+
+_ASYNC_ENGINES: Dict[AsyncEngineKey, "AsyncEngine"] = {}
+_ASYNC_ENGINE_TUNNELS: Dict[AsyncEngineKey, TunnelKey] = {}
+
+
+def _create_async_engine(
+    env_name: str,
+    dialect: str,
+    ssh_env_name: Optional[str],
+    pool_size: int,
+    max_overflow: int,
+    pool_pre_ping: bool,
+    pool_recycle: int,
+    instrument: bool,
+) -> Tuple["AsyncEngine", Optional[TunnelKey]]:
+    """Builds a new pooled async sqlalchemy engine (see `getAsyncEngine()` for arguments)."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    # Without a "search_path" in the environment, connections keep the user's default `search_path`, which the server
+    # applies from `pg_db_role_setting` when they start (see `getExistingSearchPathAsync()`); there's no need to look
+    # it up first with a blocking connection
+    db_fields, tunnel_key, search_path = _get_connection_details(
+        env_name,
+        psycopg2.extras.NamedTupleCursor,
+        dialect,
+        ssh_env_name,
+        query_search_path=False,
+    )
+
+    connect_args: Dict = {}
+    if search_path is not None:
+        if "asyncpg" in dialect:
+            connect_args["server_settings"] = {
+                "search_path": search_path.split("=", 1)[1]
+            }
+        else:
+            connect_args["options"] = f"-c {search_path}"
+
+    engine = create_async_engine(
+        _get_url(dialect, db_fields),
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_recycle=pool_recycle,
+    )
+    if instrument:
+        instrumentEngine(engine.sync_engine)
+    return engine, tunnel_key
+
+
+def getAsyncEngine(
+    env_name: str,
+    dialect: str = ASYNC_DIALECT,
+    ssh_env_name: str = None,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = POOL_MAX_OVERFLOW,
+    pool_pre_ping: bool = POOL_PRE_PING,
+    pool_recycle: int = POOL_RECYCLE,
+    instrument: Optional[bool] = None,
+) -> "AsyncEngine":
+    """
+    Establish an async database engine (via sqlalchemy's asyncio extension).
+
+    Behaves like `getEngine()`: the `search_path` is the user's default unless "search_path" is set in the `env_name`
+    permission dictionary, engines are cached per (`env_name`, `ssh_env_name`, `dialect`, `instrument`), and SSH
+    tunnels are shared and health-checked. Use `disposeAsyncEngines()` to drop the cached engines.
+
+    Args:
+        env_name (str): Environment key.
+        dialect (str, optional): Async database dialect to be used in creation of database connection URL. Defaults to
+        "postgresql+psycopg" (psycopg 3).
+        ssh_env_name (str, optional): The environment key that holds credentials for an SSH tunnel; setting to `None`
+        will establish a connection without use of an SSH tunnel. Defaults to None.
+        pool_size (int, optional): Number of connections to keep open in the pool. Defaults to `POOL_SIZE`.
+        max_overflow (int, optional): Number of connections allowed beyond `pool_size`. Defaults to
+        `POOL_MAX_OVERFLOW`.
+        pool_pre_ping (bool, optional): Whether to test connections for liveness on checkout. Defaults to
+        `POOL_PRE_PING`.
+        pool_recycle (int, optional): Number of seconds after which a pooled connection is replaced. Defaults to
+        `POOL_RECYCLE`.
+        instrument (bool, optional): Whether to record the statements run through SQLAlchemy (not through raw
+        psycopg 3 cursors); `None` uses `INSTRUMENT_QUERIES`. Defaults to None.
+
+    Returns:
+        AsyncEngine: The async sqlalchemy database engine.
+    """
+    if instrument is None:
+        instrument = INSTRUMENT_QUERIES
+    engine_key = (env_name, ssh_env_name, dialect, instrument)
+    with _CACHE_LOCK:
+        engine = _ASYNC_ENGINES.get(engine_key)
+        tunnel_key = _ASYNC_ENGINE_TUNNELS.get(engine_key)
+    if engine is not None:
+        if tunnel_key is not None:
+            ssh_tunnels.check(tunnel_key)
+        return engine
+
+    engine, tunnel_key = _create_async_engine(
+        env_name,
+        dialect,
+        ssh_env_name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_recycle=pool_recycle,
+        instrument=instrument,
+    )
+    with _CACHE_LOCK:
+        existing = _ASYNC_ENGINES.get(engine_key)
+        if existing is None:
+            _ASYNC_ENGINES[engine_key] = engine
+            if tunnel_key is not None:
+                _ASYNC_ENGINE_TUNNELS[engine_key] = tunnel_key
+    if existing is not None:
+        # No connection has been made yet, so the pool can be dropped synchronously
+        engine.sync_engine.dispose(close=False)
+        if tunnel_key is not None:
+            ssh_tunnels.release(tunnel_key)
+        return existing
+    return engine
+
+
+def getAsyncConnection(
+    env_name: str,
+    dialect: str = ASYNC_DIALECT,
+    ssh_env_name: str = None,
+) -> "AsyncConnection":
+    """
+    Establish an async database connection (via sqlalchemy); use as `async with getAsyncConnection(...) as conn:`.
+
+    For the functions built by `AsyncSQLGenerator`, get a psycopg 3 cursor with
+    `(await conn.get_raw_connection()).driver_connection.cursor()`.
+
+    Args:
+        env_name (str): Environment key.
+        dialect (str, optional): Async database dialect to be used in creation of database connection URL. Defaults to
+        "postgresql+psycopg" (psycopg 3).
+        ssh_env_name (str, optional): The environment key that holds credentials for an SSH tunnel; setting to `None`
+        will establish a connection without use of an SSH tunnel. Defaults to None.
+
+    Returns:
+        AsyncConnection: The async sqlalchemy database connection.
+    """
+    return getAsyncEngine(
+        env_name=env_name, dialect=dialect, ssh_env_name=ssh_env_name
+    ).connect()
+
+
+async def getExistingSearchPathAsync(conn: "AsyncConnection") -> Optional[str]:
+    """
+    `getExistingSearchPath()` through an async connection: the default `search_path` of the connecting user.
+
+    Args:
+        conn (AsyncConnection): Async sqlalchemy database connection.
+
+    Returns:
+        str: `search_path` of the connecting user (e.g., "search_path=demeter,weather,public"), or `None` if the user
+        has no default.
+    """
+    from sqlalchemy import text
+
+    stmt = """
+    SELECT rs.setconfig
+    FROM pg_db_role_setting rs
+    LEFT JOIN pg_roles r ON r.oid = rs.setrole
+    WHERE r.rolname = current_user;
+    """
+    results = (await conn.execute(text(stmt))).fetchall()
+    return results[0].setconfig[0].replace(" ", "") if len(results) != 0 else None
+
+
+async def disposeAsyncEngines() -> None:
+    """Disposes of all cached async engines and releases their SSH tunnels."""
+    with _CACHE_LOCK:
+        engines = list(_ASYNC_ENGINES.values())
+        tunnel_keys = list(_ASYNC_ENGINE_TUNNELS.values())
+        _ASYNC_ENGINES.clear()
+        _ASYNC_ENGINE_TUNNELS.clear()
+    for engine in engines:
+        await engine.dispose()
+    for tunnel_key in tunnel_keys:
+        ssh_tunnels.release(tunnel_key)
@@ -0,0 +1,260 @@
+"""Coroutine versions of the functions built by `SQLGenerator`, to run on a psycopg 3 `AsyncCursor`.
+
+The SQL text is the same (and comes from the same rendered-statement cache) as the synchronous functions; only the
+execution differs. psycopg 3 must be installed (the "async" extra: ``pip install "demeter[async]"``).
+"""
+import json
+from functools import partial
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    cast,
+)
+
+from .. import TableId
+from .._generic_types import I
+from .._json_type import jsonDefault
+from .._lookup_types import TableLookup
+from .catalog import getTableCatalogAsync
+from .generator import SQLGenerator
+from .get import (
+    renderMaybeIdStmt,
+    renderMaybeTablesStmt,
+    renderMaybeTableStmt,
+)
+from .insert import (
+    planInsertMany,
+    planMaybeIds,
+    renderInsertStmt,
+)
+from .prepare import PREPARE_STATEMENTS
+
+AsyncGetId = Callable[[Any, I], Awaitable[Optional[TableId]]]
+AsyncGetTable = Callable[[Any, TableId], Awaitable[I]]
+AsyncGetManyTable = Callable[[Any, Sequence[TableId]], Awaitable[Dict[TableId, I]]]
+AsyncReturnId = Callable[[Any, I], Awaitable[TableId]]
+AsyncReturnManyId = Callable[[Any, Sequence[I]], Awaitable[List[TableId]]]
+
+_dumps = partial(json.dumps, default=jsonDefault)
+
+
+def _params(args: Mapping[str, Any]) -> Dict[str, Any]:
+    """Wraps mapping values (e.g., `details`) for jsonb columns, which psycopg 3 doesn't adapt by default; lists are left
+    to be sent as arrays, as psycopg2 does."""
+    from psycopg.types.json import Jsonb
+
+    return {
+        k: Jsonb(v, dumps=_dumps) if isinstance(v, Mapping) else v
+        for k, v in args.items()
+    }
+
+
+def _rows(tables: Sequence[Any]) -> Any:
+    from psycopg.types.json import Json
+
+    return Json([t() for t in tables], dumps=_dumps)
+
+
+async def _execute(cursor: Any, stmt: str, args: Mapping[str, Any], prepare: bool):
+    # psycopg 3 prepares statements itself after a few executions; `prepare=True` does it right away
+    await cursor.execute(stmt, args, prepare=True if prepare else None)
+
+
+def _asdict(cursor: Any, row: Sequence[Any]) -> Dict[str, Any]:
+    return {d.name: v for d, v in zip(cursor.description, row)}
+
+
+async def getMaybeIdAsync(
+    table_name: str,
+    cursor: Any,
+    table: Any,
+    prepare: bool = False,
+) -> Optional[TableId]:
+    table_catalog = await getTableCatalogAsync(cursor, table_name)
+    stmt = renderMaybeIdStmt(table_name, table, table_catalog)
+    await _execute(cursor, stmt, _params(table()), prepare)
+    result = await cursor.fetchone()
+    if result is not None:
+        return TableId(result[0])
+    return None
+
+
+async def insertAndReturnIdAsync(
+    table_name: str,
+    cursor: Any,
+    table: Any,
+    prepare: bool = False,
+) -> TableId:
+    stmt = renderInsertStmt(table_name, table, [table_name + "_id"])
+    await _execute(cursor, stmt, _params(table()), prepare)
+    result = await cursor.fetchone()
+    return TableId(result[0])
+
+
+async def insertOrGetIdAsync(
+    get_id: AsyncGetId[I],
+    return_id: AsyncReturnId[I],
+    cursor: Any,
+    table: I,
+) -> TableId:
+    maybe_type_id = await get_id(cursor, table)
+    if maybe_type_id is not None:
+        return maybe_type_id
+    return await return_id(cursor, table)
+
+
+async def getMaybeIdsAsync(
+    table_name: str,
+    cursor: Any,
+    tables: Sequence[Any],
+    prepare: bool = False,
+) -> List[Optional[TableId]]:
+    ids: List[Optional[TableId]] = [None] * len(tables)
+    table_catalog = await getTableCatalogAsync(cursor, table_name)
+    for stmt, indexes in planMaybeIds(table_name, tables, table_catalog):
+        rows = _rows([tables[i] for i in indexes])
+        await _execute(cursor, stmt, {"rows": rows}, prepare)
+        for ordinality, found_id in await cursor.fetchall():
+            ids[indexes[ordinality - 1]] = TableId(found_id)
+    return ids
+
+
+async def insertOrGetManyAsync(
+    table_name: str,
+    cursor: Any,
+    tables: Sequence[Any],
+    prepare: bool = False,
+) -> List[TableId]:
+    ids = await getMaybeIdsAsync(table_name, cursor, tables, prepare)
+    missing = [i for i, table_id in enumerate(ids) if table_id is None]
+    if len(missing) == 0:
+        return cast(List[TableId], ids)
+
+    table_catalog = await getTableCatalogAsync(cursor, table_name)
+    for stmt, indexes in planInsertMany(table_name, tables, missing, table_catalog):
+        rows = _rows([tables[i] for i in indexes])
+        await _execute(cursor, stmt, {"rows": rows}, prepare)
+
+    found = await getMaybeIdsAsync(
+        table_name, cursor, [tables[i] for i in missing], prepare
+    )
+    for i, table_id in zip(missing, found):
+        if table_id is None:
+            raise Exception(
+                f"Failed to insert or get {tables[i]} in {table_name} (conflicts with an existing row?)"
+            )
+        ids[i] = table_id
+    return cast(List[TableId], ids)
+
+
+class AsyncSQLGenerator:
+    """Counterpart of `SQLGenerator` whose get/insert/insertOrGet functions are coroutines taking a psycopg 3
+    `AsyncCursor`.
+
+    It takes the same arguments as `SQLGenerator`, but only builds the id-table functions (`getMaybeIdFunction()`,
+    `getInsertReturnIdFunction()`, `getTableFunction()`, `getManyFunction()`, `getInsertOrGetManyFunction()` and
+    `partialInsertOrGetId()`); it isn't a `SQLGenerator`, so it can't be passed where one is expected.
+    """
+
+    def __init__(
+        self,
+        module_name: str = "demeter",
+        type_table_lookup: TableLookup = {},
+        data_table_lookup: TableLookup = {},
+        id_table_lookup: TableLookup = {},
+        key_table_lookup: TableLookup = {},
+        prepare: Optional[bool] = None,
+    ) -> None:
+        self.module_name = module_name
+        self.prepare = PREPARE_STATEMENTS if prepare is None else prepare
+        self.type_table_lookup = type_table_lookup
+        self.data_table_lookup = data_table_lookup
+        self.id_table_lookup = id_table_lookup
+        self.key_table_lookup = key_table_lookup
+
+    _fix_annotations = SQLGenerator._fix_annotations
+
+    def getInsertReturnIdFunction(self, table: Type[I]) -> AsyncReturnId[I]:
+        table_name = self.id_table_lookup[table]
+        return self._fix_annotations(
+            partial(insertAndReturnIdAsync, table_name, prepare=self.prepare),
+            table.__name__,
+        )
+
+    def getMaybeIdFunction(self, table: Type[I]) -> AsyncGetId[I]:
+        table_name = self.id_table_lookup[table]
+        return self._fix_annotations(
+            partial(getMaybeIdAsync, table_name, prepare=self.prepare), table.__name__
+        )
+
+    def getTableFunction(
+        self, table: Type[I], table_id_name: Optional[str] = None
+    ) -> AsyncGetTable[I]:
+        table_name = self.id_table_lookup[table]
+        if table_id_name is None:
+            table_id_name = "_".join([table_name, "id"])
+        stmt_table_id_name = table_id_name
+        prepare = self.prepare
+
+        async def _impl(cursor: Any, table_id: TableId) -> I:
+            stmt = renderMaybeTableStmt(table_name, stmt_table_id_name)
+            await _execute(cursor, stmt, {stmt_table_id_name: table_id}, prepare)
+            result = await cursor.fetchone()
+            if result is None:
+                raise Exception(
+                    f"No entry found for {stmt_table_id_name} = {table_id} in {table_name}"
+                )
+            table_args = _asdict(cursor, result)
+            table_args.pop(stmt_table_id_name)
+            return cast(I, table(**table_args))
+
+        return self._fix_annotations(_impl, None, table.__name__)
+
+    def getManyFunction(
+        self, table: Type[I], table_id_name: Optional[str] = None
+    ) -> AsyncGetManyTable[I]:
+        table_name = self.id_table_lookup[table]
+        if table_id_name is None:
+            table_id_name = "_".join([table_name, "id"])
+        stmt_table_id_name = table_id_name
+        prepare = self.prepare
+
+        async def _impl(cursor: Any, table_ids: Sequence[TableId]) -> Dict[TableId, I]:
+            tables: Dict[TableId, I] = {}
+            if len(table_ids) > 0:
+                stmt = renderMaybeTablesStmt(table_name, stmt_table_id_name)
+                args = {"table_ids": list(dict.fromkeys(table_ids))}
+                await _execute(cursor, stmt, args, prepare)
+                for result in await cursor.fetchall():
+                    table_args = _asdict(cursor, result)
+                    table_id = TableId(table_args.pop(stmt_table_id_name))
+                    tables[table_id] = cast(I, table(**table_args))
+            missing = [table_id for table_id in table_ids if table_id not in tables]
+            if len(missing) > 0:
+                raise Exception(
+                    f"No entry found for {stmt_table_id_name} in {missing} in {table_name}"
+                )
+            return tables
+
+        return _impl
+
+    def getInsertOrGetManyFunction(self, table: Type[I]) -> AsyncReturnManyId[I]:
+        table_name = self.id_table_lookup[table]
+        return cast(
+            AsyncReturnManyId[I],
+            partial(insertOrGetManyAsync, table_name, prepare=self.prepare),
+        )
+
+    def partialInsertOrGetId(
+        self,
+        get_id: AsyncGetId[I],
+        return_id: AsyncReturnId[I],
+    ) -> AsyncReturnId[I]:
+        return partial(insertOrGetIdAsync, get_id, return_id)
@@ -0,0 +1,136 @@
+"""Bulk loading of `db.Table` dataclasses with `COPY ... FROM STDIN`."""
+import io
+import json
+from collections.abc import Mapping
+from datetime import (
+    date,
+    datetime,
+    time,
+)
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from psycopg2.sql import Identifier
+from shapely.geometry.base import BaseGeometry
+from shapely.wkb import dumps as wkb_dumps
+
+from .._base_types import Table
+from .._json_type import jsonDefault
+from .helpers import is_optional
+from .tools import (
+    doPgFormat,
+    doPgJoin,
+    renderPg,
+)
+
+COPY_CHUNK_SIZE = 10000
+
+# Geometries are stored in WGS 84 throughout demeter
+GEOMETRY_SRID = 4326
+
+
+def _toText(value: Any) -> str:
+    """The text form of a non-NULL value, as its column's input function reads it."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    # json/jsonb columns (e.g., `details`); the insert path adapts dicts as JSON too
+    if isinstance(value, Mapping):
+        return json.dumps(value, default=jsonDefault)
+    # Array columns (e.g., `uri_parameters`), which psycopg2 sends lists as
+    if isinstance(value, (list, tuple)):
+        return _toArrayLiteral(value)
+    if isinstance(value, BaseGeometry):
+        return wkb_dumps(value, hex=True, srid=GEOMETRY_SRID)
+    return str(value)
+
+
+def _toArrayLiteral(values: Sequence[Any]) -> str:
+    """Formats a (possibly nested) sequence as an array literal, e.g. `{"a","b",NULL}`."""
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        elif isinstance(value, (list, tuple)):
+            elements.append(_toArrayLiteral(value))
+        else:
+            text = _toText(value)
+            elements.append('"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
+
+
+def _toCsvValue(value: Any) -> str:
+    """Formats one value as a CSV field; `None` is the only unquoted (i.e., NULL) field."""
+    if value is None:
+        return ""
+    return '"' + _toText(value).replace('"', '""') + '"'
+
+
+def _copyChunk(
+    cursor: Any,
+    table_name: str,
+    names: Tuple[str, ...],
+    rows: List[Table],
+) -> None:
+    stmt = doPgFormat(
+        "copy {table} ({fields}) from stdin with (format csv)",
+        table=Identifier(table_name),
+        fields=doPgJoin(",", [Identifier(n) for n in names]),
+    )
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(_toCsvValue(getattr(row, n)) for n in names))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(renderPg(stmt), buffer)
+
+
+def copyTables(
+    cursor: Any,
+    table_name: str,
+    rows: Iterable[Table],
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> int:
+    """
+    Loads `db.Table` instances into `table_name` with `COPY ... FROM STDIN` (CSV format), `chunk_size` rows at a time.
+
+    Values are converted the way `generateInsertStmt()` would send them: mappings (e.g., `details`) are serialized as
+    JSON, lists and tuples as array literals (e.g., for `text[]` columns), dates and times use ISO format, geometries
+    are sent as EWKB (SRID 4326), and `None` becomes NULL. Like `generateInsertStmt()`, optional fields that are `None`
+    are left out of the column list so that the column defaults apply; rows of a chunk are grouped by which columns they
+    omit, with one COPY per group.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        table_name (str): Name of the table to load into.
+        rows (Iterable[Table]): Instances to load; consumed lazily, so a generator keeps memory use to one chunk.
+        chunk_size (int, optional): Number of rows sent per COPY. Defaults to `COPY_CHUNK_SIZE`.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    iterator = iter(rows)
+    count = 0
+    while chunk := list(islice(iterator, chunk_size)):
+        groups: Dict[Tuple[str, ...], List[Table]] = {}
+        for row in chunk:
+            names = tuple(
+                n
+                for n in row.names()
+                if not (is_optional(row, n) and getattr(row, n) is None)
+            )
+            groups.setdefault(names, []).append(row)
+        for names, group in groups.items():
+            _copyChunk(cursor, table_name, names, group)
+        count += len(chunk)
+    return count
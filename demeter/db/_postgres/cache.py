@@ -0,0 +1,75 @@
+"""LRU cache of rendered SQL statements for the generated get/insert functions."""
+import threading
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Hashable,
+    NamedTuple,
+)
+
+STATEMENT_CACHE_SIZE = 1024
+
+
+class StatementCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class StatementCache:
+    """Thread-safe LRU mapping of statement keys to rendered SQL text, with hit/miss counters.
+
+    A key identifies everything the SQL text depends on (e.g., the kind of statement, table name, dataclass type,
+    which fields are `None`, and the returned key), so the same key always renders the same text.
+    """
+
+    def __init__(self, maxsize: int = STATEMENT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._statements: OrderedDict[Hashable, str] = OrderedDict()
+
+    def get(self, key: Hashable, build: Callable[[], str]) -> str:
+        """Gets the SQL text for `key`, calling `build()` to render it on a miss."""
+        with self._lock:
+            stmt = self._statements.get(key)
+            if stmt is not None:
+                self._statements.move_to_end(key)
+                self.hits += 1
+                return stmt
+            self.misses += 1
+
+        stmt = build()
+        with self._lock:
+            self._statements[key] = stmt
+            self._statements.move_to_end(key)
+            while len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return stmt
+
+    def info(self) -> StatementCacheInfo:
+        with self._lock:
+            return StatementCacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._statements)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+statement_cache = StatementCache()
+
+
+def getStatementCacheInfo() -> StatementCacheInfo:
+    """Hits, misses, and size of the rendered-statement cache used by the generated get/insert functions."""
+    return statement_cache.info()
+
+
+def clearStatementCache() -> None:
+    """Empties the rendered-statement cache and resets its counters."""
+    statement_cache.clear()
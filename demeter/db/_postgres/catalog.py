@@ -0,0 +1,127 @@
+"""Lookups of table metadata in the Postgres system catalogs (e.g., the natural key that `upsertAndReturnId()` uses)."""
+import threading
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+# The table's unique constraint with the fewest columns (and whether `on conflict` on it catches every duplicate), and
+# its columns that have defaults
+_TABLE_CATALOG_STMT = """
+select k.natural_key, coalesce(k.conflict_safe, false) as conflict_safe,
+array(
+  select a.attname::text
+  from pg_attribute a
+  where a.attrelid = to_regclass(%(table_name)s) and a.atthasdef and not a.attisdropped
+) as defaulted
+from (select 1) as one
+left join lateral (
+  select array(
+    select a.attname::text
+    from unnest(c.conkey) with ordinality as k(attnum, n)
+    join pg_attribute a on a.attrelid = c.conrelid and a.attnum = k.attnum
+    order by k.n
+  ) as natural_key,
+  -- A NULLS DISTINCT constraint doesn't conflict on rows that have NULL in one of its columns
+  i.indnullsnotdistinct or not exists (
+    select 1
+    from unnest(c.conkey) as k(attnum)
+    join pg_attribute a on a.attrelid = c.conrelid and a.attnum = k.attnum
+    where not a.attnotnull
+  ) as conflict_safe
+  from pg_constraint c
+  join pg_index i on i.indexrelid = c.conindid
+  where c.conrelid = to_regclass(%(table_name)s) and c.contype = 'u'
+  order by array_length(c.conkey, 1), c.conname
+  limit 1
+) as k on true
+"""
+
+
+class TableCatalog(NamedTuple):
+    # Columns of the unique constraint that identifies a row (`None` if the table has no unique constraint)
+    natural_key: Optional[Tuple[str, ...]]
+    # Columns with a default value (which an insert uses when the field is omitted)
+    defaulted: FrozenSet[str]
+    # Whether the natural key treats NULLs as equal (`NULLS NOT DISTINCT`) or has no nullable columns, so that an
+    # `on conflict` on it catches every duplicate
+    conflict_safe: bool = False
+
+
+_CATALOG_LOCK = threading.Lock()
+_TABLE_CATALOGS: Dict[Tuple[str, str], TableCatalog] = {}
+
+
+def _cacheKey(cursor: Any, table_name: str) -> Tuple[str, str]:
+    conn = cursor.connection
+    dsn = getattr(conn, "dsn", None)
+    if dsn is None:  # psycopg 3
+        dsn = conn.info.dsn
+    return dsn, table_name
+
+
+def _toTableCatalog(result: Any) -> TableCatalog:
+    natural_key, conflict_safe, defaulted = result[0], result[1], result[2]
+    return TableCatalog(
+        tuple(natural_key) if natural_key is not None else None,
+        frozenset(defaulted),
+        bool(conflict_safe),
+    )
+
+
+def getTableCatalog(cursor: Any, table_name: str) -> TableCatalog:
+    """
+    Gets the natural key and defaulted columns of `table_name` from the system catalogs.
+
+    The natural key is the columns of the table's unique constraint (e.g., the `UNIQUE NULLS NOT DISTINCT (...)`
+    constraints in schema_demeter.sql); if the table has several, the one with the fewest columns is used. The result
+    is cached per (database, table name) for the life of the process.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        table_name (str): Name of the table (resolved through the connection's `search_path`).
+
+    Returns:
+        TableCatalog: Natural key and defaulted columns of the table.
+    """
+    cache_key = _cacheKey(cursor, table_name)
+    with _CATALOG_LOCK:
+        if cache_key in _TABLE_CATALOGS:
+            return _TABLE_CATALOGS[cache_key]
+
+    cursor.execute(_TABLE_CATALOG_STMT, {"table_name": table_name})
+    table_catalog = _toTableCatalog(cursor.fetchone())
+
+    with _CATALOG_LOCK:
+        _TABLE_CATALOGS[cache_key] = table_catalog
+    return table_catalog
+
+
+async def getTableCatalogAsync(cursor: Any, table_name: str) -> TableCatalog:
+    """`getTableCatalog()` for a psycopg 3 `AsyncCursor` (sharing the same cache)."""
+    cache_key = _cacheKey(cursor, table_name)
+    with _CATALOG_LOCK:
+        if cache_key in _TABLE_CATALOGS:
+            return _TABLE_CATALOGS[cache_key]
+
+    await cursor.execute(_TABLE_CATALOG_STMT, {"table_name": table_name})
+    table_catalog = _toTableCatalog(await cursor.fetchone())
+
+    with _CATALOG_LOCK:
+        _TABLE_CATALOGS[cache_key] = table_catalog
+    return table_catalog
+
+
+def getNaturalKey(cursor: Any, table_name: str) -> Optional[Tuple[str, ...]]:
+    """The columns of the unique constraint that identifies a row of `table_name` (see `getTableCatalog()`)."""
+    return getTableCatalog(cursor, table_name).natural_key
+
+
+def clearCatalogCache() -> None:
+    """Forgets the cached table catalogs (e.g., after a schema change)."""
+    with _CATALOG_LOCK:
+        _TABLE_CATALOGS.clear()
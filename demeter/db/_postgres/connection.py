@@ -1,9 +1,11 @@
 import os
+import threading
 from ast import literal_eval
 from typing import (
     Any,
     Dict,
     Optional,
+    Tuple,
     Type,
 )
 
@@ -16,7 +18,14 @@ from sqlalchemy.engine import (
     create_engine,
 )
 from sqlalchemy.orm import Session, sessionmaker
-from sshtunnel import SSHTunnelForwarder
+from sqlalchemy.pool import NullPool
+
+from .stats import (
+    INSTRUMENT_QUERIES,
+    instrumentedCursorType,
+    instrumentEngine,
+)
+from .tunnel import TunnelKey, ssh_tunnels
 
 DB_DICT_KEYS = ("host", "port", "username", "password", "database")
 SSH_DICT_KEYS = (
@@ -26,6 +35,20 @@ SSH_DICT_KEYS = (
     "remote_bind_address",
 )
 
+# Default pool settings for cached engines (see `getEngine()`)
+POOL_SIZE = 5
+POOL_MAX_OVERFLOW = 10
+POOL_PRE_PING = True
+POOL_RECYCLE = 1800
+
+EngineKey = Tuple[str, Optional[str], str, Type[psycopg2.extensions.cursor], bool]
+SearchPathKey = Tuple[str, Optional[str], str]
+
+_CACHE_LOCK = threading.Lock()
+_ENGINES: Dict[EngineKey, Engine] = {}
+_ENGINE_TUNNELS: Dict[EngineKey, TunnelKey] = {}
+_SEARCH_PATHS: Dict[SearchPathKey, Optional[str]] = {}
+
 
 def _check_and_get_env_dictionary(
     env_name: str,
@@ -78,9 +101,13 @@ def _get_ssh_bind_port(
     ssh_username: str,
     ssh_private_key: str,
     remote_bind_address: str,
-) -> str:
+) -> Tuple[TunnelKey, str]:
     """
-    Use SSHTunnelForwarder to bind host to a local port.
+    Use the shared SSH tunnel manager to bind host to a local port.
+
+    Tunnels are shared per (`ssh_address_or_host`, `remote_bind_address`), so repeated calls reuse the running
+    forwarder instead of opening a new one. Each call takes a reference on the tunnel that must be given back with
+    `ssh_tunnels.release()` once the caller no longer needs it.
 
     Args:
         ssh_address_or_host (str): IP or hostname of REMOTE GATEWAY. It may be a two-element tuple (str, int)
@@ -91,25 +118,17 @@ def _get_ssh_bind_port(
         remote_bind_address (str): The IP of the remote side of the tunnel.
 
     Returns:
-        str: Local port after binding SHH host.
+        Tuple[TunnelKey, str]: Key of the acquired tunnel and local port after binding SHH host.
     """
-    server = SSHTunnelForwarder(
-        ssh_address_or_host=(ssh_address_or_host, 22),
-        ssh_username=ssh_username,
-        ssh_private_key=ssh_private_key,
-        remote_bind_address=(remote_bind_address, 5432),
-        set_keepalive=15,
+    return ssh_tunnels.acquire(
+        ssh_address_or_host, ssh_username, ssh_private_key, remote_bind_address
     )
-    server.daemon_forward_servers = True
-    server.start()
-    local_port = str(server.local_bind_port)
-    return local_port
 
 
 def _maybe_setup_ssh_env(
     db_fields: Dict,
     ssh_env_name: str = None,
-) -> Dict:
+) -> Tuple[Dict, Optional[TunnelKey]]:
     """
     Checks for an SSH environment key, and if exists, overwrites `db_fields["port"]` with the binded SSH port.
 
@@ -121,8 +140,10 @@ def _maybe_setup_ssh_env(
         will establish a connection without use of an SSH tunnel. Defaults to None.
 
     Returns:
-        Dict: Key/value pairs of database connection arguments, adapted for SSH tunneling if available.
+        Tuple[Dict, Optional[TunnelKey]]: Key/value pairs of database connection arguments, adapted for SSH tunneling
+        if available, and the key of the acquired SSH tunnel (`None` if no tunnel is used).
     """
+    tunnel_key = None
     if ssh_env_name:
         ssh_meta = _check_and_get_env_dictionary(
             ssh_env_name, is_required=True, required_keys=SSH_DICT_KEYS
@@ -133,53 +154,43 @@ def _maybe_setup_ssh_env(
         ssh_private_key = ssh_meta["ssh_pkey"]
         remote_bind_address = ssh_meta["remote_bind_address"]
 
-        db_fields["port"] = _get_ssh_bind_port(
+        tunnel_key, db_fields["port"] = _get_ssh_bind_port(
             ssh_address_or_host, ssh_username, ssh_private_key, remote_bind_address
         )
-    return db_fields
+    return db_fields, tunnel_key
 
 
-def getExistingSearchPath(
-    env_name: str,
-    cursor_type: Type[psycopg2.extensions.cursor] = psycopg2.extras.NamedTupleCursor,
-    dialect: str = "postgresql+psycopg2",
-    ssh_env_name: str = None,
-) -> str:
-    """
-    Gets existing `search_path` of database connection based on connecting user.
+def _get_url(dialect: str, db_fields: Dict) -> URL:
+    """Creates the database connection URL from the (possibly SSH-adapted) database connection fields."""
+    return URL.create(
+        dialect,
+        host=db_fields["host"],
+        port=db_fields["port"],
+        username=db_fields["username"],
+        password=db_fields["password"],
+        database=db_fields["database"],
+    )
 
-    Args:
-        env_name (str): Environment key.
-        cursor_type (Type[psycopg2.extensions.cursor], optional): Psycopg2 cursor type to use. Defaults to
-        `psycopg2.extras.NamedTupleCursor`.
-        dialect (str, optional): Database dialect to be used in creation of database connection URL. Defaults to
-        "postgresql+psycopg2".
-        ssh_env_name (str, optional): The environment key that holds credentials for an SSH tunnel; setting to `None`
-        will establish a connection without use of an SSH tunnel. Defaults to None.
 
-    Returns:
-        str: `search_path` for passed database connection (e.g., "search_path=demeter,weather,public").
-    """
-    # Organize connection details
-    db_env_fields = _check_and_get_env_dictionary(
-        env_name, is_required=True, required_keys=DB_DICT_KEYS
-    )
-    db_fields = _maybe_setup_ssh_env(db_env_fields, ssh_env_name)
+def _query_existing_search_path(
+    db_fields: Dict,
+    cursor_type: Type[psycopg2.extensions.cursor],
+    dialect: str,
+) -> Optional[str]:
+    """Queries `pg_db_role_setting` for the default `search_path` of the connecting user.
 
+    A `NullPool` engine is used so that the one-off connection is closed as soon as the query completes rather than
+    being held open in a pool that would never be used again.
+    """
     connect_args = {
         "cursor_factory": cursor_type,
     }
 
     # Can't use getEngine() because getEngine() needs getExistingSearchPath()
-    url_object = URL.create(
-        dialect,
-        host=db_fields["host"],
-        port=db_fields["port"],
-        username=db_fields["username"],
-        password=db_fields["password"],
-        database=db_fields["database"],
+    engine = create_engine(
+        _get_url(dialect, db_fields), connect_args=connect_args, poolclass=NullPool
     )
-    with create_engine(url_object, connect_args=connect_args).connect() as conn:
+    with engine.connect() as conn:
         stmt = """
         SELECT rs.setconfig
         FROM pg_db_role_setting rs
@@ -190,24 +201,40 @@ def getExistingSearchPath(
         args = {"username": db_fields["username"]}
         cursor.execute(stmt, args)
         results = cursor.fetchall()
+    engine.dispose()
     search_path = (
         results[0].setconfig[0].replace(" ", "") if len(results) != 0 else None
     )
     return search_path
 
 
-def getEngine(
+def _get_memoized_search_path(
+    search_path_key: SearchPathKey,
+    db_fields: Dict,
+    cursor_type: Type[psycopg2.extensions.cursor],
+    dialect: str,
+) -> Optional[str]:
+    """Gets the existing `search_path` for `search_path_key`, only querying the database the first time it is needed."""
+    with _CACHE_LOCK:
+        if search_path_key in _SEARCH_PATHS:
+            return _SEARCH_PATHS[search_path_key]
+    search_path = _query_existing_search_path(db_fields, cursor_type, dialect)
+    with _CACHE_LOCK:
+        _SEARCH_PATHS[search_path_key] = search_path
+    return search_path
+
+
+def getExistingSearchPath(
     env_name: str,
     cursor_type: Type[psycopg2.extensions.cursor] = psycopg2.extras.NamedTupleCursor,
     dialect: str = "postgresql+psycopg2",
     ssh_env_name: str = None,
-) -> Engine:
+) -> str:
     """
-    Establish a database engine (via sqlalchemy).
+    Gets existing `search_path` of database connection based on connecting user.
 
-    Search path is assumed to be the default "search_path" for the given user unless "search_path" is set
-    in the passed `env_name` permission dictionary. Any "search_path" value in the permission dictionary
-    will overwrite the default search path for created connection.
+    The result is memoized per (`env_name`, `ssh_env_name`, `dialect`) for the life of the process, so only the first
+    call for a given environment opens a connection to the database.
 
     Args:
         env_name (str): Environment key.
@@ -219,13 +246,46 @@ def getEngine(
         will establish a connection without use of an SSH tunnel. Defaults to None.
 
     Returns:
-        Engine: The sqlalchemy database engine.
+        str: `search_path` for passed database connection (e.g., "search_path=demeter,weather,public").
     """
+    search_path_key = (env_name, ssh_env_name, dialect)
+    with _CACHE_LOCK:
+        if search_path_key in _SEARCH_PATHS:
+            return _SEARCH_PATHS[search_path_key]
+
     # Organize connection details
     db_env_fields = _check_and_get_env_dictionary(
         env_name, is_required=True, required_keys=DB_DICT_KEYS
     )
-    db_fields = _maybe_setup_ssh_env(db_env_fields, ssh_env_name)
+    db_fields, tunnel_key = _maybe_setup_ssh_env(db_env_fields, ssh_env_name)
+    try:
+        return _get_memoized_search_path(
+            search_path_key, db_fields, cursor_type, dialect
+        )
+    finally:
+        if tunnel_key is not None:
+            ssh_tunnels.release(tunnel_key)
+
+
+def _get_connection_details(
+    env_name: str,
+    cursor_type: Type[psycopg2.extensions.cursor],
+    dialect: str,
+    ssh_env_name: Optional[str],
+    query_search_path: bool = True,
+) -> Tuple[Dict, Optional[TunnelKey], Optional[str]]:
+    """Reads the database (and SSH) environment and works out the `search_path` to connect with.
+
+    Returns the (possibly SSH-adapted) database connection fields, the key of the acquired SSH tunnel (if any), and
+    the `search_path` setting (e.g., "search_path=demeter,weather,public"; `None` to keep the server default). The
+    caller owns the tunnel reference. With `query_search_path=False`, the user's default `search_path` isn't looked up
+    (and `None` is returned) unless the environment sets one.
+    """
+    # Organize connection details
+    db_env_fields = _check_and_get_env_dictionary(
+        env_name, is_required=True, required_keys=DB_DICT_KEYS
+    )
+    db_fields, tunnel_key = _maybe_setup_ssh_env(db_env_fields, ssh_env_name)
 
     if "search_path" in db_fields.keys():
         search_path_arg = db_fields["search_path"]
@@ -239,11 +299,43 @@ def getEngine(
         search_path_str = ",".join(search_path_list)
         search_path = f"search_path={search_path_str}"
 
+    elif not query_search_path:
+        search_path = None
+
     else:  # get existing search_path and combine with whatever is in db_fields["schema_name"] (if anything)
-        search_path = getExistingSearchPath(
-            env_name, cursor_type, dialect, ssh_env_name
-        )
+        try:
+            search_path = _get_memoized_search_path(
+                (env_name, ssh_env_name, dialect), db_fields, cursor_type, dialect
+            )
+        except Exception:
+            if tunnel_key is not None:
+                ssh_tunnels.release(tunnel_key)
+            raise
+    return db_fields, tunnel_key, search_path
 
+
+def _create_engine(
+    env_name: str,
+    cursor_type: Type[psycopg2.extensions.cursor],
+    dialect: str,
+    ssh_env_name: Optional[str],
+    pool_size: int,
+    max_overflow: int,
+    pool_pre_ping: bool,
+    pool_recycle: int,
+    instrument: bool,
+) -> Tuple[Engine, Optional[TunnelKey]]:
+    """Builds a new pooled sqlalchemy engine for the given environment (see `getEngine()` for arguments).
+
+    Also returns the key of the SSH tunnel the engine connects through (if any); the engine holds a reference on that
+    tunnel until it is released.
+    """
+    db_fields, tunnel_key, search_path = _get_connection_details(
+        env_name, cursor_type, dialect, ssh_env_name
+    )
+
+    if instrument and "psycopg2" in dialect:
+        cursor_type = instrumentedCursorType(cursor_type)
     connect_args = {
         "options": f"-c {search_path}",  # overwrites search path, but gets according to getExistingSearchPath()
         "cursor_factory": cursor_type,
@@ -252,16 +344,122 @@ def getEngine(
         if "options" in connect_args:
             del connect_args["options"]
 
-    url_object = URL.create(
-        dialect,
-        host=db_fields["host"],
-        port=db_fields["port"],
-        username=db_fields["username"],
-        password=db_fields["password"],
-        database=db_fields["database"],
+    engine = create_engine(
+        _get_url(dialect, db_fields),
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_recycle=pool_recycle,
     )
+    if instrument and "psycopg2" not in dialect:
+        instrumentEngine(engine)
+    return engine, tunnel_key
+
+
+def getEngine(
+    env_name: str,
+    cursor_type: Type[psycopg2.extensions.cursor] = psycopg2.extras.NamedTupleCursor,
+    dialect: str = "postgresql+psycopg2",
+    ssh_env_name: str = None,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = POOL_MAX_OVERFLOW,
+    pool_pre_ping: bool = POOL_PRE_PING,
+    pool_recycle: int = POOL_RECYCLE,
+    instrument: Optional[bool] = None,
+) -> Engine:
+    """
+    Establish a database engine (via sqlalchemy).
 
-    return create_engine(url_object, connect_args=connect_args)
+    Search path is assumed to be the default "search_path" for the given user unless "search_path" is set
+    in the passed `env_name` permission dictionary. Any "search_path" value in the permission dictionary
+    will overwrite the default search path for created connection.
+
+    Engines are cached for the life of the process and keyed on (`env_name`, `ssh_env_name`, `dialect`,
+    `cursor_type`, `instrument`), so repeated calls return the same pooled engine rather than re-reading the
+    environment and opening new connections. The pool arguments are only applied when the engine for a key is first created; use
+    `disposeEngines()` to drop the cached engines (e.g., after forking or to apply new pool settings).
+
+    When `ssh_env_name` is set, engines share one SSH tunnel per (gateway, remote_bind_address). The tunnel is
+    health-checked each time its engine is handed out and restarted on the same local port if it has died.
+
+    With `instrument`, every statement run on the engine's connections (including through raw cursors) is recorded
+    per statement fingerprint; see `demeter.db.stats()`.
+
+    Args:
+        env_name (str): Environment key.
+        cursor_type (Type[psycopg2.extensions.cursor], optional): Psycopg2 cursor type to use. Defaults to
+        `psycopg2.extras.NamedTupleCursor`.
+        dialect (str, optional): Database dialect to be used in creation of database connection URL. Defaults to
+        "postgresql+psycopg2".
+        ssh_env_name (str, optional): The environment key that holds credentials for an SSH tunnel; setting to `None`
+        will establish a connection without use of an SSH tunnel. Defaults to None.
+        pool_size (int, optional): Number of connections to keep open in the pool. Defaults to `POOL_SIZE`.
+        max_overflow (int, optional): Number of connections allowed beyond `pool_size`. Defaults to
+        `POOL_MAX_OVERFLOW`.
+        pool_pre_ping (bool, optional): Whether to test connections for liveness on checkout. Defaults to
+        `POOL_PRE_PING`.
+        pool_recycle (int, optional): Number of seconds after which a pooled connection is replaced. Defaults to
+        `POOL_RECYCLE`.
+        instrument (bool, optional): Whether to record call counts, rows, and latencies of the engine's statements;
+        `None` uses `INSTRUMENT_QUERIES` (set by the DEMETER_INSTRUMENT_QUERIES or DEMETER_QUERY_STATS_FILE
+        environment variables). Defaults to None.
+
+    Returns:
+        Engine: The sqlalchemy database engine.
+    """
+    if instrument is None:
+        instrument = INSTRUMENT_QUERIES
+    engine_key = (env_name, ssh_env_name, dialect, cursor_type, instrument)
+    with _CACHE_LOCK:
+        engine = _ENGINES.get(engine_key)
+        tunnel_key = _ENGINE_TUNNELS.get(engine_key)
+    if engine is not None:
+        if tunnel_key is not None:
+            ssh_tunnels.check(tunnel_key)
+        return engine
+
+    engine, tunnel_key = _create_engine(
+        env_name,
+        cursor_type,
+        dialect,
+        ssh_env_name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=pool_pre_ping,
+        pool_recycle=pool_recycle,
+        instrument=instrument,
+    )
+    with _CACHE_LOCK:
+        # Another thread may have created the engine while this one was connecting
+        existing = _ENGINES.get(engine_key)
+        if existing is None:
+            _ENGINES[engine_key] = engine
+            if tunnel_key is not None:
+                _ENGINE_TUNNELS[engine_key] = tunnel_key
+    if existing is not None:
+        engine.dispose()
+        if tunnel_key is not None:
+            ssh_tunnels.release(tunnel_key)
+        return existing
+    return engine
+
+
+def disposeEngines() -> None:
+    """Disposes of all cached engines, releases their SSH tunnels, and forgets any memoized `search_path` values.
+
+    The next call to `getEngine()` (or `getConnection()`/`getSession()`) will build a new engine from the environment.
+    """
+    with _CACHE_LOCK:
+        engines = list(_ENGINES.values())
+        tunnel_keys = list(_ENGINE_TUNNELS.values())
+        _ENGINES.clear()
+        _ENGINE_TUNNELS.clear()
+        _SEARCH_PATHS.clear()
+    for engine in engines:
+        engine.dispose()
+    for tunnel_key in tunnel_keys:
+        ssh_tunnels.release(tunnel_key)
 
 
 def getConnection(
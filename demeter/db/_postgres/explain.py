@@ -0,0 +1,69 @@
+"""EXPLAIN-based check that the generated `getMaybe<Type>Id` lookups can be answered from an index."""
+import json
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    NamedTuple,
+    Tuple,
+)
+
+from .._union_types import AnyIdTable
+from .catalog import getTableCatalog
+from .get import renderMaybeIdStmt
+
+
+class LookupPlan(NamedTuple):
+    table_name: str
+    stmt: str
+    # How each scan of `table_name` in the plan is done (e.g., "Index Scan using field_name_..._key")
+    scans: Tuple[str, ...]
+    uses_index: bool
+
+
+def _planNodes(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _planNodes(child)
+
+
+def explainMaybeId(cursor: Any, table_name: str, table: AnyIdTable) -> LookupPlan:
+    """
+    Runs EXPLAIN on the statement `getMaybeId()` would run for `table` and reports how `table_name` is scanned.
+
+    Sequential scans are disabled while explaining, so that small (e.g., freshly created) tables are still planned
+    with an index when one applies; a "Seq Scan" in the plan therefore means that no index matches the lookup. The
+    setting is made with SET LOCAL inside a savepoint that is rolled back afterwards, so it doesn't outlive the call
+    and an error doesn't get masked by a failed reset; the cursor must therefore be in a transaction (i.e., not in
+    autocommit mode).
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        table_name (str): Name of the table that `table` is stored in.
+        table (AnyIdTable): Example object; the statement depends on which of its fields are `None`.
+
+    Returns:
+        LookupPlan: The statement, the scans of `table_name` in its plan, and whether they all use an index.
+    """
+    stmt = renderMaybeIdStmt(table_name, table, getTableCatalog(cursor, table_name))
+    cursor.execute("savepoint explain_maybe_id")
+    try:
+        cursor.execute("set local enable_seqscan = off")
+        cursor.execute("explain (format json) " + stmt, table())
+        result = cursor.fetchone()[0]
+    finally:
+        # Also undoes the SET LOCAL, which would otherwise last until the end of the transaction
+        cursor.execute("rollback to savepoint explain_maybe_id")
+        cursor.execute("release savepoint explain_maybe_id")
+
+    if isinstance(result, str):
+        result = json.loads(result)
+    scans = []
+    for node in _planNodes(result[0]["Plan"]):
+        if node.get("Relation Name") == table_name:
+            scan = node["Node Type"]
+            if "Index Name" in node:
+                scan += " using " + node["Index Name"]
+            scans.append(scan)
+    uses_index = len(scans) > 0 and all(s != "Seq Scan" for s in scans)
+    return LookupPlan(table_name, stmt, tuple(scans), uses_index)
@@ -1,8 +1,12 @@
+import logging
 from functools import partial, wraps
 from typing import (
     Any,
     Callable,
+    Dict,
+    List,
     Optional,
+    Sequence,
     Type,
     TypeVar,
     cast,
@@ -12,33 +16,58 @@ from .. import TableId
 from .._generic_types import (
     SK,
     GetId,
+    GetManyTable,
     GetTableByKey,
     I,
     ReturnId,
     ReturnKey,
+    ReturnManyId,
     ReturnSameKey,
     S,
     T,
 )
 from .._lookup_types import TableLookup
 from .._union_types import AnyIdTable
+from .explain import LookupPlan, explainMaybeId
 from .get import (
+    getIdentityMap,
     getMaybeId,
     getMaybeTable,
     getMaybeTableByKey,
+    getMaybeTables,
 )
 from .insert import (
     insertAndReturnId,
     insertAndReturnKey,
     insertOrGetId,
     insertOrGetKey,
+    insertOrGetMany,
+    upsertAndReturnId,
+)
+from .prepare import PREPARE_STATEMENTS
+from .type_cache import (
+    CACHE_TYPES,
+    TYPE_CACHE_TTL,
+    getMaybeIdCached,
+    returnIdAndCache,
 )
 
 C = TypeVar("C")
 
 
 class SQLGenerator:
-    """Constructor for functions that communicate between Demeter types and SQL database (i.e., "get" or "insert" functions)"""
+    """Constructor for functions that communicate between Demeter types and SQL database (i.e., "get" or "insert" functions)
+
+    With `prepare=True`, the generated get/insert functions `PREPARE` each statement once per database session and
+    then run it with `EXECUTE`, so Postgres doesn't re-plan identical statements during bulk loads. When `prepare` is
+    `None`, the `DEMETER_PREPARE_STATEMENTS` environment variable decides (off by default). Don't enable this behind a
+    connection pooler in transaction mode (e.g., pgbouncer), which doesn't keep prepared statements per client.
+
+    With `cache_types=True`, the getMaybe/insert/upsert functions of the types in `type_table_lookup` cache the ids
+    they look up or insert per connection, and across connections for `type_cache_ttl` seconds if it is set (see
+    type_cache.py). When `None`, the `DEMETER_CACHE_TYPES` and `DEMETER_TYPE_CACHE_TTL` environment variables decide
+    (off by default).
+    """
 
     def __init__(
         self,
@@ -47,8 +76,16 @@ class SQLGenerator:
         data_table_lookup: TableLookup = {},
         id_table_lookup: TableLookup = {},
         key_table_lookup: TableLookup = {},
+        prepare: Optional[bool] = None,
+        cache_types: Optional[bool] = None,
+        type_cache_ttl: Optional[float] = None,
     ) -> None:
         self.module_name = module_name
+        self.prepare = PREPARE_STATEMENTS if prepare is None else prepare
+        self.cache_types = CACHE_TYPES if cache_types is None else cache_types
+        self.type_cache_ttl = (
+            TYPE_CACHE_TTL if type_cache_ttl is None else type_cache_ttl
+        )
         self.type_table_lookup = type_table_lookup
         self.data_table_lookup = data_table_lookup
         self.id_table_lookup = id_table_lookup
@@ -70,16 +107,40 @@ class SQLGenerator:
             c.__annotations__["return"] = self.module_name + "." + r
         return c
 
+    def _cachesIds(self, table: Type[Any]) -> bool:
+        return self.cache_types and table in self.type_table_lookup
+
+    def _returnIdFunction(
+        self, table: Type[I], return_id: Callable[..., TableId]
+    ) -> ReturnId[I]:
+        table_name = self.id_table_lookup[table]
+        if self._cachesIds(table):
+            fn = partial(
+                returnIdAndCache,
+                return_id,
+                table_name,
+                prepare=self.prepare,
+                ttl=self.type_cache_ttl,
+            )
+        else:
+            fn = partial(return_id, table_name, prepare=self.prepare)
+        return self._fix_annotations(fn, table.__name__)
+
     def getInsertReturnIdFunction(self, table: Type[I]) -> ReturnId[I]:
         """Takes db.Table type, identifies SQL table name, inserts object into table, and returns TableId"""
-        table_name = self.id_table_lookup[table]
-        return self._fix_annotations(
-            partial(insertAndReturnId, table_name), table.__name__
-        )
+        return self._returnIdFunction(table, insertAndReturnId)
+
+    def getUpsertReturnIdFunction(self, table: Type[I]) -> ReturnId[I]:
+        """Takes db.Table type, identifies SQL table name, and returns a function that inserts the object or gets the
+        row with the same natural key (the table's unique constraint) in one statement, returning its TableId
+        """
+        return self._returnIdFunction(table, upsertAndReturnId)
 
     def getInsertReturnSameKeyFunction(self, table: Type[SK]) -> ReturnSameKey[SK]:
         table_name = self.key_table_lookup[table]
-        fn = cast(ReturnSameKey[SK], insertAndReturnKey(table_name, table))
+        fn = cast(
+            ReturnSameKey[SK], insertAndReturnKey(table_name, table, self.prepare)
+        )
         n = table.__name__
         return self._fix_annotations(fn, n, n)
 
@@ -88,7 +149,7 @@ class SQLGenerator:
     ) -> ReturnKey[S, SK]:
         """Takes db.Table type which is a KeyTable, identifies SQl table name, inserts the key, and returns TableKey."""
         table_name = self.key_table_lookup[table]
-        fn = cast(ReturnKey[S, SK], insertAndReturnKey(table_name, key))
+        fn = cast(ReturnKey[S, SK], insertAndReturnKey(table_name, key, self.prepare))
         return self._fix_annotations(fn, table.__name__, key.__name__)
 
     def getMaybeIdFunction(
@@ -97,7 +158,37 @@ class SQLGenerator:
         """Takes db.Table type, identifies appropriate table, checks for object in table, maybe inserts, and then
         returns TableId"""
         table_name = self.id_table_lookup[table]
-        return self._fix_annotations(partial(getMaybeId, table_name), table.__name__)
+        if self._cachesIds(table):
+            return self._fix_annotations(
+                partial(
+                    getMaybeIdCached,
+                    table_name,
+                    prepare=self.prepare,
+                    ttl=self.type_cache_ttl,
+                ),
+                table.__name__,
+            )
+        return self._fix_annotations(
+            partial(getMaybeId, table_name, prepare=self.prepare), table.__name__
+        )
+
+    def explainLookups(
+        self, cursor: Any, tables: Sequence[AnyIdTable]
+    ) -> List[LookupPlan]:
+        """Runs `explainMaybeId()` for the getMaybeId lookup of each object in `tables` (one per type and `None`-pattern
+        is enough), and logs a warning for each lookup that can't use an index"""
+        plans = []
+        for t in tables:
+            plan = explainMaybeId(cursor, self.id_table_lookup[type(t)], t)
+            if not plan.uses_index:
+                logging.warning(
+                    "Lookup in %s doesn't use an index (%s): %s",
+                    plan.table_name,
+                    ", ".join(plan.scans),
+                    plan.stmt,
+                )
+            plans.append(plan)
+        return plans
 
     def getMaybeTableById(
         self,
@@ -107,7 +198,7 @@ class SQLGenerator:
         table_id: TableId,
     ) -> Optional[I]:
         table_name = self.id_table_lookup[table_type]
-        table = getMaybeTable(table_name, table_id_name, table_id, cursor)
+        table = getMaybeTable(table_name, table_id_name, table_id, cursor, self.prepare)
         if table is None:
             return None
         table_args = {k: v for k, v in table._asdict().items() if k != table_id_name}
@@ -147,6 +238,67 @@ class SQLGenerator:
 
         return self._fix_annotations(_impl, None, table.__name__)
 
+    def getTablesByIds(
+        self,
+        table_type: Type[I],
+        table_id_name: str,
+        cursor: Any,
+        table_ids: Sequence[TableId],
+        use_identity_map: bool = False,
+    ) -> Dict[TableId, I]:
+        table_name = self.id_table_lookup[table_type]
+        identity_map = getIdentityMap(cursor) if use_identity_map else {}
+
+        tables: Dict[TableId, I] = {}
+        to_fetch: Dict[TableId, None] = {}  # ordered set
+        for table_id in table_ids:
+            cached = identity_map.get((table_name, table_id))
+            if cached is not None:
+                tables[table_id] = cached
+            else:
+                to_fetch[table_id] = None
+
+        results = getMaybeTables(
+            table_name, table_id_name, list(to_fetch), cursor, self.prepare
+        )
+        for table_id, result in results.items():
+            table_args = {
+                k: v for k, v in result._asdict().items() if k != table_id_name
+            }
+            table = cast(I, table_type(**table_args))
+            tables[table_id] = table
+            if use_identity_map:
+                identity_map[(table_name, table_id)] = table
+
+        missing = [table_id for table_id in table_ids if table_id not in tables]
+        if len(missing) > 0:
+            raise Exception(
+                f"No entry found for {table_id_name} in {missing} in {table_name}"
+            )
+        return tables
+
+    def getManyFunction(
+        self, table: Type[I], table_id_name: Optional[str] = None
+    ) -> GetManyTable[I]:
+        """Takes db.Table type and returns a function that gets the objects for many TableIds in one statement, as a
+        dict of TableId to object. With `use_identity_map=True`, objects already fetched through the same cursor are
+        reused instead of being queried again."""
+        table_name = self.id_table_lookup[table]
+        if table_id_name is None:
+            table_id_name = "_".join([table_name, "id"])
+
+        __impl_table_id_name = table_id_name
+
+        @wraps(self.getTablesByIds)
+        def _impl(
+            cursor: Any, table_ids: Sequence[TableId], use_identity_map: bool = False
+        ) -> Dict[TableId, I]:
+            return self.getTablesByIds(
+                table, __impl_table_id_name, cursor, table_ids, use_identity_map
+            )
+
+        return _impl
+
     def getTableByKeyFunction(
         self,
         table: Type[S],
@@ -165,6 +317,14 @@ class SQLGenerator:
     ) -> ReturnId[I]:
         return partial(insertOrGetId, get_id, return_id)
 
+    def getInsertOrGetManyFunction(self, table: Type[I]) -> ReturnManyId[I]:
+        """Takes db.Table type, identifies SQL table name, gets or inserts a sequence of objects in a bounded number of
+        statements, and returns their TableIds in input order"""
+        table_name = self.id_table_lookup[table]
+        return cast(
+            ReturnManyId[I], partial(insertOrGetMany, table_name, prepare=self.prepare)
+        )
+
     def partialInsertOrGetKey(
         self,
         key_type: Type[SK],
@@ -1,38 +1,45 @@
-from collections import OrderedDict
 from typing import (
     Any,
+    Dict,
+    Hashable,
     NamedTuple,
     Optional,
+    Sequence,
     Tuple,
     cast,
 )
+from weakref import WeakKeyDictionary
 
-from psycopg2.sql import Identifier, Placeholder
+from psycopg2.sql import (
+    Composed,
+    Identifier,
+    Placeholder,
+)
 
 from .. import TableId
 from .._generic_types import SK, S
 from .._union_types import AnyIdTable
-from .helpers import is_none, is_optional
-from .tools import doPgFormat, doPgJoin
+from .cache import statement_cache
+from .catalog import TableCatalog, getTableCatalog
+from .helpers import match_conditions
+from .prepare import execute
+from .tools import (
+    doPgFormat,
+    doPgJoin,
+    renderPg,
+)
 
 
-def getMaybeId(
+def generateMaybeIdStmt(
     table_name: str,
-    cursor: Any,
     table: AnyIdTable,
-) -> Optional[TableId]:
-    field_names = table.names()
-    names_to_fields = OrderedDict({name: Identifier(name) for name in field_names})
-
+    table_catalog: Optional[TableCatalog] = None,
+) -> Composed:
+    """Selects the id of the row that matches `table` on the columns of `match_conditions()` ("=" or "IS NULL")."""
     conditions = []
-    for n in names_to_fields:
-        if is_optional(table, n):
-            continue
-
-        if is_none(table, n):
-            conditions = conditions + [
-                doPgJoin(" IS ", [Identifier(n), Placeholder(n)])
-            ]
+    for n, value_is_none in match_conditions(table, table_catalog):
+        if value_is_none:
+            conditions = conditions + [doPgFormat("{0} IS NULL", Identifier(n))]
         else:
             conditions = conditions + [doPgJoin(" = ", [Identifier(n), Placeholder(n)])]
 
@@ -43,34 +50,123 @@ def getMaybeId(
         Identifier(table_name),
         doPgJoin(" and ", conditions),
     )
+    return stmt
+
+
+def renderMaybeIdStmt(
+    table_name: str,
+    table: AnyIdTable,
+    table_catalog: Optional[TableCatalog] = None,
+) -> str:
+    """`generateMaybeIdStmt()` rendered to text, cached per (table_name, type, compared columns and NULL-pattern)."""
+    key = ("get_id", table_name, type(table), match_conditions(table, table_catalog))
+    return statement_cache.get(
+        key, lambda: renderPg(generateMaybeIdStmt(table_name, table, table_catalog))
+    )
 
+
+def getMaybeId(
+    table_name: str,
+    cursor: Any,
+    table: AnyIdTable,
+    prepare: bool = False,
+) -> Optional[TableId]:
+    stmt = renderMaybeIdStmt(table_name, table, getTableCatalog(cursor, table_name))
     args = table()
-    cursor.execute(stmt, args)
+    execute(cursor, stmt, args, prepare)
     result = cursor.fetchone()
     if result is not None:
         return TableId(result[0])
     return None
 
 
+def renderMaybeTableStmt(table_name: str, table_id_name: str) -> str:
+    """Cached text of the statement that selects the row of `table_name` with a given `table_id_name`."""
+
+    def build() -> str:
+        condition = doPgJoin(
+            " = ", [Identifier(table_id_name), Placeholder(table_id_name)]
+        )
+        stmt = doPgFormat(
+            "select * from {0} where {1}",
+            Identifier(table_name),
+            condition,
+        )
+        return renderPg(stmt)
+
+    return statement_cache.get(("get_table", table_name, table_id_name), build)
+
+
+def renderMaybeTablesStmt(table_name: str, table_id_name: str) -> str:
+    """Cached text of the statement that selects the rows of `table_name` whose `table_id_name` is in "table_ids"."""
+
+    def build() -> str:
+        stmt = doPgFormat(
+            "select * from {0} where {1} = any({2})",
+            Identifier(table_name),
+            Identifier(table_id_name),
+            Placeholder("table_ids"),
+        )
+        return renderPg(stmt)
+
+    return statement_cache.get(("get_tables", table_name, table_id_name), build)
+
+
 def getMaybeTable(
     table_name: str,
     table_id_name: str,
     table_id: TableId,
     cursor: Any,
+    prepare: bool = False,
 ) -> Optional[NamedTuple]:
-    condition = doPgJoin(" = ", [Identifier(table_id_name), Placeholder(table_id_name)])
-    stmt = doPgFormat(
-        "select * from {0} where {1}",
-        Identifier(table_name),
-        condition,
-    )
-    cursor.execute(stmt, {table_id_name: table_id})
+    stmt = renderMaybeTableStmt(table_name, table_id_name)
+    execute(cursor, stmt, {table_id_name: table_id}, prepare)
     result = cursor.fetchone()
     if result is not None:
         return cast(NamedTuple, result)
     return None
 
 
+def getMaybeTables(
+    table_name: str,
+    table_id_name: str,
+    table_ids: Sequence[TableId],
+    cursor: Any,
+    prepare: bool = False,
+) -> Dict[TableId, NamedTuple]:
+    """Batched `getMaybeTable()`: gets the rows for `table_ids` in one statement, keyed by id (missing ids are left out)."""
+    if len(table_ids) == 0:
+        return {}
+    stmt = renderMaybeTablesStmt(table_name, table_id_name)
+    execute(cursor, stmt, {"table_ids": list(table_ids)}, prepare)
+    results = cursor.fetchall()
+    return {
+        TableId(getattr(result, table_id_name)): cast(NamedTuple, result)
+        for result in results
+    }
+
+
+_IDENTITY_MAPS: "WeakKeyDictionary[Any, Dict[Hashable, Any]]" = WeakKeyDictionary()
+
+
+def getIdentityMap(cursor: Any) -> Dict[Hashable, Any]:
+    """Gets the identity map (objects already fetched, keyed by (table name, id)) for `cursor`.
+
+    The map lives as long as the cursor, so use one cursor per transaction, or call `clearIdentityMap()` after
+    updating rows that may already be in it.
+    """
+    identity_map = _IDENTITY_MAPS.get(cursor)
+    if identity_map is None:
+        identity_map = {}
+        _IDENTITY_MAPS[cursor] = identity_map
+    return identity_map
+
+
+def clearIdentityMap(cursor: Any) -> None:
+    """Forgets the objects already fetched through `cursor` (see `getIdentityMap()`)."""
+    _IDENTITY_MAPS.pop(cursor, None)
+
+
 def getMaybeTableByKey(
     table_name: str,
     cursor: Any,
@@ -1,10 +1,11 @@
-import datetime
 from typing import (
-    Union,
-    get_args,
-    get_origin,
+    FrozenSet,
+    Optional,
+    Tuple,
 )
 
+from demeter.db._base_types import tableMeta
+from demeter.db._postgres.catalog import TableCatalog
 from demeter.db._union_types import AnyTable
 
 
@@ -13,12 +14,41 @@ def is_none(table: AnyTable, key: str) -> bool:
 
 
 def is_optional(table: AnyTable, key: str) -> bool:
-    f = table.__dataclass_fields__[key]
-    t = f.type
-    return (get_origin(t) is Union and type(None) in get_args(t)) or f.hash is False
+    return key in tableMeta(table).optional
 
 
 def is_date_or_time(table: AnyTable, key: str) -> bool:
-    f = table.__dataclass_fields__[key]
-    t = f.type
-    return t in [datetime.time, datetime.date]
+    return key in tableMeta(table).date_or_time
+
+
+def none_mask(table: AnyTable) -> Tuple[bool, ...]:
+    """Which fields of `table` are `None`, in field order (the part of a generated statement that varies by value)."""
+    return tuple(getattr(table, n) is None for n in tableMeta(table).names)
+
+
+def match_conditions(
+    table: AnyTable,
+    table_catalog: Optional[TableCatalog] = None,
+) -> Tuple[Tuple[str, bool], ...]:
+    """The (column, is NULL) pairs that a lookup of `table` compares, in field order.
+
+    These are the non-optional fields plus the columns of the table's natural key, so that the lookup can use the
+    unique index behind that key: each column is compared with "=", or with "IS NULL" when its value is `None` (which
+    matches `UNIQUE NULLS NOT DISTINCT`). An optional natural-key field that is `None` is left out if the column has a
+    default, because an insert of `table` would have stored the default rather than NULL.
+    """
+    meta = tableMeta(table)
+    natural_key: Tuple[str, ...] = ()
+    defaulted: FrozenSet[str] = frozenset()
+    if table_catalog is not None:
+        natural_key = table_catalog.natural_key or ()
+        defaulted = table_catalog.defaulted
+
+    conditions = []
+    for n in meta.names:
+        value_is_none = getattr(table, n) is None
+        if n in meta.optional:
+            if n not in natural_key or (value_is_none and n in defaulted):
+                continue
+        conditions.append((n, value_is_none))
+    return tuple(conditions)
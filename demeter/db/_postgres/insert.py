@@ -1,14 +1,19 @@
+import json
 from collections import OrderedDict
+from functools import partial
 from typing import (
     Any,
     Dict,
+    List,
     Optional,
     Sequence,
+    Tuple,
     Type,
     cast,
 )
 
 from psycopg2 import sql
+from psycopg2.extras import Json
 from psycopg2.sql import (
     SQL,
     Composed,
@@ -17,6 +22,7 @@ from psycopg2.sql import (
 )
 
 from demeter.db import TableId
+from demeter.db._base_types import tableMeta
 from demeter.db._generic_types import (
     SK,
     GetId,
@@ -26,8 +32,20 @@ from demeter.db._generic_types import (
     ReturnKey,
     S,
 )
-from demeter.db._postgres.helpers import is_none, is_optional
-from demeter.db._postgres.tools import doPgFormat, doPgJoin
+from demeter.db._postgres.cache import statement_cache
+from demeter.db._postgres.catalog import TableCatalog, getTableCatalog
+from demeter.db._postgres.helpers import (
+    is_none,
+    is_optional,
+    match_conditions,
+    none_mask,
+)
+from demeter.db._postgres.prepare import execute
+from demeter.db._postgres.tools import (
+    doPgFormat,
+    doPgJoin,
+    renderPg,
+)
 from demeter.db._union_types import (
     AnyIdTable,
     AnyKeyTable,
@@ -66,22 +84,158 @@ def generateInsertStmt(
     return stmt
 
 
+def renderInsertStmt(
+    table_name: str,
+    table: AnyTable,
+    return_key: Optional[Sequence[str]],
+) -> str:
+    """`generateInsertStmt()` rendered to text, cached per (table_name, type, NULL-pattern, return_key)."""
+    key = (
+        "insert",
+        table_name,
+        type(table),
+        none_mask(table),
+        None if return_key is None else tuple(return_key),
+    )
+    return statement_cache.get(
+        key, lambda: renderPg(generateInsertStmt(table_name, table, return_key))
+    )
+
+
 def insertAndReturnId(
     table_name: str,
     cursor: Any,
     table: AnyIdTable,
+    prepare: bool = False,
 ) -> TableId:
     table_id = table_name + "_id"
     return_key = [table_id]
-    stmt = generateInsertStmt(table_name, table, return_key)
-    cursor.execute(stmt, table())
+    stmt = renderInsertStmt(table_name, table, return_key)
+    execute(cursor, stmt, table(), prepare)
     result = cursor.fetchone()
     return TableId(result[0])
 
 
+# Columns that an upsert never overwrites on an existing row
+_UPSERT_KEEP = ("created", "last_updated")
+
+
+def generateUpsertStmt(
+    table_name: str,
+    table: AnyIdTable,
+    table_catalog: TableCatalog,
+    return_key: Sequence[str],
+) -> Composed:
+    """`generateInsertStmt()` with an `on conflict ({natural key}) do update` clause, so that the row that already has
+    the same natural key is updated and returned instead of raising a unique violation.
+
+    The update only runs (and only bumps `last_updated`) when one of the inserted columns differs from the existing
+    row. When it doesn't, the insert returns nothing and the existing row's id comes from the second branch of the
+    statement, which looks the row up by its natural key.
+    """
+    conflict_names = cast(Tuple[str, ...], table_catalog.natural_key)
+    inserted = [
+        n for n in table.names() if not (is_optional(table, n) and is_none(table, n))
+    ]
+    to_update = [
+        n for n in inserted if n not in conflict_names and n not in _UPSERT_KEEP
+    ]
+    if len(to_update) > 0:
+        on_conflict = doPgFormat(
+            "do update set {assignments} where ({current}) is distinct from ({excluded})",
+            assignments=doPgJoin(
+                ",",
+                [SQL("{0} = excluded.{0}").format(Identifier(n)) for n in to_update],
+            ),
+            current=doPgJoin(
+                ",",
+                [
+                    SQL("{0}.{1}").format(Identifier(table_name), Identifier(n))
+                    for n in to_update
+                ],
+            ),
+            excluded=doPgJoin(
+                ",", [SQL("excluded.{0}").format(Identifier(n)) for n in to_update]
+            ),
+        )
+    else:
+        on_conflict = SQL("do nothing")
+
+    key_conditions = []
+    for n in conflict_names:
+        if not is_none(table, n):
+            key_conditions.append(
+                SQL("{0} = {1}").format(Identifier(n), Placeholder(n))
+            )
+        elif n not in table_catalog.defaulted or not is_optional(table, n):
+            key_conditions.append(SQL("{0} is null").format(Identifier(n)))
+
+    stmt = doPgFormat(
+        """
+        with U as (
+          {insert} on conflict ({conflict}) {on_conflict} returning {returning}
+        )
+        select {returning} from U
+        union all
+        select {returning} from {table} where {key_conditions}
+        limit 1
+        """,
+        insert=generateInsertStmt(table_name, table, None),
+        conflict=doPgJoin(",", [Identifier(n) for n in conflict_names]),
+        on_conflict=on_conflict,
+        returning=doPgJoin(",", [Identifier(k) for k in return_key]),
+        table=Identifier(table_name),
+        key_conditions=doPgJoin(" and ", key_conditions),
+    )
+    return stmt
+
+
+def upsertAndReturnId(
+    table_name: str,
+    cursor: Any,
+    table: AnyIdTable,
+    prepare: bool = False,
+) -> TableId:
+    """Single-statement insert-or-update for tables with a unique constraint (see `getNaturalKey()`).
+
+    Rows are matched on the constraint columns only (`getMaybeId()` also compares the other non-optional fields); the
+    other columns of a matched row are updated to the values of `table` (except `created`/`last_updated`). The match is
+    made by Postgres while inserting, so concurrent writers can't both insert the same row. Note that each call takes a
+    value from the table's id sequence, even when it returns an existing row.
+
+    Raises:
+        Exception: If the table has no unique constraint, or its constraint is NULLS DISTINCT over nullable columns
+        (rows with a NULL in the key would never conflict, so every call would insert a duplicate).
+    """
+    table_catalog = getTableCatalog(cursor, table_name)
+    if table_catalog.natural_key is None:
+        raise Exception(f"No unique constraint to upsert on for {table_name}")
+    if not table_catalog.conflict_safe:
+        raise Exception(
+            f"The unique constraint of {table_name} is NULLS DISTINCT, so it can't be upserted on"
+        )
+    return_key = [table_name + "_id"]
+    key = ("upsert", table_name, type(table), none_mask(table), table_catalog)
+    stmt = statement_cache.get(
+        key,
+        lambda: renderPg(
+            generateUpsertStmt(table_name, table, table_catalog, return_key)
+        ),
+    )
+    # A matching row committed by another transaction after this statement started isn't visible to its lookup
+    # branch, but it is to the next statement
+    for _ in range(2):
+        execute(cursor, stmt, table(), prepare)
+        result = cursor.fetchone()
+        if result is not None:
+            return TableId(result[0])
+    raise Exception(f"Failed to upsert {table} in {table_name}")
+
+
 def insertAndReturnKey(
     table_name: str,
     key: Type[SK],
+    prepare: bool = False,
 ) -> ReturnKey[S, SK]:
     return_key = [f for f in key.names()]
 
@@ -89,9 +243,9 @@ def insertAndReturnKey(
         cursor: Any,
         table: AnyKeyTable,
     ) -> SK:
-        stmt = generateInsertStmt(table_name, table, return_key)
+        stmt = renderInsertStmt(table_name, table, return_key)
         t = table()
-        cursor.execute(stmt, t)
+        execute(cursor, stmt, t, prepare)
         result = cast(SK, cursor.fetchone())
         return result
 
@@ -144,3 +298,168 @@ def generateInsertMany(
         values=values,
     )
     return stmt
+
+
+_dumps = partial(json.dumps, default=str)
+
+
+def _recordset(table_name: str, alias: str) -> Composed:
+    """Expands a json array parameter into rows typed like `table_name` (with an `ordinality` column)."""
+    return doPgFormat(
+        "json_populate_recordset(null::{table}, %(rows)s) with ordinality as {alias}",
+        table=Identifier(table_name),
+        alias=Identifier(alias),
+    )
+
+
+def _groupByNoneFields(
+    tables: Sequence[AnyIdTable],
+    indexes: Sequence[int],
+    names: Sequence[str],
+) -> Dict[Tuple[str, ...], List[int]]:
+    """Groups `indexes` of `tables` by which of the `names` fields are `None`."""
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for i in indexes:
+        none_names = tuple(n for n in names if is_none(tables[i], n))
+        groups.setdefault(none_names, []).append(i)
+    return groups
+
+
+def planMaybeIds(
+    table_name: str,
+    tables: Sequence[AnyIdTable],
+    table_catalog: Optional[TableCatalog] = None,
+) -> List[Tuple[str, List[int]]]:
+    """The (statement, indexes of `tables`) pairs that `getMaybeIds()` runs, one per set of `match_conditions()`.
+
+    Each statement takes the rows of its `tables` as a json array in the "rows" parameter and returns
+    (ordinality, id) for the rows that exist.
+    """
+    table_id = "_".join([table_name, "id"])
+
+    groups: Dict[Tuple[Tuple[str, bool], ...], List[int]] = {}
+    for i, table in enumerate(tables):
+        groups.setdefault(match_conditions(table, table_catalog), []).append(i)
+
+    plan = []
+    for match, indexes in groups.items():
+
+        def build() -> str:
+            conditions = [
+                doPgFormat("{0} is null", Identifier("t", n))
+                if value_is_none
+                else doPgFormat("{0} = {1}", Identifier("t", n), Identifier("v", n))
+                for n, value_is_none in match
+            ]
+            stmt = doPgFormat(
+                "select distinct on (v.ordinality) v.ordinality, {id} from {values} join {table} as t on {conditions}"
+                + " order by v.ordinality, {id}",
+                id=Identifier("t", table_id),
+                values=_recordset(table_name, "v"),
+                table=Identifier(table_name),
+                conditions=doPgJoin(" and ", conditions) if conditions else SQL("true"),
+            )
+            return renderPg(stmt)
+
+        key = ("get_many", table_name, type(tables[indexes[0]]), match)
+        plan.append((statement_cache.get(key, build), indexes))
+    return plan
+
+
+def planInsertMany(
+    table_name: str,
+    tables: Sequence[AnyIdTable],
+    missing: Sequence[int],
+    table_catalog: Optional[TableCatalog] = None,
+) -> List[Tuple[str, List[int]]]:
+    """The (statement, indexes of `tables`) pairs that `insertOrGetMany()` runs to insert the `missing` tables.
+
+    Tables that would match the same row are only inserted once, and there is one statement per set of omitted
+    (optional and `None`) columns. Each statement takes its rows as a json array in the "rows" parameter.
+    """
+    if len(missing) == 0:
+        return []
+
+    # Only insert the first of any tables that would match the same row
+    to_insert: Dict[str, int] = {}
+    for i in missing:
+        match = match_conditions(tables[i], table_catalog)
+        match_values = _dumps([(n, tables[i].get(n)) for n, _ in match])
+        to_insert.setdefault(match_values, i)
+
+    names = tables[0].names()
+    omittable_names = [n for n in names if n in tableMeta(tables[0]).optional]
+
+    plan = []
+    groups = _groupByNoneFields(tables, list(to_insert.values()), omittable_names)
+    for none_names, indexes in groups.items():
+
+        def build() -> str:
+            fields = doPgJoin(
+                ",", [Identifier(n) for n in names if n not in none_names]
+            )
+            stmt = doPgFormat(
+                "insert into {table} ({fields}) select {fields} from {values} on conflict do nothing",
+                table=Identifier(table_name),
+                fields=fields,
+                values=_recordset(table_name, "v"),
+            )
+            return renderPg(stmt)
+
+        key = ("insert_many", table_name, type(tables[0]), none_names)
+        plan.append((statement_cache.get(key, build), indexes))
+    return plan
+
+
+def getMaybeIds(
+    table_name: str,
+    cursor: Any,
+    tables: Sequence[AnyIdTable],
+    prepare: bool = False,
+) -> List[Optional[TableId]]:
+    """Batched `getMaybeId()`: gets the id (or `None`) of each table in `tables`, in input order.
+
+    Rows are matched on the same columns as `getMaybeId()` (see `match_conditions()`). One statement is issued per
+    distinct pattern of `None` values among those columns rather than one per table.
+    """
+    ids: List[Optional[TableId]] = [None] * len(tables)
+    table_catalog = getTableCatalog(cursor, table_name)
+    for stmt, indexes in planMaybeIds(table_name, tables, table_catalog):
+        rows = [tables[i]() for i in indexes]
+        execute(cursor, stmt, {"rows": Json(rows, dumps=_dumps)}, prepare)
+        for ordinality, found_id in cursor.fetchall():
+            ids[indexes[ordinality - 1]] = TableId(found_id)
+    return ids
+
+
+def insertOrGetMany(
+    table_name: str,
+    cursor: Any,
+    tables: Sequence[AnyIdTable],
+    prepare: bool = False,
+) -> List[TableId]:
+    """Batched `insertOrGetId()`: gets the id of each table in `tables`, inserting the ones that don't exist yet.
+
+    Existing rows are resolved with `getMaybeIds()`; the missing ones are de-duplicated and inserted with one
+    `insert ... select from json_populate_recordset(...) on conflict do nothing` per distinct set of omitted
+    (optional and `None`) columns, and then looked up again. The number of statements therefore depends on the
+    `None`-patterns in `tables` rather than on how many tables are passed. Ids are returned in input order.
+    """
+    ids = getMaybeIds(table_name, cursor, tables, prepare)
+    missing = [i for i, table_id in enumerate(ids) if table_id is None]
+    if len(missing) == 0:
+        return cast(List[TableId], ids)
+
+    table_catalog = getTableCatalog(cursor, table_name)
+    for stmt, indexes in planInsertMany(table_name, tables, missing, table_catalog):
+        rows = [tables[i]() for i in indexes]
+        execute(cursor, stmt, {"rows": Json(rows, dumps=_dumps)}, prepare)
+
+    found = getMaybeIds(table_name, cursor, [tables[i] for i in missing], prepare)
+    for i, table_id in zip(missing, found):
+        if table_id is None:
+            raise Exception(
+                f"Failed to insert or get {tables[i]} in {table_name} (conflicts with an existing row?)"
+            )
+        ids[i] = table_id
+    return cast(List[TableId], ids)
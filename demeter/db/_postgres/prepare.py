@@ -0,0 +1,95 @@
+"""Server-side prepared statements for the functions built by `SQLGenerator` (see `SQLGenerator(prepare=True)`).
+
+Each rendered statement is `PREPARE`d once per database session under a name derived from its text, and then run
+with `EXECUTE`. The registry of prepared names is kept per psycopg2 connection (weakly, so closed connections drop
+out) together with the server backend PID, so a connection that has reconnected to a new session prepares its
+statements again instead of executing names the server no longer knows.
+"""
+import hashlib
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import (
+    Any,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+# Default for `SQLGenerator(prepare=None)`
+PREPARE_STATEMENTS = os.environ.get("DEMETER_PREPARE_STATEMENTS", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%%")
+
+_REGISTRY_LOCK = threading.Lock()
+_REGISTRY: "WeakKeyDictionary[Any, Tuple[int, Set[str]]]" = WeakKeyDictionary()
+
+
+@lru_cache(maxsize=1024)
+def _toPrepared(stmt: str) -> Tuple[str, str, Tuple[str, ...]]:
+    """Converts a statement with `%(name)s` placeholders to a (name, PREPARE statement, parameter names) triple."""
+    param_names: list = []
+
+    def _sub(m: re.Match) -> str:
+        if m.group(0) == "%%":
+            return "%"
+        name = m.group(1)
+        if name not in param_names:
+            param_names.append(name)
+        return f"${param_names.index(name) + 1}"
+
+    body = _PLACEHOLDER.sub(_sub, stmt)
+    name = "demeter_" + hashlib.sha1(stmt.encode("utf-8")).hexdigest()[:16]
+    return name, f"prepare {name} as {body}", tuple(param_names)
+
+
+def _ensurePrepared(cursor: Any, name: str, prepare_stmt: str) -> None:
+    """Issues `prepare_stmt` on the cursor's session unless `name` is already prepared there."""
+    conn = cursor.connection
+    pid = conn.get_backend_pid()
+    with _REGISTRY_LOCK:
+        entry = _REGISTRY.get(conn)
+        if entry is None or entry[0] != pid:
+            entry = (pid, set())
+            _REGISTRY[conn] = entry
+        if name in entry[1]:
+            return
+    cursor.execute(prepare_stmt)
+    with _REGISTRY_LOCK:
+        entry[1].add(name)
+
+
+def execute(
+    cursor: Any,
+    stmt: str,
+    args: Optional[Mapping[str, Any]] = None,
+    prepare: bool = False,
+) -> None:
+    """Runs `stmt` on `cursor`, as a server-side prepared statement if `prepare` is set.
+
+    Args:
+        cursor (Any): Psycopg2 cursor.
+        stmt (str): SQL text using `%(name)s` placeholders.
+        args (Mapping[str, Any], optional): Values for the placeholders (extra keys are ignored when preparing).
+        prepare (bool, optional): Whether to `PREPARE` the statement once per session and `EXECUTE` it.
+        Defaults to False.
+    """
+    if not prepare:
+        cursor.execute(stmt, args)
+        return
+
+    name, prepare_stmt, param_names = _toPrepared(stmt)
+    _ensurePrepared(cursor, name, prepare_stmt)
+    if len(param_names) == 0:
+        cursor.execute(f"execute {name}")
+        return
+    places = ",".join(["%s"] * len(param_names))
+    values = [args[n] for n in param_names] if args is not None else []
+    cursor.execute(f"execute {name}({places})", values)
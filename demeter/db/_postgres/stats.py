@@ -0,0 +1,284 @@
+"""Per-statement query instrumentation for engines built by `getEngine()` (see `getEngine(instrument=True)`).
+
+Statements are grouped by fingerprint (the SQL text with whitespace collapsed and literals replaced by "?"), and for
+each fingerprint the number of calls, rows returned/affected, and a latency histogram are kept. On the psycopg2
+dialect the timing is done by a cursor subclass passed as `cursor_factory`, so it covers both SQLAlchemy execution
+and raw cursors (e.g., `conn.connection.cursor()` as used by the `SQLGenerator` functions); engines on other drivers
+are timed with SQLAlchemy's `before_cursor_execute`/`after_cursor_execute` events.
+
+Instrumentation is off by default. Set DEMETER_INSTRUMENT_QUERIES=1 to turn it on for all engines, or set
+DEMETER_QUERY_STATS_FILE to a path to also write the statistics there at exit (Prometheus text format if the path
+ends in ".prom" or ".txt", JSON otherwise).
+"""
+import atexit
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+import psycopg2.extensions
+from psycopg2.sql import Composable
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_STATS_FILE = os.environ.get("DEMETER_QUERY_STATS_FILE") or None
+
+# Default for `getEngine(instrument=None)`
+INSTRUMENT_QUERIES = QUERY_STATS_FILE is not None or os.environ.get(
+    "DEMETER_INSTRUMENT_QUERIES", ""
+).lower() in ("1", "true", "yes")
+
+# Upper bounds (in seconds) of the latency histogram buckets; a final +Inf bucket is implied
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(
+    r"(?<![\w$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(stmt: str) -> str:
+    """Normalizes SQL text so that statements differing only in literals or layout share one fingerprint."""
+    stmt = _STRING_LITERAL.sub("?", stmt)
+    stmt = _NUMBER_LITERAL.sub("?", stmt)
+    return _WHITESPACE.sub(" ", stmt).strip().rstrip(";")
+
+
+class StatementStats(NamedTuple):
+    calls: int
+    rows: int
+    total_seconds: float
+    max_seconds: float
+    # Non-cumulative count per `LATENCY_BUCKETS` upper bound, plus the +Inf bucket last
+    buckets: Tuple[int, ...]
+
+
+class QueryStats:
+    """Thread-safe per-fingerprint call counts, row counts, and latency histograms."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, List[Any]] = {}
+
+    def record(self, stmt: str, seconds: float, rows: int) -> None:
+        key = fingerprint(stmt)
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = [0, 0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+                self._stats[key] = entry
+            entry[0] += 1
+            entry[1] += max(rows, 0)
+            entry[2] += seconds
+            entry[3] = max(entry[3], seconds)
+            entry[4][bucket] += 1
+
+    def snapshot(self) -> Dict[str, StatementStats]:
+        with self._lock:
+            return {
+                key: StatementStats(calls, rows, total, peak, tuple(buckets))
+                for key, (calls, rows, total, peak, buckets) in self._stats.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def _toText(cursor: Any, query: Any) -> str:
+    if isinstance(query, Composable):
+        return query.as_string(cursor)
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    return str(query)
+
+
+class _InstrumentedCursor:
+    """Mixin for psycopg2 cursor classes that records each statement in `query_stats`."""
+
+    def execute(self, query: Any, params: Any = None) -> Any:
+        start = perf_counter()
+        try:
+            return super().execute(query, params)  # type: ignore[misc]
+        finally:
+            query_stats.record(
+                _toText(self, query), perf_counter() - start, self.rowcount  # type: ignore[attr-defined]
+            )
+
+    def executemany(self, query: Any, params_list: Any) -> Any:
+        start = perf_counter()
+        try:
+            return super().executemany(query, params_list)  # type: ignore[misc]
+        finally:
+            query_stats.record(
+                _toText(self, query), perf_counter() - start, self.rowcount  # type: ignore[attr-defined]
+            )
+
+    def copy_expert(self, sql: Any, file: Any, size: int = 8192) -> Any:
+        start = perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)  # type: ignore[misc]
+        finally:
+            query_stats.record(
+                _toText(self, sql), perf_counter() - start, self.rowcount  # type: ignore[attr-defined]
+            )
+
+
+_INSTRUMENTED_CURSORS_LOCK = threading.Lock()
+_INSTRUMENTED_CURSORS: Dict[Type, Type] = {}
+
+
+def instrumentedCursorType(
+    cursor_type: Type[psycopg2.extensions.cursor],
+) -> Type[psycopg2.extensions.cursor]:
+    """Gets the subclass of `cursor_type` that records its statements (one class per `cursor_type`)."""
+    if issubclass(cursor_type, _InstrumentedCursor):
+        return cursor_type
+    with _INSTRUMENTED_CURSORS_LOCK:
+        instrumented = _INSTRUMENTED_CURSORS.get(cursor_type)
+        if instrumented is None:
+            instrumented = type(
+                "Instrumented" + cursor_type.__name__,
+                (_InstrumentedCursor, cursor_type),
+                {},
+            )
+            _INSTRUMENTED_CURSORS[cursor_type] = instrumented
+    return instrumented
+
+
+def _beforeCursorExecute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("demeter_query_start", []).append(perf_counter())
+
+
+def _afterCursorExecute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["demeter_query_start"].pop()
+    query_stats.record(statement, perf_counter() - start, cursor.rowcount)
+
+
+def _handleError(context):
+    conn = context.connection
+    if conn is not None and conn.info.get("demeter_query_start"):
+        start = conn.info["demeter_query_start"].pop()
+        query_stats.record(context.statement or "", perf_counter() - start, -1)
+
+
+def instrumentEngine(engine: Engine) -> Engine:
+    """Records the statements `engine` runs through SQLAlchemy (for drivers without an instrumented cursor type)."""
+    if not event.contains(engine, "before_cursor_execute", _beforeCursorExecute):
+        event.listen(engine, "before_cursor_execute", _beforeCursorExecute)
+        event.listen(engine, "after_cursor_execute", _afterCursorExecute)
+        event.listen(engine, "handle_error", _handleError)
+    return engine
+
+
+def stats() -> Dict[str, StatementStats]:
+    """
+    Gets the statistics recorded by instrumented engines (see `getEngine(instrument=True)`), keyed on statement
+    fingerprint (the SQL with literals replaced by "?").
+
+    Returns:
+        Dict[str, StatementStats]: Calls, rows, total and max latency (in seconds), and latency histogram (counts per
+        `LATENCY_BUCKETS` upper bound, with the +Inf bucket last) for each fingerprint.
+    """
+    return query_stats.snapshot()
+
+
+def resetStats() -> None:
+    """Discards all recorded query statistics."""
+    query_stats.clear()
+
+
+def _toJson(snapshot: Dict[str, StatementStats]) -> str:
+    bounds = [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+    return json.dumps(
+        [
+            {
+                "statement": key,
+                "calls": s.calls,
+                "rows": s.rows,
+                "total_seconds": s.total_seconds,
+                "max_seconds": s.max_seconds,
+                "buckets": dict(zip(bounds, s.buckets)),
+            }
+            for key, s in sorted(snapshot.items(), key=lambda kv: -kv[1].total_seconds)
+        ],
+        indent=2,
+    )
+
+
+def _escapeLabel(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _toPrometheus(snapshot: Dict[str, StatementStats]) -> str:
+    lines = [
+        "# HELP demeter_query_duration_seconds Latency of demeter database statements.",
+        "# TYPE demeter_query_duration_seconds histogram",
+    ]
+    for key, s in snapshot.items():
+        label = f'statement="{_escapeLabel(key)}"'
+        cumulative = 0
+        for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], s.buckets):
+            cumulative += count
+            lines.append(
+                f'demeter_query_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f"demeter_query_duration_seconds_sum{{{label}}} {s.total_seconds}")
+        lines.append(f"demeter_query_duration_seconds_count{{{label}}} {s.calls}")
+    lines += [
+        "# HELP demeter_query_rows_total Rows returned or affected by demeter database statements.",
+        "# TYPE demeter_query_rows_total counter",
+    ]
+    for key, s in snapshot.items():
+        lines.append(
+            f'demeter_query_rows_total{{statement="{_escapeLabel(key)}"}} {s.rows}'
+        )
+    return "\n".join(lines) + "\n"
+
+
+def dumpStats(path: str, fmt: Optional[str] = None) -> None:
+    """
+    Writes the recorded query statistics to `path`.
+
+    Args:
+        path (str): File to write.
+        fmt (str, optional): "json" or "prometheus"; if `None`, Prometheus text format is used for paths ending in
+        ".prom" or ".txt" and JSON otherwise. Defaults to None.
+    """
+    if fmt is None:
+        fmt = "prometheus" if path.endswith((".prom", ".txt")) else "json"
+    snapshot = query_stats.snapshot()
+    if fmt == "json":
+        text = _toJson(snapshot)
+    elif fmt == "prometheus":
+        text = _toPrometheus(snapshot)
+    else:
+        raise ValueError(f"Unknown query stats format: {fmt}")
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def _dumpAtExit() -> None:
+    if QUERY_STATS_FILE is not None and len(query_stats.snapshot()) > 0:
+        dumpStats(QUERY_STATS_FILE)
+
+
+atexit.register(_dumpAtExit)
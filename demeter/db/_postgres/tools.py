@@ -4,6 +4,8 @@ from psycopg2.sql import (
     SQL,
     Composable,
     Composed,
+    Identifier,
+    Placeholder,
 )
 
 
@@ -15,3 +17,21 @@ def doPgJoin(sep: str, args: Sequence[Composable]) -> Composed:
 
 def doPgFormat(template: str, *args: Composable, **kwargs: Composable) -> Composed:
     return cast(Composed, SQL(template).format(*args, **kwargs))  # type: ignore
+
+
+def renderPg(composable: Composable) -> str:
+    """Renders a statement built from `SQL`, `Identifier` and `Placeholder` parts to a string without a connection.
+
+    `Composable.as_string()` needs a connection to quote identifiers, which rules it out for statements built (and
+    cached) ahead of time. Identifiers are double-quoted the same way Postgres' `quote_ident` does; `Literal` parts
+    are not supported since their quoting depends on the connection's encoding, so pass values as parameters.
+    """
+    if isinstance(composable, Composed):
+        return "".join(renderPg(c) for c in composable.seq)
+    if isinstance(composable, SQL):
+        return composable.string
+    if isinstance(composable, Identifier):
+        return ".".join('"' + s.replace('"', '""') + '"' for s in composable.strings)
+    if isinstance(composable, Placeholder):
+        return "%s" if composable.name is None else f"%({composable.name})s"
+    raise TypeError(f"Cannot render {composable!r} without a connection")
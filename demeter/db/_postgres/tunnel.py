@@ -0,0 +1,155 @@
+"""Shared, reference-counted SSH tunnels for database connections made through a bastion host."""
+import atexit
+import logging
+import threading
+from typing import (
+    Dict,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from sshtunnel import SSHTunnelForwarder
+
+SSH_PORT = 22
+POSTGRES_PORT = 5432
+
+TunnelKey = Tuple[str, str]
+
+
+class _TunnelSpec(NamedTuple):
+    """Everything needed to (re)start the forwarder for a `TunnelKey`."""
+
+    ssh_address_or_host: str
+    ssh_username: str
+    ssh_private_key: str
+    remote_bind_address: str
+
+
+def _start_forwarder(
+    spec: _TunnelSpec, local_bind_address: Optional[Tuple[str, int]] = None
+) -> SSHTunnelForwarder:
+    """Starts an `SSHTunnelForwarder`, optionally pinned to `local_bind_address`."""
+    kwargs = {}
+    if local_bind_address is not None:
+        kwargs["local_bind_address"] = local_bind_address
+    server = SSHTunnelForwarder(
+        ssh_address_or_host=(spec.ssh_address_or_host, SSH_PORT),
+        ssh_username=spec.ssh_username,
+        ssh_private_key=spec.ssh_private_key,
+        remote_bind_address=(spec.remote_bind_address, POSTGRES_PORT),
+        set_keepalive=15,
+        **kwargs,
+    )
+    server.daemon_forward_servers = True
+    server.start()
+    return server
+
+
+def _is_healthy(server: SSHTunnelForwarder) -> bool:
+    """Whether the SSH transport and the local forwarding server are both still up."""
+    try:
+        return bool(server.is_active and server.is_alive)
+    except Exception:
+        return False
+
+
+class SSHTunnelManager:
+    """Keeps one `SSHTunnelForwarder` per (gateway, remote_bind_address) and hands out its local port.
+
+    Each `acquire()` increments a reference count for the tunnel and each `release()` decrements it; the forwarder
+    is stopped once nothing references it. A forwarder that has died is restarted on the same local port, so
+    engines that were built with that port keep working.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._specs: Dict[TunnelKey, _TunnelSpec] = {}
+        self._forwarders: Dict[TunnelKey, SSHTunnelForwarder] = {}
+        self._refcounts: Dict[TunnelKey, int] = {}
+
+    def _ensure_running(self, key: TunnelKey) -> SSHTunnelForwarder:
+        """Returns the running forwarder for `key`, (re)starting it if needed. Caller must hold the lock."""
+        server = self._forwarders.get(key)
+        if server is None:
+            server = _start_forwarder(self._specs[key])
+            self._forwarders[key] = server
+        elif not _is_healthy(server):
+            logging.warning("SSH tunnel to %s via %s is down; restarting.", *key[::-1])
+            local_bind_address = server.local_bind_address
+            try:
+                server.stop()
+            except Exception:
+                pass
+            server = _start_forwarder(self._specs[key], local_bind_address)
+            self._forwarders[key] = server
+        return server
+
+    def acquire(
+        self,
+        ssh_address_or_host: str,
+        ssh_username: str,
+        ssh_private_key: str,
+        remote_bind_address: str,
+    ) -> Tuple[TunnelKey, str]:
+        """
+        Gets (starting if needed) the tunnel to `remote_bind_address` through `ssh_address_or_host`.
+
+        Args:
+            ssh_address_or_host (str): IP or hostname of REMOTE GATEWAY.
+            ssh_username (str): Username to authenticate as in REMOTE SERVER.
+            ssh_private_key (str): Private key file name (str) to obtain the public key from or a public key
+            (paramiko.pkey.PKey)
+            remote_bind_address (str): The IP of the remote side of the tunnel.
+
+        Returns:
+            Tuple[TunnelKey, str]: The key to pass to `release()` and the local port bound to the tunnel.
+        """
+        key = (ssh_address_or_host, remote_bind_address)
+        with self._lock:
+            self._specs.setdefault(
+                key,
+                _TunnelSpec(
+                    ssh_address_or_host,
+                    ssh_username,
+                    ssh_private_key,
+                    remote_bind_address,
+                ),
+            )
+            server = self._ensure_running(key)
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+            return key, str(server.local_bind_port)
+
+    def check(self, key: TunnelKey) -> None:
+        """Health-checks the tunnel for `key` and restarts it (on the same local port) if it has died."""
+        with self._lock:
+            if key in self._forwarders:
+                self._ensure_running(key)
+
+    def release(self, key: TunnelKey) -> None:
+        """Drops one reference to the tunnel for `key`, stopping it when no references remain."""
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+                return
+            self._refcounts.pop(key, None)
+            server = self._forwarders.pop(key, None)
+        if server is not None:
+            server.stop()
+
+    def close(self) -> None:
+        """Stops every tunnel regardless of reference counts (registered to run at interpreter exit)."""
+        with self._lock:
+            servers = list(self._forwarders.values())
+            self._forwarders.clear()
+            self._refcounts.clear()
+        for server in servers:
+            try:
+                server.stop()
+            except Exception:
+                pass
+
+
+ssh_tunnels = SSHTunnelManager()
+atexit.register(ssh_tunnels.close)
@@ -0,0 +1,180 @@
+"""Cache of the ids of type-table rows (e.g., CropType, UnitType) for the functions built by `SQLGenerator`.
+
+Type tables are small and rarely change, but their ids are looked up over and over with the same arguments (e.g.,
+the same ObservationType for every observation of a load). With `SQLGenerator(cache_types=True)`, the generated
+`getMaybe<Type>Id`, `insert<Type>` and `upsert<Type>` functions of the generator's type tables remember the id of each
+object they have looked up or inserted, per psycopg2 connection (weakly, so closed connections drop out). With a
+`ttl`, ids are also shared across connections to the same database for that many seconds.
+
+Objects are keyed on their hashed fields (the same ones as the frozen dataclass `__hash__`, so `details`, `created`
+and `last_updated` are ignored). Only ids that exist are cached; inserting replaces the cached id. Ids inserted in a
+transaction that is rolled back stay cached, so call `clearTypeCache()` after rolling back (or deleting) type rows.
+"""
+import os
+import threading
+import time
+from dataclasses import fields
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+from .. import TableId
+from .._base_types import Table
+from .._union_types import AnyIdTable
+from .get import getMaybeId
+
+# Defaults for `SQLGenerator(cache_types=None, type_cache_ttl=None)`
+CACHE_TYPES = os.environ.get("DEMETER_CACHE_TYPES", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+TYPE_CACHE_TTL: Optional[float] = (
+    float(os.environ["DEMETER_TYPE_CACHE_TTL"])
+    if os.environ.get("DEMETER_TYPE_CACHE_TTL")
+    else None
+)
+
+_HASHED_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _objectKey(table_name: str, table: Table) -> Optional[Hashable]:
+    cls = type(table)
+    names = _HASHED_FIELDS.get(cls)
+    if names is None:
+        names = tuple(f.name for f in fields(cls) if f.hash is not False)
+        _HASHED_FIELDS[cls] = names
+    key = (table_name, cls, tuple(getattr(table, n) for n in names))
+    try:
+        hash(key)
+    except TypeError:  # e.g., a JSON field that is part of the key
+        return None
+    return key
+
+
+def _dsn(cursor: Any) -> str:
+    conn = cursor.connection
+    dsn = getattr(conn, "dsn", None)
+    if dsn is None:  # psycopg 3
+        dsn = conn.info.dsn
+    return dsn
+
+
+class TypeIdCache:
+    """Thread-safe cache of type-table ids, per connection and (with a `ttl`) per database."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._by_connection: "WeakKeyDictionary[Any, Dict[Hashable, TableId]]" = (
+            WeakKeyDictionary()
+        )
+        self._shared: Dict[Tuple[str, Hashable], Tuple[TableId, float]] = {}
+
+    def get(
+        self, cursor: Any, table_name: str, table: Table, ttl: Optional[float]
+    ) -> Optional[TableId]:
+        key = _objectKey(table_name, table)
+        if key is None:
+            return None
+        conn = cursor.connection
+        with self._lock:
+            try:
+                table_id = self._by_connection.get(conn, {}).get(key)
+            except TypeError:  # connection type that can't be weakly referenced
+                table_id = None
+            if table_id is None and ttl is not None:
+                shared = self._shared.get((_dsn(cursor), key))
+                if shared is not None and shared[1] > time.monotonic():
+                    table_id = shared[0]
+            if table_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return table_id
+
+    def put(
+        self,
+        cursor: Any,
+        table_name: str,
+        table: Table,
+        table_id: TableId,
+        ttl: Optional[float],
+    ) -> None:
+        key = _objectKey(table_name, table)
+        if key is None:
+            return
+        conn = cursor.connection
+        with self._lock:
+            try:
+                self._by_connection.setdefault(conn, {})[key] = table_id
+            except TypeError:  # connection type that can't be weakly referenced
+                pass
+            if ttl is not None:
+                self._shared[(_dsn(cursor), key)] = (
+                    table_id,
+                    time.monotonic() + ttl,
+                )
+
+    def clear(self, conn: Optional[Any] = None) -> None:
+        with self._lock:
+            if conn is None:
+                self._by_connection.clear()
+                self._shared.clear()
+                self.hits = 0
+                self.misses = 0
+            else:
+                self._by_connection.pop(conn, None)
+                dsn = getattr(conn, "dsn", None)
+                for shared_key in [k for k in self._shared if k[0] == dsn]:
+                    del self._shared[shared_key]
+
+
+type_id_cache = TypeIdCache()
+
+
+def clearTypeCache(conn: Optional[Any] = None) -> None:
+    """Forgets the cached type-table ids of `conn` (a psycopg2 connection), or of every connection if `None`."""
+    type_id_cache.clear(conn)
+
+
+def getTypeCacheInfo() -> Tuple[int, int]:
+    """(hits, misses) of the type-table id cache since it was last cleared."""
+    return type_id_cache.hits, type_id_cache.misses
+
+
+def getMaybeIdCached(
+    table_name: str,
+    cursor: Any,
+    table: AnyIdTable,
+    prepare: bool = False,
+    ttl: Optional[float] = None,
+) -> Optional[TableId]:
+    """`getMaybeId()` that answers from the type cache when it can, and caches the ids it finds."""
+    table_id = type_id_cache.get(cursor, table_name, table, ttl)
+    if table_id is None:
+        table_id = getMaybeId(table_name, cursor, table, prepare)
+        if table_id is not None:
+            type_id_cache.put(cursor, table_name, table, table_id, ttl)
+    return table_id
+
+
+def returnIdAndCache(
+    return_id: Callable[..., TableId],
+    table_name: str,
+    cursor: Any,
+    table: AnyIdTable,
+    prepare: bool = False,
+    ttl: Optional[float] = None,
+) -> TableId:
+    """Runs an insert/upsert function (e.g., `insertAndReturnId()`) and caches (or replaces) the id it returns."""
+    table_id = return_id(table_name, cursor, table, prepare)
+    type_id_cache.put(cursor, table_name, table, table_id, ttl)
+    return table_id
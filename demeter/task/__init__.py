@@ -46,6 +46,7 @@ __all__ = [
     "getMaybeHTTPTypeId",
     "getMaybeS3TypeId",
     "getHTTPType",
+    "getManyHTTPType",
     "getS3Object",
     "getS3TypeBase",
     "getMaybeS3TypeDataFrame",
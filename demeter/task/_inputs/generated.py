@@ -1,6 +1,7 @@
 from ...db import SQLGenerator as Generator
 from ...db._generic_types import (
     GetId,
+    GetManyTable,
     GetTable,
     ReturnId,
     ReturnSameKey,
@@ -27,6 +28,7 @@ getMaybeHTTPTypeId: GetId[HTTPType] = g.getMaybeIdFunction(HTTPType)
 getMaybeS3TypeId: GetId[S3Type] = g.getMaybeIdFunction(S3Type)
 
 getHTTPType: GetTable[HTTPType] = g.getTableFunction(HTTPType)
+getManyHTTPType: GetManyTable[HTTPType] = g.getManyFunction(HTTPType)
 getS3Object: GetTable[S3Object] = g.getTableFunction(S3Object)
 getS3TypeBase: GetTable[S3Type] = g.getTableFunction(S3Type)
 getMaybeS3TypeDataFrame: GetTable[S3TypeDataFrame] = g.getTableFunction(
@@ -11,9 +11,9 @@ from psycopg2 import sql
 
 from ... import data, db
 from ...db import (
+    copyTables,
     doPgFormat,
     doPgJoin,
-    generateInsertMany,
 )
 from .._inputs.types import S3Object, S3ObjectKey
 
@@ -24,17 +24,15 @@ def insertS3ObjectKeys(
     keys: List[data.Key],
     s3_type_id: db.TableId,
 ) -> bool:
-    s3_key_names = S3ObjectKey.names()
-    stmt = generateInsertMany("s3_object_key", s3_key_names, len(keys))
-    args: List[int] = []
-    for k in keys:
-        s3_object_key = S3ObjectKey(
+    s3_object_keys = (
+        S3ObjectKey(
             s3_object_id=s3_object_id,
             geospatial_key_id=k.geospatial_key_id,
             temporal_key_id=k.temporal_key_id,
         )
-        args.extend(s3_object_key().values())
-    _ = cursor.execute(stmt, args)
+        for k in keys
+    )
+    _ = copyTables(cursor, "s3_object_key", s3_object_keys)
     return True
 
 
@@ -16,6 +16,7 @@ TABLES_LIST = [
     "field_trial",
     "geom",
     "grouper",
+    "grouper_closure",
     "nutrient_source",
     "plot",
     "organization",
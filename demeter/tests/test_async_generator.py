@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from sure import expect
+
+from demeter.data import CropType, insertOrGetCropType
+from demeter.data._core import lookups
+from demeter.db import (
+    AsyncSQLGenerator,
+    disposeAsyncEngines,
+    getAsyncConnection,
+)
+
+pytest.importorskip("psycopg")  # "async" extra
+
+g = AsyncSQLGenerator(
+    "demeter.data",
+    type_table_lookup=lookups.type_table_lookup,
+    data_table_lookup=lookups.data_table_lookup,
+    id_table_lookup=lookups.id_table_lookup,
+)
+getMaybeCropTypeIdAsync = g.getMaybeIdFunction(CropType)
+insertOrGetCropTypeAsync = g.partialInsertOrGetId(
+    getMaybeCropTypeIdAsync, g.getInsertReturnIdFunction(CropType)
+)
+getCropTypeAsync = g.getTableFunction(CropType)
+
+
+async def _insertOrGetCropType(crop_type):
+    """Runs the async functions on a psycopg 3 `AsyncCursor` and commits."""
+    try:
+        async with getAsyncConnection(env_name="TEST_DEMETER_RW") as conn:
+            driver_connection = (await conn.get_raw_connection()).driver_connection
+            cursor = driver_connection.cursor()
+            expect(await getMaybeCropTypeIdAsync(cursor, crop_type)).to.be.none
+            crop_type_id = await insertOrGetCropTypeAsync(cursor, crop_type)
+            expect(await insertOrGetCropTypeAsync(cursor, crop_type)).to.equal(
+                crop_type_id
+            )
+            expect(await getMaybeCropTypeIdAsync(cursor, crop_type)).to.equal(
+                crop_type_id
+            )
+            found = await getCropTypeAsync(cursor, crop_type_id)
+            await driver_connection.commit()
+    finally:
+        await disposeAsyncEngines()
+    return crop_type_id, found
+
+
+class TestAsyncGenerator:
+    """
+    Note: After all the tests in TestAsyncGenerator run, `test_db_class` will clear all data since it has "class" scope.
+    """
+
+    def test_insert_or_get_async(self, test_db_class):
+        crop_type = CropType(crop="soybeans", product_name="Async Variety")
+        crop_type_id, found = asyncio.run(_insertOrGetCropType(crop_type))
+        found.crop.should.be.equal(crop_type.crop)
+        found.product_name.should.be.equal(crop_type.product_name)
+
+        # The synchronous functions see the row inserted on the AsyncCursor
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                insertOrGetCropType(cursor, crop_type).should.be.equal(crop_type_id)
@@ -0,0 +1,199 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from shapely.geometry import box
+from sure import expect
+
+from demeter.data import (
+    App,
+    CropType,
+    Field,
+    NutrientSource,
+    Organization,
+    getApp,
+    insertActs,
+    insertApps,
+    insertOrGetApp,
+    insertOrGetCropType,
+    insertOrGetField,
+    insertOrGetGeom,
+    insertOrGetNutrientSource,
+    insertOrGetOrganization,
+)
+from demeter.data._core.bulk import _resolveIds
+
+
+class TestBulk:
+    """
+    Note: After all the tests in TestBulk run, `test_db_class` will clear all data since it has "class" scope.
+    """
+
+    def test_insert_acts(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(
+                    cursor, Organization(name="Organization A")
+                )
+                field = Field(
+                    name="Acts Field",
+                    organization_id=organization_id,
+                    geom_id=insertOrGetGeom(cursor, box(-93.31, 44.96, -93.30, 44.97)),
+                    date_start=datetime(2022, 1, 1),
+                )
+                field_id = insertOrGetField(cursor, field)
+                df = pd.DataFrame(
+                    {
+                        "act_type": ["TILL", "MECHANICAL", "TILL"],
+                        "date_performed": [datetime(2022, 4, 1)] * 3,
+                        "field_id": [field_id] * 3,
+                    }
+                )
+                act_ids = insertActs(cursor, df)
+                act_ids[0].should.be.equal(act_ids[2])
+                act_ids[1].should_not.be.equal(act_ids[0])
+                insertActs(cursor, df.iloc[1:]).should.be.equal(act_ids[1:])
+
+    def test_insert_apps(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(
+                    cursor, Organization(name="Organization A")
+                )
+                field_id = insertOrGetField(
+                    cursor,
+                    Field(
+                        name="Apps Field",
+                        organization_id=organization_id,
+                        geom_id=insertOrGetGeom(
+                            cursor, box(-93.41, 44.96, -93.40, 44.97)
+                        ),
+                        date_start=datetime(2022, 1, 1),
+                    ),
+                )
+                crop_type_id = insertOrGetCropType(
+                    cursor, CropType(crop="corn", product_name="Apps Hybrid")
+                )
+                nutrient_source_id = insertOrGetNutrientSource(
+                    cursor,
+                    NutrientSource(
+                        nutrient="UAN", organization_id=organization_id, n=28.0
+                    ),
+                )
+                df = pd.DataFrame(
+                    {
+                        "app_type": ["FERTILIZER", "HERBICIDE", "FERTILIZER"],
+                        "app_method": ["BROADCAST", None, "BROADCAST"],
+                        "date_applied": [datetime(2022, 5, 1)] * 3,
+                        "rate": [150.0, 1.5, 150.0],
+                        "rate_unit": ["lbs/ac", "pt/ac", "lbs/ac"],
+                        "crop": ["corn", None, "corn"],
+                        "product_name": ["Apps Hybrid", None, "Apps Hybrid"],
+                        "nutrient": ["UAN", None, "UAN"],
+                        "organization_id": [organization_id, None, organization_id],
+                        "field_id": [field_id] * 3,
+                    }
+                )
+                app_ids = insertApps(cursor, df)
+                app_ids[0].should.be.equal(app_ids[2])
+                app_ids[1].should_not.be.equal(app_ids[0])
+                insertApps(cursor, df.iloc[1:]).should.be.equal(app_ids[1:])
+
+                app = getApp(cursor, app_ids[0])
+                app.crop_type_id.should.be.equal(crop_type_id)
+                app.nutrient_source_id.should.be.equal(nutrient_source_id)
+                app.field_id.should.be.equal(field_id)
+                getApp(cursor, app_ids[1]).nutrient_source_id.should.be.none
+
+                # The same App through the single-row API
+                insertOrGetApp(
+                    cursor,
+                    App(
+                        app_type="FERTILIZER",
+                        app_method="BROADCAST",
+                        date_applied=datetime(2022, 5, 1),
+                        rate=150.0,
+                        rate_unit="lbs/ac",
+                        crop_type_id=crop_type_id,
+                        nutrient_source_id=nutrient_source_id,
+                        field_id=field_id,
+                    ),
+                ).should.be.equal(app_ids[0])
+
+    def test_resolve_ids(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(
+                    cursor, Organization(name="Organization A")
+                )
+                hybrid_id = insertOrGetCropType(
+                    cursor, CropType(crop="corn", product_name="Resolved Hybrid")
+                )
+                corn_id = insertOrGetCropType(cursor, CropType(crop="corn"))
+                nutrient_source_id = insertOrGetNutrientSource(
+                    cursor,
+                    NutrientSource(nutrient="Urea", organization_id=organization_id),
+                )
+
+                # A NULL product_name only matches the crop type without one; rows that already have an id (or no
+                # crop) are left as-is
+                df = pd.DataFrame(
+                    {
+                        "crop": ["corn", "corn", "corn", None],
+                        "product_name": ["Resolved Hybrid", None, None, None],
+                        "crop_type_id": pd.array(
+                            [None, None, hybrid_id, None], dtype="Int64"
+                        ),
+                    }
+                )
+                resolved = _resolveIds(
+                    cursor, df, "crop_type", ("crop", "product_name"), "crop_type_id"
+                )
+                expect(resolved["crop_type_id"].iloc[:3].tolist()).to.equal(
+                    [hybrid_id, corn_id, hybrid_id]
+                )
+                expect(resolved["crop_type_id"].isna().tolist()).to.equal(
+                    [False, False, False, True]
+                )
+                expect(df["crop_type_id"].isna().tolist()).to.equal(
+                    [True, True, False, True]
+                )
+
+                # organization_id is compared as bigint
+                df = pd.DataFrame(
+                    {
+                        "nutrient": ["Urea", "Urea"],
+                        "organization_id": [organization_id] * 2,
+                    }
+                )
+                resolved = _resolveIds(
+                    cursor,
+                    df,
+                    "nutrient_source",
+                    ("nutrient", "organization_id"),
+                    "nutrient_source_id",
+                )
+                expect(resolved["nutrient_source_id"].tolist()).to.equal(
+                    [nutrient_source_id, nutrient_source_id]
+                )
+
+                # Frames without the key columns are returned unchanged
+                _resolveIds(
+                    cursor,
+                    pd.DataFrame({"field_id": [1]}),
+                    "crop_type",
+                    ("crop", "product_name"),
+                    "crop_type_id",
+                ).columns.tolist().should.be.equal(["field_id"])
+
+                with pytest.raises(ValueError):
+                    _resolveIds(
+                        cursor,
+                        pd.DataFrame({"crop": ["corn"], "product_name": ["Unknown"]}),
+                        "crop_type",
+                        ("crop", "product_name"),
+                        "crop_type_id",
+                    )
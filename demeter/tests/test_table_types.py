@@ -0,0 +1,28 @@
+import pickle
+from datetime import datetime
+
+from sure import expect
+
+from demeter.data import (
+    Field,
+    Grouper,
+    Organization,
+)
+
+
+class TestTableTypes:
+    def test_pickle_round_trip(self):
+        tables = [
+            Organization(name="Test Organization", details={"a": 1}),
+            Grouper(name="Root Grouper", organization_id=1, parent_grouper_id=None),
+            Field(
+                name="Field",
+                organization_id=1,
+                geom_id=2,
+                date_start=datetime(2022, 1, 1),
+            ),
+        ]
+        for table in tables:
+            unpickled = pickle.loads(pickle.dumps(table))
+            expect(unpickled).to.equal(table)
+            expect(unpickled()).to.equal(table())
@@ -0,0 +1,112 @@
+from sure import expect
+
+from demeter.data import CropType, insertOrGetCropType
+from demeter.data._core import lookups
+from demeter.db import (
+    SQLGenerator,
+    clearTypeCache,
+    getTypeCacheInfo,
+)
+
+g = SQLGenerator(
+    "demeter.data",
+    type_table_lookup=lookups.type_table_lookup,
+    data_table_lookup=lookups.data_table_lookup,
+    id_table_lookup=lookups.id_table_lookup,
+    cache_types=True,
+)
+getMaybeCropTypeIdCached = g.getMaybeIdFunction(CropType)
+insertCropTypeCached = g.getInsertReturnIdFunction(CropType)
+upsertCropTypeCached = g.getUpsertReturnIdFunction(CropType)
+
+
+def _deleteCropType(cursor, crop_type_id):
+    cursor.execute(
+        "delete from crop_type where crop_type_id = %(crop_type_id)s",
+        {"crop_type_id": crop_type_id},
+    )
+
+
+class TestTypeCache:
+    """
+    Note: After all the tests in TestTypeCache run, `test_db_class` will clear all data since it has "class" scope.
+    """
+
+    def test_hit_after_first_lookup(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                clearTypeCache()
+                crop_type = CropType(crop="corn", product_name="Cached Hybrid")
+                crop_type_id = insertOrGetCropType(cursor, crop_type)
+
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(
+                    crop_type_id
+                )
+                expect(getTypeCacheInfo()).to.equal((0, 1))
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(
+                    crop_type_id
+                )
+                expect(getTypeCacheInfo()).to.equal((1, 1))
+
+                # The cached id is returned without querying the table
+                _deleteCropType(cursor, crop_type_id)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(
+                    crop_type_id
+                )
+                expect(getTypeCacheInfo()).to.equal((2, 1))
+
+    def test_miss_is_not_cached(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                clearTypeCache()
+                crop_type = CropType(crop="soybean", product_name="Missing Variety")
+
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.none
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.none
+                expect(getTypeCacheInfo()).to.equal((0, 2))
+
+                # Inserted behind the cache's back, and still found
+                crop_type_id = insertOrGetCropType(cursor, crop_type)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(
+                    crop_type_id
+                )
+
+    def test_insert_and_upsert_replace_cached_id(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                clearTypeCache()
+                crop_type = CropType(crop="wheat", product_name="Replaced Variety")
+                first_id = insertOrGetCropType(cursor, crop_type)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(first_id)
+
+                _deleteCropType(cursor, first_id)
+                inserted_id = insertCropTypeCached(cursor, crop_type)
+                inserted_id.should_not.be.equal(first_id)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(inserted_id)
+
+                _deleteCropType(cursor, inserted_id)
+                upserted_id = upsertCropTypeCached(cursor, crop_type)
+                upserted_id.should_not.be.equal(inserted_id)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(upserted_id)
+
+    def test_clear_type_cache_of_connection(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                clearTypeCache()
+                crop_type = CropType(crop="oat", product_name="Cleared Variety")
+                crop_type_id = insertCropTypeCached(cursor, crop_type)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(
+                    crop_type_id
+                )
+                expect(getTypeCacheInfo()).to.equal((1, 0))
+
+                # Only the entries of the connection are dropped; the counters are kept
+                clearTypeCache(cursor.connection)
+                getMaybeCropTypeIdCached(cursor, crop_type).should.be.equal(
+                    crop_type_id
+                )
+                expect(getTypeCacheInfo()).to.equal((1, 1))
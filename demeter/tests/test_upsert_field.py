@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from shapely.geometry import box
+from sure import expect
+
+from demeter.data import (
+    Field,
+    Organization,
+    findManyOverlappingFields,
+    findOverlappingFields,
+    insertOrGetField,
+    insertOrGetGeom,
+    insertOrGetOrganization,
+)
+
+
+class TestUpsertField:
+    """
+    Note: After all the tests in TestUpsertField run, `test_db_class` will clear all data since it has "class" scope.
+    """
+
+    def test_find_overlapping_fields(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(
+                    cursor, Organization(name="Organization A")
+                )
+                field = Field(
+                    name="Overlap Field",
+                    organization_id=organization_id,
+                    geom_id=insertOrGetGeom(cursor, box(-93.21, 44.96, -93.20, 44.97)),
+                    date_start=datetime(2022, 1, 1),
+                    date_end=datetime(2023, 1, 1),
+                )
+                field_id = insertOrGetField(cursor, field)
+
+                overlapping = box(-93.205, 44.965, -93.19, 44.975)
+                adjacent = box(-93.20, 44.96, -93.19, 44.97)
+                findOverlappingFields(
+                    cursor, overlapping, datetime(2022, 6, 1)
+                ).should.be.equal([field_id])
+                findManyOverlappingFields(
+                    cursor,
+                    [
+                        (overlapping, datetime(2023, 1, 1), None),
+                        (adjacent, datetime(2022, 6, 1), None),
+                        (overlapping, datetime(2021, 1, 1), datetime(2022, 2, 1)),
+                    ],
+                ).should.be.equal([[], [], [field_id]])
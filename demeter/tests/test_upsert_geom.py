@@ -5,7 +5,12 @@ from shapely.geometry import Point, Polygon
 from sqlalchemy.sql import text
 from sure import expect
 
-from demeter.data import insertOrGetGeom
+from demeter.data import (
+    canonical_geom_hash,
+    getGeoms,
+    insertOrGetGeom,
+    insertOrGetGeoms,
+)
 from demeter.tests.conftest import SCHEMA_NAME
 from demeter.tests.constants import TABLES_LIST
 
@@ -65,6 +70,52 @@ class TestUpsertGeom:
                 polygon_geom_id = insertOrGetGeom(conn.connection.cursor(), polygon)
                 polygon_geom_id.should.be.greater_than(-1)
 
+    def test_upsert_many_geoms(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                point = Point(-93.203209, 44.962470)
+                other_point = Point(-93.201000, 44.960000)
+                geom_ids = insertOrGetGeoms(cursor, [point, other_point, other_point])
+                geom_ids[0].should.be.equal(insertOrGetGeom(cursor, point))
+                geom_ids[1].should.be.equal(geom_ids[2])
+                geom_ids[1].should_not.be.equal(geom_ids[0])
+                insertOrGetGeom(cursor, other_point).should.be.equal(geom_ids[1])
+
+    def test_canonical_geom_hash(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                point = Point(-93.203209, 44.962470)
+                geom_id = insertOrGetGeom(cursor, point)
+                cursor.execute(
+                    "select geom_hash from geom where geom_id = %(geom_id)s",
+                    {"geom_id": geom_id},
+                )
+                geom_hash = bytes(cursor.fetchone().geom_hash)
+                geom_hash.should.be.equal(canonical_geom_hash(point))
+
+                # An invalid geometry is hashed as stored, i.e., after `make_valid`
+                bowtie = Polygon([(0, 0), (1, 1), (1, 0), (0, 1), (0, 0)])
+                geom_id = insertOrGetGeom(cursor, bowtie)
+                cursor.execute(
+                    "select geom_hash from geom where geom_id = %(geom_id)s",
+                    {"geom_id": geom_id},
+                )
+                geom_hash = bytes(cursor.fetchone().geom_hash)
+                geom_hash.should.be.equal(canonical_geom_hash(bowtie))
+
+    def test_get_geoms(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                point = Point(-93.203209, 44.962470)
+                other_point = Point(-93.201000, 44.960000)
+                geom_ids = insertOrGetGeoms(cursor, [other_point, point])
+                gdf = getGeoms(cursor, geom_ids[::-1])
+                list(gdf["geom_id"]).should.be.equal(geom_ids[::-1])
+                gdf.geometry.iloc[0].equals(point).should.be.true
+
     def test_read_geom_table(self, test_db_class):
         with test_db_class.connect() as conn:
             with conn.begin():
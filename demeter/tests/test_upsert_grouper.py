@@ -2,16 +2,22 @@ from datetime import datetime
 
 import pytest
 from pandas import read_sql_query
-from psycopg2.errors import ForeignKeyViolation
+from psycopg2.errors import ForeignKeyViolation, RaiseException
 from sqlalchemy.sql import text
 from sure import expect
 
 from demeter.data import (
     Grouper,
     Organization,
+    getGrouperAncestors,
+    getGrouperDescendants,
+    getGrouperSubtreeFieldCounts,
+    getMaybeGrouperId,
     insertOrGetGrouper,
     insertOrGetOrganization,
+    upsertGrouper,
 )
+from demeter.db import explainMaybeId
 from demeter.tests.conftest import SCHEMA_NAME
 
 ORGANIZATION = Organization(name="Test Organization")
@@ -86,6 +92,188 @@ class TestUpsertGrouper:
                 with pytest.raises(ForeignKeyViolation):
                     _ = insertOrGetGrouper(conn.connection.cursor(), child_grouper)
 
+    def test_grouper_ancestors_descendants(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                root_fg_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(name="Root Grouper", organization_id=organization_id),
+                )
+                child_fg_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(
+                        name="Child Field Group",
+                        organization_id=organization_id,
+                        parent_grouper_id=root_fg_id,
+                    ),
+                )
+                grandchild_fg_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(
+                        name="Grandchild Field Group",
+                        organization_id=organization_id,
+                        parent_grouper_id=child_fg_id,
+                    ),
+                )
+                ancestors = getGrouperAncestors(cursor, grandchild_fg_id)
+                list(ancestors.keys()).should.be.equal([child_fg_id, root_fg_id])
+                descendants = getGrouperDescendants(cursor, root_fg_id)
+                list(descendants.keys()).should.be.equal(
+                    [child_fg_id, grandchild_fg_id]
+                )
+                getGrouperSubtreeFieldCounts(cursor, [root_fg_id]).should.be.equal(
+                    {root_fg_id: 0}
+                )
+
+    def test_reparent_grouper_subtree(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                old_root_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(name="Old Root Grouper", organization_id=organization_id),
+                )
+                new_root_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(name="New Root Grouper", organization_id=organization_id),
+                )
+                moved_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(
+                        name="Moved Grouper",
+                        organization_id=organization_id,
+                        parent_grouper_id=old_root_id,
+                    ),
+                )
+                moved_child_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(
+                        name="Moved Child Grouper",
+                        organization_id=organization_id,
+                        parent_grouper_id=moved_id,
+                    ),
+                )
+
+                cursor.execute(
+                    "update grouper set parent_grouper_id = %(parent)s where grouper_id = %(grouper_id)s",
+                    {"parent": new_root_id, "grouper_id": moved_id},
+                )
+                list(
+                    getGrouperAncestors(cursor, moved_child_id).keys()
+                ).should.be.equal([moved_id, new_root_id])
+                list(getGrouperDescendants(cursor, new_root_id).keys()).should.be.equal(
+                    [moved_id, moved_child_id]
+                )
+                getGrouperDescendants(cursor, old_root_id).should.be.equal({})
+
+                # Detaching the subtree makes its top a root
+                cursor.execute(
+                    "update grouper set parent_grouper_id = null where grouper_id = %(grouper_id)s",
+                    {"grouper_id": moved_id},
+                )
+                getGrouperAncestors(cursor, moved_id).should.be.equal({})
+                list(
+                    getGrouperAncestors(cursor, moved_child_id).keys()
+                ).should.be.equal([moved_id])
+                getGrouperDescendants(cursor, new_root_id).should.be.equal({})
+
+    def test_grouper_cycle_raises(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                parent_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(name="Cycle Grouper", organization_id=organization_id),
+                )
+                child_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(
+                        name="Cycle Child Grouper",
+                        organization_id=organization_id,
+                        parent_grouper_id=parent_id,
+                    ),
+                )
+                with pytest.raises(RaiseException):
+                    cursor.execute(
+                        "update grouper set parent_grouper_id = %(parent)s where grouper_id = %(grouper_id)s",
+                        {"parent": child_id, "grouper_id": parent_id},
+                    )
+
+    def test_grouper_self_parent_raises(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                grouper_id = insertOrGetGrouper(
+                    cursor,
+                    Grouper(name="Self Grouper", organization_id=organization_id),
+                )
+                with pytest.raises(RaiseException):
+                    cursor.execute(
+                        "update grouper set parent_grouper_id = grouper_id where grouper_id = %(grouper_id)s",
+                        {"grouper_id": grouper_id},
+                    )
+
+    def test_insert_self_parent_grouper_raises(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                with pytest.raises(RaiseException):
+                    cursor.execute(
+                        """
+                        with N as (select nextval(pg_get_serial_sequence('grouper', 'grouper_id')) as grouper_id)
+                        insert into grouper (grouper_id, name, organization_id, parent_grouper_id)
+                        select N.grouper_id, 'Self Inserted Grouper', %(organization_id)s, N.grouper_id
+                        from N
+                        """,
+                        {"organization_id": organization_id},
+                    )
+
+    def test_upsert_grouper(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                grouper = Grouper(
+                    name="Upsert Grouper",
+                    organization_id=organization_id,
+                    parent_grouper_id=None,
+                )
+                grouper_id = upsertGrouper(cursor, grouper)
+                upsertGrouper(cursor, grouper).should.be.equal(grouper_id)
+                getMaybeGrouperId(cursor, grouper).should.be.equal(grouper_id)
+
+                # Fields outside the natural key are updated in place
+                updated = Grouper(
+                    name="Upsert Grouper",
+                    organization_id=organization_id,
+                    parent_grouper_id=None,
+                    details={"source": "upsert"},
+                )
+                upsertGrouper(cursor, updated).should.be.equal(grouper_id)
+                cursor.execute(
+                    "select details from grouper where grouper_id = %s", (grouper_id,)
+                )
+                cursor.fetchone()[0].should.be.equal({"source": "upsert"})
+
+    def test_grouper_lookup_uses_index(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                organization_id = insertOrGetOrganization(cursor, ORGANIZATION)
+                grouper = Grouper(
+                    name="Root Grouper",
+                    organization_id=organization_id,
+                    parent_grouper_id=None,
+                )
+                plan = explainMaybeId(cursor, "grouper", grouper)
+                plan.uses_index.should.be.true
+
     def test_read_grouper_table(self, test_db_class):
         with test_db_class.connect() as conn:
             with conn.begin():
@@ -0,0 +1,34 @@
+from sure import expect
+
+from demeter.data import (
+    Organization,
+    insertOrGetManyOrganization,
+    insertOrGetOrganization,
+)
+
+
+class TestUpsertMany:
+    """
+    Note: After all the tests in TestUpsertMany run, `test_db_class` will clear all data since it has "class" scope.
+    """
+
+    def test_insert_or_get_many_organization(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                org_a = Organization(name="Organization A")
+                org_b = Organization(name="Organization B")
+                ids = insertOrGetManyOrganization(cursor, [org_a, org_b, org_a])
+                expect(ids).to.equal([1, 2, 1])
+
+                org_c = Organization(name="Organization C")
+                ids = insertOrGetManyOrganization(cursor, [org_c, org_b])
+                expect(ids).to.equal([3, 2])
+
+                insertOrGetOrganization(cursor, org_c).should.be.equal(3)
+
+    def test_insert_or_get_many_empty(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                expect(insertOrGetManyOrganization(cursor, [])).to.equal([])
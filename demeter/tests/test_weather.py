@@ -1,8 +1,16 @@
 import pytest
+from geopandas import GeoSeries
 from pyproj import CRS
 from shapely.geometry import Point
 from sure import expect
 
+from demeter.weather.query import (
+    WeatherGrid,
+    get_centroids,
+    points_on_land,
+    query_weather_grid_many,
+    timezones_for_points,
+)
 from demeter.weather.query._grid import query_weather_grid
 
 
@@ -31,3 +39,58 @@ class TestUpsertGeom:
         gdf.cell_id[0].should.be.equal_to(17211907)
         gdf.lng_centroid[0].should.be.equal_to(-93.10847)
         gdf.lat_centroid[0].should.be.equal_to(44.66063)
+
+    def test_weather_grid_lookup(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                points = [Point(-93.12345, 44.67890), Point(200.0, 0.0)]
+                df = WeatherGrid(cursor).lookup(points)
+
+        list(df.columns).should.equal(
+            ["world_utm_id", "cell_id", "rast_col", "rast_row"]
+        )
+        df.world_utm_id[0].should.be.equal_to(917)
+        df.rast_col[0].should.be.equal_to(50)
+        df.rast_row[0].should.be.equal_to(104)
+        df.cell_id[0].should.be.equal_to(17211907)
+        df.iloc[1].isna().all().should.be.true
+
+    def test_get_centroids(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                centroids = get_centroids(cursor, 917, [17211907])
+
+        centroids[0].x.should.be.equal_to(-93.10847)
+        centroids[0].y.should.be.equal_to(44.66063)
+
+    def test_query_weather_grid_many(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                points = GeoSeries(
+                    [Point(-93.12345, 44.67890), Point(200.0, 0.0)],
+                    index=[10, 20],
+                    crs=CRS.from_epsg(4326),
+                )
+                gdf = query_weather_grid_many(conn, points)
+
+        list(gdf.index).should.equal([10])
+        gdf.world_utm_id[10].should.be.equal_to(917)
+        gdf.cell_id[10].should.be.equal_to(17211907)
+        gdf.lng_centroid[10].should.be.equal_to(-93.10847)
+        gdf.lat_centroid[10].should.be.equal_to(44.66063)
+
+    def test_timezones_for_points(self, test_db_class):
+        with test_db_class.connect() as conn:
+            with conn.begin():
+                cursor = conn.connection.cursor()
+                timezones = timezones_for_points(cursor, [-93.12345], [44.67890])
+
+        list(timezones).should.equal(["America/Chicago"])
+
+    def test_points_on_land(self):
+        # Minneapolis, the middle of the Pacific, and Madrid
+        on_land = points_on_land([-93.26, -150.0, -3.70], [44.98, 0.0, 40.42])
+        on_land.tolist().should.equal([True, False, True])
+        points_on_land([], []).shape.should.equal((0,))
@@ -2,14 +2,20 @@
 from ._grid import (
     get_cell_id,
     get_centroid,
+    get_centroids,
     get_info_for_world_utm,
     get_world_utm_info_for_cell_id,
+    points_on_land,
+    query_weather_grid,
+    query_weather_grid_many,
+    timezones_for_points,
 )
 from ._query import (
     get_daily_weather_type_for_cell_id,
     get_daily_weather_types,
     get_weather_type_id_from_db,
 )
+from ._weather_grid import WeatherGrid
 
 __all__ = [
     "get_daily_weather_types",
@@ -17,6 +23,12 @@ __all__ = [
     "get_daily_weather_type_for_cell_id",
     "get_cell_id",
     "get_centroid",
+    "get_centroids",
     "get_info_for_world_utm",
     "get_world_utm_info_for_cell_id",
+    "query_weather_grid",
+    "query_weather_grid_many",
+    "points_on_land",
+    "timezones_for_points",
+    "WeatherGrid",
 ]
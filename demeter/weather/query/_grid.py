@@ -3,18 +3,28 @@
 from typing import (
     Any,
     List,
+    Sequence,
     Union,
 )
 
+import numpy as np
 from geo_utils.vector import reproject_shapely
-from geopandas import read_postgis
+from geopandas import (
+    GeoDataFrame,
+    GeoSeries,
+    read_postgis,
+)
 from global_land_mask.globe import is_land
-from pandas import DataFrame
+from numpy.typing import ArrayLike
+from pandas import DataFrame, Series
 from pyproj import CRS
+from shapely import points as shapely_points
 from shapely.geometry import Point
 from shapely.wkb import loads as wkb_loads
 from sqlalchemy.engine import Connection
 
+from ..utils.time import tzf
+
 
 def get_cell_id(
     cursor: Any, geometry: Point, geometry_crs: CRS = CRS.from_epsg(4326)
@@ -64,22 +74,12 @@ def get_cell_id(
 def get_centroid(cursor: Any, world_utm_id: int, cell_id: int):
     """For a given cell ID and world UTM ID, get its centroid from the database."""
     stmt = """
-    with q1 as (
-        select raster_5km.rast_cell_id as rast
-        from world_utm, raster_5km
-        where world_utm.world_utm_id= %(world_utm_id)s
-        and world_utm.world_utm_id=raster_5km.world_utm_id
-    ), q2 as (
-        select q1.rast, (ST_PixelOfValue(q1.rast, 1, %(cell_id)s)).*
-        from q1
-    ), q3 as (
-        select ST_ReducePrecision(ST_Transform(ST_PixelAsCentroid(q2.rast, q2.x, q2.y), 4326), 0.00001) as point
-        from q2
-    )
-    select ST_Point(ROUND(ST_X(q3.point)::numeric,5), ROUND(ST_Y(q3.point)::numeric,5)) as centroid
-    from q3;
+    select centroid
+    from cell
+    where cell_id = %(cell_id)s
+    and world_utm_id = %(world_utm_id)s;
     """
-    args = {"world_utm_id": world_utm_id, "cell_id": int(cell_id)}
+    args = {"world_utm_id": int(world_utm_id), "cell_id": int(cell_id)}
     cursor.execute(stmt, args)
     res = DataFrame(cursor.fetchall())["centroid"].item()
     centroid = wkb_loads(res, hex=True)
@@ -87,16 +87,58 @@ def get_centroid(cursor: Any, world_utm_id: int, cell_id: int):
     return centroid
 
 
+def get_centroids(
+    cursor: Any,
+    world_utm_id: Union[int, Sequence[int]],
+    cell_ids: Union[Sequence[int], Series],
+) -> GeoSeries:
+    """Batch `get_centroid()`: the centroids of many cell IDs, looked up by primary key in `cell` with one query.
+
+    Args:
+        cursor (Any): Connection to Demeter weather database
+        world_utm_id (int or list of int): World UTM ID of all `cell_ids`, or of each of them
+        cell_ids (list of int or Series): Cell IDs to get centroids for
+
+    Returns:
+        GeoSeries of Point centroids (EPSG=4326), in the order (and with the index, if a Series) of `cell_ids`
+    """
+    index = cell_ids.index if isinstance(cell_ids, Series) else None
+    cell_ids = np.asarray(cell_ids, dtype=np.int64)
+    world_utm_ids = np.broadcast_to(
+        np.asarray(world_utm_id, dtype=np.int64), cell_ids.shape
+    )
+
+    stmt = """
+    select u.n, ST_X(c.centroid) as lng, ST_Y(c.centroid) as lat
+    from unnest(%(cell_ids)s::integer[], %(world_utm_ids)s::smallint[]) with ordinality as u(cell_id, world_utm_id, n)
+    join cell c
+      on c.cell_id = u.cell_id
+      and c.world_utm_id = u.world_utm_id
+    order by u.n
+    """
+    args = {
+        "cell_ids": [int(i) for i in cell_ids],
+        "world_utm_ids": [int(i) for i in world_utm_ids],
+    }
+    cursor.execute(stmt, args)
+    res = cursor.fetchall()
+    assert len(res) == len(
+        cell_ids
+    ), "Some `cell_ids` do not exist in the DB for their `world_utm_id`."
+
+    lons = np.array([r[1] for r in res], dtype=float)
+    lats = np.array([r[2] for r in res], dtype=float)
+    return GeoSeries(shapely_points(lons, lats), index=index, crs=CRS.from_epsg(4326))
+
+
 def get_world_utm_info_for_cell_id(cursor: Any, cell_id: int):
     """For a given cell ID, get its `world_utm_id`, `zone`, `row`, and `utc_offset` from the database."""
     stmt = """
-    select q.world_utm_id, (ST_PixelOfValue(q.rast, 1, %(cell_id)s)).*, w.row, w.zone, w.utc_offset
-    from (
-        select world_utm_id, rast_cell_id as rast
-        from raster_5km
-    ) as q
-    cross join world_utm as w
-    where w.world_utm_id = q.world_utm_id;
+    select c.world_utm_id, w.zone, w.row, w.utc_offset
+    from cell as c
+    join world_utm as w
+      on w.world_utm_id = c.world_utm_id
+    where c.cell_id = %(cell_id)s;
     """
 
     args = {"cell_id": int(cell_id)}
@@ -105,7 +147,7 @@ def get_world_utm_info_for_cell_id(cursor: Any, cell_id: int):
         ["world_utm_id", "zone", "row", "utc_offset"]
     ]
 
-    assert len(df_result) == 1, "Error: More than one raster contains this cell ID."
+    assert len(df_result) == 1, "This `cell_id` does not exist in the DB."
 
     return df_result
 
@@ -166,12 +208,9 @@ def query_weather_grid(conn: Connection, point: Point, crs: CRS = CRS.from_epsg(
     if epsg_src != 4326:
         epsg_dst = 4326
         point = reproject_shapely(epsg_src=epsg_src, epsg_dst=epsg_dst, geometry=point)
-    precision = 5
-    prec_decimal = "0." + "0" * (precision - 1) + "1"
     stmt = """
     with q1 AS (
-        select raster_5km.rast_cell_id as rast,
-            ST_Value(
+        select ST_Value(
             raster_5km.rast_cell_id,
             ST_Transform(ST_Point(%(x)s, %(y)s, 4326), world_utm.raster_epsg)
             ) as cell_id,
@@ -179,23 +218,13 @@ def query_weather_grid(conn: Connection, point: Point, crs: CRS = CRS.from_epsg(
         from world_utm, raster_5km
         where ST_intersects(ST_Point(%(x)s, %(y)s, 4326), world_utm.geom)
         and world_utm.world_utm_id=raster_5km.world_utm_id
-    ), q2 AS (
-        select q1.*, ST_PixelOfValue(q1.rast, 1, q1.cell_id) as pixel
-        from q1
-    ), q3 AS (
-        select q2.world_utm_id, (q2.pixel).x as rast_col, (q2.pixel).y as rast_row, q2.cell_id,
-        ST_ReducePrecision(ST_Transform(ST_PixelAsCentroid(q2.rast, (q2.pixel).x, (q2.pixel).y), 4326), %(prec_decimal)s) as point
-        from q2
     )
-    select q3.world_utm_id, q3.rast_col, q3.rast_row, q3.cell_id, ROUND(ST_X(q3.point)::numeric, %(precision)s) as lng_centroid, ROUND(ST_Y(q3.point)::numeric, %(precision)s) as lat_centroid, q3.point as pixel_centroid
-    from q3
+    select q1.world_utm_id, cell.rast_col, cell.rast_row, q1.cell_id, ST_X(cell.centroid) as lng_centroid, ST_Y(cell.centroid) as lat_centroid, cell.centroid as pixel_centroid
+    from q1
+    join cell
+      on cell.cell_id = q1.cell_id
     """
-    args = {
-        "x": point.x,
-        "y": point.y,
-        "precision": precision,
-        "prec_decimal": prec_decimal,
-    }
+    args = {"x": point.x, "y": point.y}
 
     # cursor.execute(stmt, args)
     # res = DataFrame(cursor.fetchall(), geometry="geometry", crs=CRS.from_epsg(4326)).sort_values(by=["cell_id"])
@@ -206,3 +235,120 @@ def query_weather_grid(conn: Connection, point: Point, crs: CRS = CRS.from_epsg(
         geom_col="pixel_centroid",
         crs=CRS.from_epsg(4326),
     )
+
+
+# Resolves arrays of WGS 84 coordinates (`x`, `y`) to cell IDs: `q1` has the cell ID of each point (by its 1-based
+# position `n`), with a row per UTM polygon on a boundary and no row for points outside of the grid
+_POINTS_TO_CELLS = """
+    with p AS (
+        select u.n, ST_Point(u.x, u.y, 4326) as point
+        from unnest(%(x)s::double precision[], %(y)s::double precision[]) with ordinality as u(x, y, n)
+    ), q1 AS (
+        select p.n,
+            ST_Value(
+            raster_5km.rast_cell_id,
+            ST_Transform(p.point, world_utm.raster_epsg)
+            ) as cell_id,
+            world_utm.world_utm_id as world_utm_id
+        from p
+        join world_utm
+          on ST_Intersects(p.point, world_utm.geom)
+        join raster_5km
+          on raster_5km.world_utm_id = world_utm.world_utm_id
+    )
+"""
+
+
+def points_on_land(lons: ArrayLike, lats: ArrayLike) -> np.ndarray:
+    """Array version of `pt_is_on_land()`: whether each point (WGS 84 `lons`, `lats`) is on land."""
+    return is_land(lat=np.asarray(lats, dtype=float), lon=np.asarray(lons, dtype=float))
+
+
+def timezones_for_points(cursor: Any, lons: ArrayLike, lats: ArrayLike) -> np.ndarray:
+    """IANA time zone of each point (WGS 84 `lons`, `lats`), resolved through the weather grid.
+
+    Points are joined to their cells with one statement and take the time zone precomputed for the cell centroid (see
+    `insert_cell_timezones()`), rather than running `TimezoneFinder()` for each point. Points outside of the grid (or
+    in cells without a time zone) fall back to `TimezoneFinder()`, which may not find one either.
+
+    Args:
+        cursor (Any): Connection to Demeter weather database
+        lons (array): Longitudes of the points
+        lats (array): Latitudes of the points
+
+    Returns:
+        numpy.ndarray of time zone names (`None` where no time zone was found), in the order of the points
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    stmt = (
+        _POINTS_TO_CELLS
+        + """
+    select distinct on (q1.n) q1.n, cell.timezone
+    from q1
+    join cell
+      on cell.cell_id = q1.cell_id
+    order by q1.n, q1.cell_id
+    """
+    )
+    args = {"x": [float(x) for x in lons], "y": [float(y) for y in lats]}
+    cursor.execute(stmt, args)
+
+    timezones = np.full(len(lons), None, dtype=object)
+    for n, timezone in cursor.fetchall():
+        timezones[n - 1] = timezone
+    for i in [i for i, timezone in enumerate(timezones) if timezone is None]:
+        timezones[i] = tzf.timezone_at(lng=lons[i], lat=lats[i])
+    return timezones
+
+
+def query_weather_grid_many(
+    conn: Connection, points: GeoSeries, crs: CRS = CRS.from_epsg(4326)
+) -> GeoDataFrame:
+    """
+    Batch `query_weather_grid()`: queries the demeter weather grid for many Point geometries with one statement.
+
+    The coordinates are sent as two arrays that are unnested and joined to `world_utm` with `ST_Intersects` (and to
+    `cell` by primary key), so the whole batch is a single round trip. If a point falls on a boundary between cells,
+    the smaller cell ID is kept (as in `get_cell_id()`).
+
+    Args:
+        conn (Connection): Active connection to the database to query.
+        points (GeoSeries): Points to query.
+        crs (CRS, optional): CRS of `points` if it has none; projected to EPSG=4326 if not already in EPSG=4326.
+        Defaults to CRS.from_epsg(4326).
+
+    Returns:
+        GeoDataFrame: With the columns of `query_weather_grid()` and the index of `points`, with one row per point;
+        points outside of the weather grid are left out.
+    """
+    assert all(
+        isinstance(point, Point) for point in points
+    ), "`points` must only contain `Point` geometries"
+
+    if points.crs is None:
+        points = points.set_crs(crs)
+    if points.crs.to_epsg() != 4326:
+        points = points.to_crs(epsg=4326)
+
+    stmt = (
+        _POINTS_TO_CELLS
+        + """
+    select distinct on (q1.n) q1.n, q1.world_utm_id, cell.rast_col, cell.rast_row, q1.cell_id, ST_X(cell.centroid) as lng_centroid, ST_Y(cell.centroid) as lat_centroid, cell.centroid as pixel_centroid
+    from q1
+    join cell
+      on cell.cell_id = q1.cell_id
+    order by q1.n, q1.cell_id
+    """
+    )
+    args = {"x": list(points.x), "y": list(points.y)}
+
+    gdf = read_postgis(
+        sql=stmt,
+        con=conn,
+        params=args,
+        geom_col="pixel_centroid",
+        crs=CRS.from_epsg(4326),
+    )
+    gdf.index = points.index[gdf["n"].to_numpy(dtype=int) - 1]
+    return gdf.drop(columns="n")
@@ -0,0 +1,193 @@
+"""In-memory index of the weather grid network for resolving many points to cell IDs without a query per point."""
+
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from geopandas import GeoSeries
+from pandas import NA, DataFrame
+from pyproj import CRS, Transformer
+from shapely import (
+    STRtree,
+    from_wkb,
+    get_x,
+    get_y,
+)
+from shapely import points as shapely_points
+from shapely.geometry import Point
+
+
+class RasterMeta(NamedTuple):
+    """Georeference of a `raster_5km` raster (as returned by `ST_MetaData()`)."""
+
+    upperleftx: float
+    upperlefty: float
+    width: int
+    height: int
+    scalex: float
+    scaley: float
+    skewx: float
+    skewy: float
+    srid: int
+
+
+@lru_cache(maxsize=None)
+def _transformer(epsg_src: int, epsg_dst: int) -> Transformer:
+    return Transformer.from_crs(
+        CRS.from_epsg(epsg_src), CRS.from_epsg(epsg_dst), always_xy=True
+    )
+
+
+def world_to_pixel(
+    meta: RasterMeta, x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverts the raster's affine transform: 0-based (col, row) of the pixels containing `x`, `y` (in `meta.srid`)."""
+    dx = np.asarray(x, dtype=float) - meta.upperleftx
+    dy = np.asarray(y, dtype=float) - meta.upperlefty
+    det = meta.scalex * meta.scaley - meta.skewx * meta.skewy
+    col = (meta.scaley * dx - meta.skewx * dy) / det
+    row = (meta.scalex * dy - meta.skewy * dx) / det
+    return np.floor(col).astype(np.int64), np.floor(row).astype(np.int64)
+
+
+def get_raster_meta(
+    cursor: Any, world_utm_id: Optional[Sequence[int]] = None
+) -> Dict[int, RasterMeta]:
+    """Georeference of the `raster_5km` raster of each of `world_utm_id` (or of every raster if None)."""
+    stmt = """
+    select world_utm_id, (ST_MetaData(rast_cell_id)).*
+    from raster_5km
+    """
+    args = {}
+    if world_utm_id is not None:
+        stmt += "where world_utm_id = any(%(world_utm_id)s)"
+        args["world_utm_id"] = [int(i) for i in world_utm_id]
+    cursor.execute(stmt, args)
+    return {int(r[0]): RasterMeta(*r[1:5], *r[5:9], r[9]) for r in cursor.fetchall()}
+
+
+def get_cell_id_array(cursor: Any, world_utm_id: int) -> np.ndarray:
+    """(height, width) array of the cell IDs of a UTM polygon's raster; pixels outside the polygon are 0."""
+    stmt = """
+    select ST_DumpValues(rast_cell_id, 1, false) as cell_ids
+    from raster_5km
+    where world_utm_id = %(world_utm_id)s
+    """
+    cursor.execute(stmt, {"world_utm_id": int(world_utm_id)})
+    values = np.array(cursor.fetchone()[0], dtype=float)
+    return np.nan_to_num(values).astype(np.int64)
+
+
+class WeatherGrid:
+    """Weather grid network loaded from `world_utm` and `raster_5km`, for resolving arrays of points to grid cells.
+
+    The `world_utm` polygons are loaded into an STRtree and the georeference of every `raster_5km` raster is loaded
+    once, when the grid is created; the cell ID array of a raster is loaded the first time a point falls in its UTM
+    polygon. After that, `lookup()` is pure array math (pyproj and the inverse affine transform of each raster), with
+    no database round trip per point.
+
+    Args:
+        cursor (Any): Connection to Demeter weather database; kept to load cell ID arrays as they are needed.
+    """
+
+    def __init__(self, cursor: Any) -> None:
+        self._cursor = cursor
+
+        stmt = """
+        select world_utm_id, ST_AsBinary(geom) as geom
+        from world_utm
+        order by world_utm_id
+        """
+        cursor.execute(stmt)
+        results = cursor.fetchall()
+        self.world_utm_ids = np.array([r[0] for r in results], dtype=np.int64)
+        self.polygons = from_wkb([bytes(r[1]) for r in results])
+        self.tree = STRtree(self.polygons)
+
+        self.rasters = get_raster_meta(cursor)
+        self._cell_ids: Dict[int, np.ndarray] = {}
+
+    def cell_ids(self, world_utm_id: int) -> np.ndarray:
+        """(height, width) array of the cell IDs of a UTM polygon's raster; pixels outside the polygon are 0."""
+        world_utm_id = int(world_utm_id)
+        if world_utm_id not in self._cell_ids:
+            self._cell_ids[world_utm_id] = get_cell_id_array(self._cursor, world_utm_id)
+        return self._cell_ids[world_utm_id]
+
+    def lookup(
+        self,
+        points: Union[GeoSeries, Sequence[Point]],
+        crs: CRS = CRS.from_epsg(4326),
+    ) -> DataFrame:
+        """Resolves points to their weather grid cells.
+
+        As in `get_cell_id()`, a point on a boundary between cells (or UTM polygons) resolves to the smallest cell ID.
+
+        Args:
+            points (GeoSeries or sequence of Point): Points to resolve; the CRS of a GeoSeries takes precedence over
+            `crs`.
+            crs (pyproj.CRS): Coordinate reference system of `points`. Defaults to WGS 84 (EPSG=4326).
+
+        Returns:
+            DataFrame: With columns ["world_utm_id", "cell_id", "rast_col", "rast_row"] (nullable integers; missing for
+            points outside the grid) and the index of `points` (if a GeoSeries). `rast_col` and `rast_row` are 1-based,
+            like `ST_PixelOfValue()`.
+        """
+        if isinstance(points, GeoSeries):
+            index = points.index
+            crs = points.crs or crs
+            geoms = points.to_numpy()
+        else:
+            geoms = np.asarray(points, dtype=object)
+            index = None
+        lons, lats = get_x(geoms), get_y(geoms)
+        epsg_src = CRS.from_user_input(crs).to_epsg()
+        if epsg_src != 4326:
+            lons, lats = _transformer(epsg_src, 4326).transform(lons, lats)
+
+        n = len(geoms)
+        best = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+        world_utm_id = np.zeros(n, dtype=np.int64)
+        rast_col = np.zeros(n, dtype=np.int64)
+        rast_row = np.zeros(n, dtype=np.int64)
+
+        point_idx, poly_idx = self.tree.query(
+            shapely_points(lons, lats), predicate="intersects"
+        )
+        for p in np.unique(poly_idx):
+            which = point_idx[poly_idx == p]
+            utm_id = int(self.world_utm_ids[p])
+            meta = self.rasters.get(utm_id)
+            if meta is None:
+                continue
+            x, y = _transformer(4326, meta.srid).transform(lons[which], lats[which])
+            col, row = world_to_pixel(meta, x, y)
+            inside = (col >= 0) & (col < meta.width) & (row >= 0) & (row < meta.height)
+            which, col, row = which[inside], col[inside], row[inside]
+            cell_id = self.cell_ids(utm_id)[row, col]
+            better = (cell_id > 0) & (cell_id < best[which])
+            which, col, row = which[better], col[better], row[better]
+            best[which] = cell_id[better]
+            world_utm_id[which] = utm_id
+            rast_col[which] = col + 1
+            rast_row[which] = row + 1
+
+        df = DataFrame(
+            {
+                "world_utm_id": world_utm_id,
+                "cell_id": best,
+                "rast_col": rast_col,
+                "rast_row": rast_row,
+            },
+            index=index,
+        ).astype("Int64")
+        df.loc[world_utm_id == 0, :] = NA
+        return df
@@ -13,25 +13,24 @@ from typing import (
 )
 
 from geopandas import GeoDataFrame
-from pandas import DataFrame
-from pandas import concat as pd_concat
+from numpy import where
+from pandas import DataFrame, isna
 from pandas import merge as pd_merge
+from pandas import to_datetime
 from psycopg2.extensions import AsIs
 from pyproj import CRS
 from pytz import UTC
+from shapely import from_wkb
 from shapely.errors import ShapelyDeprecationWarning
 from shapely.geometry import Point
-from shapely.wkb import loads as wkb_loads
 
 from demeter.weather.query import (
-    get_cell_id,
-    get_centroid,
-    get_world_utm_info_for_cell_id,
-)
-from demeter.weather.utils.time import (
-    get_min_current_date_for_world_utm,
-    localize_utc_datetime_with_timezonefinder,
+    WeatherGrid,
+    get_centroids,
+    get_info_for_world_utm,
+    timezones_for_points,
 )
+from demeter.weather.utils.time import get_min_current_date_for_world_utm
 
 warnings.filterwarnings("ignore", category=ShapelyDeprecationWarning)
 
@@ -101,15 +100,16 @@ def get_temporal_bounds_for_field_id(
 ) -> DataFrame:
     """Gets list of dates needed for a field ID (or list of field IDs) based on available planting dates.
 
-    Planting dates for each field are localized using `TimezoneFinder()` to ensure appropriate coverage
-    for weather in local times.
+    Planting dates for each field are localized to the time zone of the field centroid (see
+    `timezones_for_points()`) to ensure appropriate coverage for weather in local times. Fields whose centroid has
+    no time zone are localized in UTC (with a warning).
 
     Assumes data is desired from Jan 1 of the year `n_hist_years` years before the planting year.
     Then, it adds the last date with the current date so as to ensure that the last year is recognized
     as the current year.
 
     Args:
-        cursor (Any): Connection to `demeter` schema
+        cursor (Any): Connection with access to both the demeter and weather schemas
         field_id (int or list of int): Demeter field ID[s] for which to determine bounds
         field_centroid (Point or list of Points): Centroid (or location on field) to use to determine time zone
         n_hist_years (int): The number of years before the first planting date to get data
@@ -137,14 +137,22 @@ def get_temporal_bounds_for_field_id(
     gdf.dropna(axis=0, subset=["date_planted"], inplace=True)
 
     # localize planting date with political time zones to ensure appropriate weather coverage
-    gdf["date_planted_local"] = gdf.apply(
-        lambda row: localize_utc_datetime_with_timezonefinder(
-            d=row["date_planted"], geom=row["field_centroid"]
-        ),
-        axis=1,
+    timezones = timezones_for_points(
+        cursor, gdf["field_centroid"].x, gdf["field_centroid"].y
     )
-
-    gdf["year_planted"] = gdf["date_planted_local"].map(lambda d: d.year)
+    no_timezone = isna(timezones)
+    if no_timezone.any():
+        logging.warning(
+            "No time zone found for the centroid of field_id %s; localizing planting dates in UTC.",
+            gdf.loc[no_timezone, "field_id"].to_list(),
+        )
+    gdf["timezone"] = where(no_timezone, "UTC", timezones)
+    date_planted_utc = to_datetime(gdf["date_planted"]).dt.tz_localize(UTC)
+    gdf["year_planted"] = 0
+    for timezone, index in gdf.groupby("timezone").groups.items():
+        gdf.loc[index, "year_planted"] = (
+            date_planted_utc[index].dt.tz_convert(timezone).dt.year
+        )
     gdf["date_first"] = gdf["year_planted"].map(
         lambda yr: datetime(yr - n_hist_years, 1, 1)
     )
@@ -183,9 +191,7 @@ def get_field_centroid_for_field_id(
 
     assert len(df_result) > 0, "No geom was found for `field_id` in demeter."
 
-    df_result["centroid"] = df_result["centroid"].map(
-        lambda hex: wkb_loads(hex, hex=True)
-    )
+    df_result["centroid"] = from_wkb(df_result["centroid"].to_numpy())
     df_result.rename(columns={"centroid": "field_centroid"}, inplace=True)
 
     gdf_result = GeoDataFrame(df_result, geometry="field_centroid")
@@ -216,9 +222,9 @@ def get_weather_grid_info_for_all_demeter_fields(cursor: Any) -> DataFrame:
         )
 
     gdf_field_space = get_field_centroid_for_field_id(cursor, field_id)
-    gdf_field_space["cell_id"] = gdf_field_space.apply(
-        lambda row: get_cell_id(cursor, row["field_centroid"]), axis=1
-    )
+    df_cells = WeatherGrid(cursor).lookup(gdf_field_space["field_centroid"])
+    gdf_field_space["cell_id"] = df_cells["cell_id"]
+    gdf_field_space["world_utm_id"] = df_cells["world_utm_id"]
 
     # get temporal bounds based on planting date, location, and `n_hist_years`
     df_field_time = get_temporal_bounds_for_field_id(
@@ -240,19 +246,14 @@ def get_weather_grid_info_for_all_demeter_fields(cursor: Any) -> DataFrame:
     # TODO: This needs to be removed until we figure out which cell IDs already exist
     # in demeter. Just returning "cell_id" at this stage is fine.
 
-    # add world utm ID to make centroid queries faster and add UTM zone
-    df_world_utm = gdf_unique.apply(
-        lambda row: get_world_utm_info_for_cell_id(cursor, row["cell_id"]).iloc[0],
-        axis=1,
-    )
-
-    gdf_world_utm = pd_concat([gdf_unique, df_world_utm], axis=1).rename(
-        columns={"zone": "utm_zone"}
+    # add UTM zone and UTC offset of each world utm ID (which makes centroid queries faster)
+    df_world_utm = get_info_for_world_utm(
+        cursor, [int(i) for i in gdf_unique["world_utm_id"].unique()]
     )
+    gdf_world_utm = pd_merge(gdf_unique, df_world_utm, on="world_utm_id")
 
-    gdf_world_utm["centroid"] = gdf_world_utm.apply(
-        lambda row: get_centroid(cursor, row["world_utm_id"], row["cell_id"]),
-        axis=1,
+    gdf_world_utm["centroid"] = get_centroids(
+        cursor, gdf_world_utm["world_utm_id"], gdf_world_utm["cell_id"]
     )
 
     gdf_clean = GeoDataFrame(
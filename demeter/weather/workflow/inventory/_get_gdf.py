@@ -14,7 +14,7 @@ from pytz import UTC
 from sqlalchemy.engine import Connection
 
 from demeter.weather.query import (
-    get_centroid,
+    get_centroids,
     get_daily_weather_type_for_cell_id,
     get_daily_weather_types,
     get_info_for_world_utm,
@@ -108,9 +108,8 @@ def get_gdf_for_update(conn: Connection) -> GeoDataFrame:
     df_full["date_last"] = today + timedelta(days=7)
 
     # get centroid for each cell ID
-    df_full["centroid"] = df_full.apply(
-        lambda row: get_centroid(cursor, row["world_utm_id"], row["cell_id"]),
-        axis=1,
+    df_full["centroid"] = get_centroids(
+        cursor, df_full["world_utm_id"], df_full["cell_id"]
     )
 
     gdf_full = GeoDataFrame(
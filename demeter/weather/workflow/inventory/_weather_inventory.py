@@ -20,7 +20,7 @@ from shapely.errors import ShapelyDeprecationWarning
 
 from demeter.db._postgres.tools import doPgFormat
 
-from ...query import get_centroid, get_info_for_world_utm
+from ...query import get_centroids, get_info_for_world_utm
 from ...utils.time import get_min_current_date_for_world_utm
 
 warnings.filterwarnings("ignore", category=ShapelyDeprecationWarning)
@@ -208,9 +208,8 @@ def get_weather_grid_info_for_populated_cell_ids(cursor: Any) -> GeoDataFrame:
         gdf_available = pd_merge(gdf_available, df_utm, on="world_utm_id")
 
         # get centroid for each cell ID
-        gdf_available["centroid"] = gdf_available.apply(
-            lambda row: get_centroid(cursor, row["world_utm_id"], row["cell_id"]),
-            axis=1,
+        gdf_available["centroid"] = get_centroids(
+            cursor, gdf_available["world_utm_id"], gdf_available["cell_id"]
         )
 
         return gdf_available[cols]
@@ -167,17 +167,7 @@ class DataSource(DataSourceBase):
 
     def getGeometry(self) -> gpd.GeoDataFrame:
         geo_ids = [k.geom_id for k in self.keys]
-        stmt = """
-             select G.geom_id, G.geom, G.container_geom_id
-             from geom G
-             join geom CONTAINER
-               on G.geom_id = CONTAINER.geom_id
-             where G.geom_id = any(%(geo_ids)s)
-           """
-        result = gpd.read_postgis(
-            stmt, self.cursor.connection, "geom", params={"geo_ids": geo_ids}
-        )
-        return result
+        return data.getGeoms(self.cursor, geo_ids)
 
     def join(
         self,
@@ -77,15 +77,19 @@ def getSignature(
         for (_, s3_type_id) in output_types.values()
     ]
 
+    observation_type_ids = input_types["observation_type_ids"]
+    observation_types = data.getManyObservationType(
+        cursor, observation_type_ids, use_identity_map=True
+    )
+    http_type_ids = input_types["http_type_ids"]
+    http_types = task.getManyHTTPType(cursor, http_type_ids, use_identity_map=True)
+
     return task.FunctionSignature(
         name=function.function_name,
         major=function.major,
-        observation_inputs=[
-            data.getObservationType(cursor, i)
-            for i in input_types["observation_type_ids"]
-        ],
+        observation_inputs=[observation_types[i] for i in observation_type_ids],
         keyword_inputs=keyword_inputs,
-        http_inputs=[task.getHTTPType(cursor, i) for i in input_types["http_type_ids"]],
+        http_inputs=[http_types[i] for i in http_type_ids],
         s3_inputs=s3_inputs,
         s3_outputs=s3_outputs,
     )
@@ -0,0 +1,30 @@
+-- Adds geom.geom_hash (and the unique index on it) to a demeter schema created before it, replacing the
+-- geom_must_be_unique constraint trigger.
+--
+-- Adding the generated column rewrites geom, computing the hash of every existing row, and holds an exclusive lock on
+-- the table until the migration commits. Creating geom_hash_idx fails if two rows already hold the same geometry in
+-- canonical form; they can be found (before or after running this script) with:
+--   select canonical_geom_hash(geom), array_agg(geom_id) from geom group by 1 having count(*) > 1;
+
+set search_path = test_demeter, public;
+
+begin;
+
+CREATE OR REPLACE FUNCTION canonical_geom(g public.geometry) RETURNS public.geometry
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS
+$$ SELECT public.ST_Normalize(public.ST_QuantizeCoordinates(public.ST_ReducePrecision(g, 1e-7), 7)) $$;
+
+CREATE OR REPLACE FUNCTION canonical_geom_hash(g public.geometry) RETURNS bytea
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS
+$$ SELECT pg_catalog.sha256(public.ST_AsBinary(test_demeter.canonical_geom(g))) $$;
+
+drop trigger if exists geom_must_be_unique on geom;
+drop function if exists geom_must_be_unique();
+
+alter table geom
+  add column if not exists geom_hash bytea
+                           generated always as (canonical_geom_hash(geom)) stored;
+
+CREATE UNIQUE INDEX IF NOT EXISTS geom_hash_idx on geom (geom_hash);
+
+commit;
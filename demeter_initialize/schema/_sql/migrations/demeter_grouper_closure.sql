@@ -0,0 +1,122 @@
+-- Adds grouper_closure (and the triggers that maintain it) to a demeter schema created before it, and fills it from
+-- the parent_grouper_id of the existing groupers.
+--
+-- grouper is locked against writes until the migration commits, so that no grouper is inserted or re-parented between
+-- the backfill and the creation of the triggers. The migration fails (and changes nothing) if parent_grouper_id
+-- already forms a cycle, which the triggers would have rejected.
+
+set search_path = test_demeter, public;
+
+begin;
+
+lock table grouper in share row exclusive mode;
+
+create table if not exists grouper_closure (
+  ancestor_grouper_id bigint
+                      not null
+                      references grouper(grouper_id)
+                      on delete cascade,
+
+  descendant_grouper_id bigint
+                        not null
+                        references grouper(grouper_id)
+                        on delete cascade,
+
+  depth int
+        not null,
+
+  primary key (ancestor_grouper_id, descendant_grouper_id)
+);
+
+CREATE INDEX IF NOT EXISTS grouper_closure_descendant_idx on grouper_closure (descendant_grouper_id, depth);
+
+CREATE OR REPLACE FUNCTION grouper_closure_insert()
+  RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.parent_grouper_id = NEW.grouper_id THEN
+    RAISE EXCEPTION 'grouper % cannot be a descendant of itself (parent_grouper_id = %)',
+      NEW.grouper_id, NEW.parent_grouper_id;
+  END IF;
+
+  INSERT INTO grouper_closure (ancestor_grouper_id, descendant_grouper_id, depth)
+  SELECT NEW.grouper_id, NEW.grouper_id, 0
+  UNION ALL
+  SELECT c.ancestor_grouper_id, NEW.grouper_id, c.depth + 1
+  FROM grouper_closure c
+  WHERE c.descendant_grouper_id = NEW.parent_grouper_id;
+  RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS grouper_closure_insert ON grouper;
+CREATE TRIGGER grouper_closure_insert AFTER INSERT
+ON grouper FOR EACH ROW EXECUTE PROCEDURE
+grouper_closure_insert();
+
+-- Moves the subtree of a re-parented grouper: unlinks it from its old ancestors and links it under the new parent
+CREATE OR REPLACE FUNCTION grouper_closure_update()
+  RETURNS TRIGGER AS $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM grouper_closure c
+    WHERE c.ancestor_grouper_id = NEW.grouper_id AND c.descendant_grouper_id = NEW.parent_grouper_id
+  ) THEN
+    RAISE EXCEPTION 'grouper % cannot be a descendant of itself (parent_grouper_id = %)',
+      NEW.grouper_id, NEW.parent_grouper_id;
+  END IF;
+
+  DELETE FROM grouper_closure c
+  USING grouper_closure d, grouper_closure a
+  WHERE d.ancestor_grouper_id = NEW.grouper_id
+    AND a.descendant_grouper_id = NEW.grouper_id
+    AND a.ancestor_grouper_id <> NEW.grouper_id
+    AND c.ancestor_grouper_id = a.ancestor_grouper_id
+    AND c.descendant_grouper_id = d.descendant_grouper_id;
+
+  INSERT INTO grouper_closure (ancestor_grouper_id, descendant_grouper_id, depth)
+  SELECT a.ancestor_grouper_id, d.descendant_grouper_id, a.depth + d.depth + 1
+  FROM grouper_closure a
+  CROSS JOIN grouper_closure d
+  WHERE a.descendant_grouper_id = NEW.parent_grouper_id
+    AND d.ancestor_grouper_id = NEW.grouper_id;
+  RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS grouper_closure_update ON grouper;
+CREATE TRIGGER grouper_closure_update AFTER UPDATE OF parent_grouper_id
+ON grouper FOR EACH ROW
+WHEN (OLD.parent_grouper_id IS DISTINCT FROM NEW.parent_grouper_id)
+EXECUTE PROCEDURE grouper_closure_update();
+
+-- Every (ancestor, descendant) pair reachable through parent_grouper_id, with each grouper paired with itself at depth 0
+create temporary table grouper_closure_backfill on commit drop as
+with recursive T(ancestor_grouper_id, descendant_grouper_id, depth) as (
+  select G.grouper_id, G.grouper_id, 0
+  from grouper G
+  union all
+  select T.ancestor_grouper_id, G.grouper_id, T.depth + 1
+  from T
+  join grouper G on G.parent_grouper_id = T.descendant_grouper_id
+) CYCLE descendant_grouper_id SET is_cycle USING path
+select ancestor_grouper_id, descendant_grouper_id, depth, is_cycle
+from T;
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM grouper_closure_backfill WHERE is_cycle) THEN
+    RAISE EXCEPTION 'parent_grouper_id of grouper forms a cycle; fix it before running this migration';
+  END IF;
+END;
+$$;
+
+insert into grouper_closure (ancestor_grouper_id, descendant_grouper_id, depth)
+select ancestor_grouper_id, descendant_grouper_id, depth
+from grouper_closure_backfill
+on conflict (ancestor_grouper_id, descendant_grouper_id) do nothing;
+
+-- The triggers run as the user that writes to grouper
+grant select, insert, update, delete on grouper_closure to demeter_user;
+grant select on grouper_closure to demeter_ro_user;
+
+commit;
@@ -0,0 +1,36 @@
+-- Adds the cell table (and its indexes) and the world_utm.geom index to a weather schema created before them.
+--
+-- This only creates the (empty) table: `python3 -m demeter_initialize.schema.migrate --migration weather_cell` then
+-- fills it from raster_5km with `insert_cells()` and `insert_cell_timezones()`. The script can be re-run on a
+-- partially migrated schema (e.g., one with a cell table that has no timezone column yet).
+
+set search_path = weather, public;
+
+begin;
+
+create table if not exists cell (
+    cell_id integer primary key,
+    world_utm_id smallint
+                 not null
+                 references world_utm(world_utm_id),
+    rast_col smallint not null,
+    rast_row smallint not null,
+    -- pixel centroid in WGS 84, rounded to 5 decimal places
+    centroid geometry(Point, 4326) not null,
+    -- IANA time zone at `centroid` (precomputed with `TimezoneFinder()`)
+    timezone text
+);
+
+alter table cell add column if not exists timezone text;
+
+CREATE INDEX IF NOT EXISTS cell_world_utm_id_idx on cell(world_utm_id);
+CREATE INDEX IF NOT EXISTS cell_centroid_idx on cell using GIST(centroid);
+
+CREATE INDEX IF NOT EXISTS world_utm_geom_idx on world_utm using GIST(geom);
+
+grant select, insert on cell to demeter_user;
+grant select on cell to demeter_ro_user;
+grant select, insert on cell to weather_user;
+grant select on cell to weather_ro_user;
+
+commit;
@@ -12,6 +12,8 @@ COMMENT ON SCHEMA demeter IS 'Demeter Schema v0.0.0';
 
 create extension if not exists postgis with schema public;
 create extension if not exists postgis_raster with schema public;
+-- GiST operator classes for scalar types (e.g., the geom_id of field_geom_id_period_idx)
+create extension if not exists btree_gist with schema public;
 -- TODO: Fix this extension
 -- create extension "postgres-json-schema" with schema public;
 
@@ -136,39 +138,36 @@ $app_valid_date_applied$ LANGUAGE plpgsql;
 --  ALTER xxxx ADD CONSTRAINT enforce_srid_geom CHECK (st_srid(geom) = 28355)
 -- TODO: Table for geometries that get 'repaired' with their 'IsValidMessage' and 'IsValidDetails'
 
+-- canonical_geom() is the form geometries are compared in: reduced and quantized to 7 decimal places (1.11 cm at the
+-- equator) and normalized (ring orientation, vertex and part order). canonical_geom_hash() is its hash, which geom
+-- stores in geom_hash; `demeter.data.canonical_geom_hash()` computes the same value in Python.
+-- Every name in their bodies is schema-qualified: a generated column (and its index) must not depend on the
+-- search_path of whoever writes the row.
+CREATE OR REPLACE FUNCTION canonical_geom(g public.geometry) RETURNS public.geometry
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS
+$$ SELECT public.ST_Normalize(public.ST_QuantizeCoordinates(public.ST_ReducePrecision(g, 1e-7), 7)) $$;
+
+CREATE OR REPLACE FUNCTION canonical_geom_hash(g public.geometry) RETURNS bytea
+  LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS
+$$ SELECT pg_catalog.sha256(public.ST_AsBinary(test_demeter.canonical_geom(g))) $$;
+
 create table geom (
   geom_id bigserial primary key,
   geom geometry(Geometry, 4326) not null,
+  geom_hash bytea
+            generated always as (canonical_geom_hash(geom)) stored,
   check (ST_IsValid(geom))
 );
 
 CREATE INDEX CONCURRENTLY geom_idx on geom using SPGIST(geom);
 
+-- A geometry must be unique (compared in its canonical form)
+CREATE UNIQUE INDEX geom_hash_idx on geom (geom_hash);
+
 CREATE TRIGGER update_geom_last_updated BEFORE UPDATE
 ON geom FOR EACH ROW EXECUTE PROCEDURE
 update_last_updated_column();
 
-create function geom_must_be_unique() RETURNS trigger
-  LANGUAGE plpgsql AS
-$$BEGIN
-  IF (
-    select exists(
-        select ST_Equals(OLD.geom, geom.geom) from geom
-        where OLD.geom_id <> geom.geom_id
-      )
-     )
-  THEN
-    RAISE EXCEPTION 'A geometry must be unique';
-  END IF;
-
-  RETURN old;
-END;$$;
-
-create constraint trigger geom_must_be_unique
-       after insert or update on geom
-       deferrable initially deferred
-       for each row execute procedure geom_must_be_unique();
-
 
 -- ORGANIZATION
 
@@ -200,7 +199,7 @@ update_last_updated_column();
 
 create table grouper (
   grouper_id bigserial primary key,
-  -- TODO: Add cycle detection constraint
+  -- Cycles are rejected by grouper_closure_update() below
 
   name  text
         not null,
@@ -235,6 +234,86 @@ CREATE TRIGGER update_grouper_last_updated BEFORE UPDATE
 ON grouper FOR EACH ROW EXECUTE PROCEDURE
 update_last_updated_column();
 
+-- GROUPER CLOSURE
+-- Every (ancestor, descendant) pair of the grouper hierarchy, including each grouper with itself at depth 0, so that
+-- ancestor/descendant/subtree queries are a single index lookup regardless of the depth of the tree. Maintained by the
+-- triggers below as groupers are inserted or re-parented.
+create table grouper_closure (
+  ancestor_grouper_id bigint
+                      not null
+                      references grouper(grouper_id)
+                      on delete cascade,
+
+  descendant_grouper_id bigint
+                        not null
+                        references grouper(grouper_id)
+                        on delete cascade,
+
+  depth int
+        not null,
+
+  primary key (ancestor_grouper_id, descendant_grouper_id)
+);
+
+CREATE INDEX grouper_closure_descendant_idx on grouper_closure (descendant_grouper_id, depth);
+
+CREATE OR REPLACE FUNCTION grouper_closure_insert()
+  RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.parent_grouper_id = NEW.grouper_id THEN
+    RAISE EXCEPTION 'grouper % cannot be a descendant of itself (parent_grouper_id = %)',
+      NEW.grouper_id, NEW.parent_grouper_id;
+  END IF;
+
+  INSERT INTO grouper_closure (ancestor_grouper_id, descendant_grouper_id, depth)
+  SELECT NEW.grouper_id, NEW.grouper_id, 0
+  UNION ALL
+  SELECT c.ancestor_grouper_id, NEW.grouper_id, c.depth + 1
+  FROM grouper_closure c
+  WHERE c.descendant_grouper_id = NEW.parent_grouper_id;
+  RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER grouper_closure_insert AFTER INSERT
+ON grouper FOR EACH ROW EXECUTE PROCEDURE
+grouper_closure_insert();
+
+-- Moves the subtree of a re-parented grouper: unlinks it from its old ancestors and links it under the new parent
+CREATE OR REPLACE FUNCTION grouper_closure_update()
+  RETURNS TRIGGER AS $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM grouper_closure c
+    WHERE c.ancestor_grouper_id = NEW.grouper_id AND c.descendant_grouper_id = NEW.parent_grouper_id
+  ) THEN
+    RAISE EXCEPTION 'grouper % cannot be a descendant of itself (parent_grouper_id = %)',
+      NEW.grouper_id, NEW.parent_grouper_id;
+  END IF;
+
+  DELETE FROM grouper_closure c
+  USING grouper_closure d, grouper_closure a
+  WHERE d.ancestor_grouper_id = NEW.grouper_id
+    AND a.descendant_grouper_id = NEW.grouper_id
+    AND a.ancestor_grouper_id <> NEW.grouper_id
+    AND c.ancestor_grouper_id = a.ancestor_grouper_id
+    AND c.descendant_grouper_id = d.descendant_grouper_id;
+
+  INSERT INTO grouper_closure (ancestor_grouper_id, descendant_grouper_id, depth)
+  SELECT a.ancestor_grouper_id, d.descendant_grouper_id, a.depth + d.depth + 1
+  FROM grouper_closure a
+  CROSS JOIN grouper_closure d
+  WHERE a.descendant_grouper_id = NEW.parent_grouper_id
+    AND d.ancestor_grouper_id = NEW.grouper_id;
+  RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER grouper_closure_update AFTER UPDATE OF parent_grouper_id
+ON grouper FOR EACH ROW
+WHEN (OLD.parent_grouper_id IS DISTINCT FROM NEW.parent_grouper_id)
+EXECUTE PROCEDURE grouper_closure_update();
+
 -- FIELD
 create table field (
   field_id bigserial
@@ -286,6 +365,14 @@ CREATE TRIGGER update_field_last_updated BEFORE UPDATE
 ON field FOR EACH ROW EXECUTE PROCEDURE
 update_last_updated_column();
 
+-- Fields of a grouper (e.g., for `getGrouperSubtreeFieldCounts()`)
+CREATE INDEX field_grouper_id_idx on field (grouper_id);
+
+-- Spatiotemporal overlap lookups (see `findOverlappingFields()`): geom_idx finds the geometries that intersect a
+-- boundary, and this index finds the fields on those geometries whose date range overlaps
+CREATE INDEX field_geom_id_period_idx
+  ON field USING GIST (geom_id, tsrange(date_start, date_end));
+
 -- FIELD TRIAL
 
 create table field_trial (
@@ -29,7 +29,7 @@ create table world_utm (
     raster_epsg smallint not null
 );
 
--- CREATE INDEX CONCURRENTLY world_utm_idx on world_utm using SPGIST(geom);
+CREATE INDEX world_utm_geom_idx on world_utm using GIST(geom);
 
 -- TABLE: 'raster_5km'
 create table raster_5km (
@@ -42,6 +42,25 @@ create table raster_5km (
                   default '{}'::jsonb
 );
 
+-- TABLE: 'cell'
+-- One row per valid pixel of the `raster_5km` rasters, so that a cell ID can be resolved to its raster, pixel, and
+-- centroid with an index probe instead of searching every raster (populated along with `raster_5km`)
+create table cell (
+    cell_id integer primary key,
+    world_utm_id smallint
+                 not null
+                 references world_utm(world_utm_id),
+    rast_col smallint not null,
+    rast_row smallint not null,
+    -- pixel centroid in WGS 84, rounded to 5 decimal places
+    centroid geometry(Point, 4326) not null,
+    -- IANA time zone at `centroid` (precomputed with `TimezoneFinder()`)
+    timezone text
+);
+
+CREATE INDEX cell_world_utm_id_idx on cell(world_utm_id);
+CREATE INDEX cell_centroid_idx on cell using GIST(centroid);
+
 -- create ENUM for Meteomatics parameter
 CREATE TYPE weather_parameter AS ENUM (
     PARAMETER_LIST
@@ -30,6 +30,14 @@ SQL_FNAMES = {
     "WEATHER": "schema_weather.sql",
 }
 
+# Scripts (in "_sql/migrations") that bring a schema created by an older version of its SQL file up to date; keyed by
+# migration name, with the type of schema each one applies to
+MIGRATIONS = {
+    "geom_hash": ("DEMETER", "demeter_geom_hash.sql"),
+    "grouper_closure": ("DEMETER", "demeter_grouper_closure.sql"),
+    "weather_cell": ("WEATHER", "weather_cell.sql"),
+}
+
 
 def _check_exists_schema(conn: Connection, schema_name: str) -> bool:
     """Checks to see if a schema of name `schema_name` exists in the connected db.
@@ -113,6 +121,23 @@ def _maybe_initialize_schema(
             _drop_schema(conn, schema_name)
 
     # make temporary SQL file, adjust as needed, and execute SQL
+    _run_sql_file(conn, schema_name, sql_fname, sql_function)
+
+    return True
+
+
+def _run_sql_file(
+    conn: Connection,
+    schema_name: str,
+    sql_fname: str,
+    sql_function: Callable = None,
+    on_error_stop: bool = False,
+) -> int:
+    """Runs the SQL file `sql_fname` with psql against the connected database, after formatting it with
+    `sql_function` (see `_maybe_initialize_schema()`).
+
+    If `on_error_stop` is True, psql stops at the first failed statement. Returns the exit code of psql.
+    """
     with NamedTemporaryFile() as tmp:
         with open(sql_fname, "r") as schema_f:
             schema_sql = schema_f.read()
@@ -128,10 +153,9 @@ def _maybe_initialize_schema(
         password = conn.engine.url.password
         database = conn.engine.url.database
         port = conn.engine.url.port
-        psql = f'PGPASSWORD={password} psql -h {host} -p {port} -U {username} -f "{tmp.name}" {database}'
-        subprocess.call(psql, shell=True)
-
-    return True
+        options = "-v ON_ERROR_STOP=1 " if on_error_stop else ""
+        psql = f'PGPASSWORD={password} psql -h {host} -p {port} -U {username} {options}-f "{tmp.name}" {database}'
+        return subprocess.call(psql, shell=True)
 
 
 def initialize_schema_type(
@@ -169,3 +193,43 @@ def initialize_schema_type(
         sql_function=sql_function,
         drop_existing=drop_existing,
     )
+
+
+def migrate_schema(
+    conn: Connection,
+    schema_name: str,
+    migration: str,
+    migrations: dict = MIGRATIONS,
+) -> None:
+    """Runs the migration script `migration` (see `MIGRATIONS`) on the existing schema `schema_name`.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection to demeter database where the schema exists.
+        schema_name (str): Name of the schema to migrate.
+        migration (str): Name of the migration to run; must be mapped in `migrations`.
+        migrations (dict): Mapping from migration name to (`schema_type`, SQL file name); defaults to `MIGRATIONS`.
+
+    Raises:
+        Exception: If the schema doesn't exist or the migration script fails.
+    """
+    assert (
+        migration in migrations.keys()
+    ), f"`migration` = {migration} not mapped in `migrations`. Did you add the SQL file name to `MIGRATIONS`?"
+    if not _check_exists_schema(conn, schema_name):
+        raise Exception(f"There is no schema of name {schema_name} to migrate.")
+
+    schema_type, fname = migrations[migration]
+    file_dir = realpath(join(dirname(__file__), ".."))
+    sql_fname = join(file_dir, "_sql", "migrations", fname)
+
+    returncode = _run_sql_file(
+        conn,
+        schema_name=schema_name,
+        sql_fname=sql_fname,
+        sql_function=SQL_FUNCTIONS[schema_type],
+        on_error_stop=True,
+    )
+    if returncode != 0:
+        raise Exception(
+            f"Migration {migration} of schema {schema_name} failed (psql exited with {returncode})."
+        )
@@ -7,7 +7,12 @@ from sqlalchemy.engine import Connection
 from demeter.cli import check_and_format_db_connection_args
 from demeter.db import getConnection
 
-from .initialize import SQL_FNAMES, initialize_schema_type
+from .initialize import (
+    MIGRATIONS,
+    SQL_FNAMES,
+    initialize_schema_type,
+    migrate_schema,
+)
 
 RQ_USERS = {
     "DEMETER": ("demeter_user", "demeter_ro_user"),
@@ -103,3 +108,38 @@ def run_schema_initialization(
     conn.close()
 
     return initialized
+
+
+def run_schema_migration(
+    database_host: str,
+    database_env: str,
+    schema_name: str,
+    migration: str,
+    migrations: dict = MIGRATIONS,
+) -> None:
+    """Run the `migration` script on the existing `schema_name` schema on specified DB host and environment.
+
+    Args:
+        database_host (str): Host of database to query/change; can be 'AWS' or 'LOCAL'.
+        database_env (str): Database instance to query/change; can be 'DEV' or 'PROD'.
+        schema_name (str): Name of the schema to migrate.
+        migration (str): Name of the migration to run; must be mapped in `migrations`.
+        migrations (dict): Mapping from migration name to (`schema_type`, SQL file name); defaults to `MIGRATIONS`.
+    """
+    # ensure appropriate set-up
+    database_env_name, ssh_env_name = check_and_format_db_connection_args(
+        host=database_host, env=database_env, superuser=True
+    )
+
+    # set up database connection
+    logging.info("Connecting to database: %s", database_env_name)
+    conn = getConnection(env_name=database_env_name, ssh_env_name=ssh_env_name)
+
+    logging.info("Running migration %s on schema: %s", migration, schema_name)
+    migrate_schema(
+        conn=conn,
+        schema_name=schema_name,
+        migration=migration,
+        migrations=migrations,
+    )
+    conn.close()
@@ -0,0 +1,81 @@
+"""Migrates an existing Demeter schema instance, created by an older version of its SQL file, for a given host and
+database environment.
+
+To add `geom.geom_hash` to `demeter` on local `demeter-dev`:
+python3 -m demeter_initialize.schema.migrate --database_host LOCAL --database_env DEV --migration geom_hash
+
+To add `weather.cell` on local `demeter-dev` and fill it from the existing weather grid:
+python3 -m demeter_initialize.schema.migrate --database_host LOCAL --database_env DEV --migration weather_cell
+
+For the list of migrations: python3 -m demeter_initialize.schema.migrate --help
+
+This script requires that you have the appropriate superuser credentials for the database in your .env file.
+"""
+import argparse
+
+from dotenv import load_dotenv  # type: ignore
+from utils.logging.tqdm import logging_init
+
+from .._utils.initialize import MIGRATIONS
+from .._utils.workflow import run_schema_migration
+from ..weather._populate_weather import populate_weather_cells
+
+# Data that a migration has to fill after its SQL has run
+BACKFILLS = {
+    "weather_cell": populate_weather_cells,
+}
+
+if __name__ == "__main__":
+    c = load_dotenv()
+    logging_init()  # enables tqdm progress bar to work with logging
+
+    parser = argparse.ArgumentParser(description="Migrate Demeter instance.")
+
+    parser.add_argument(
+        "--database_host",
+        type=str,
+        help="Host of database to query/change; can be 'AWS' or 'LOCAL'.",
+        default="LOCAL",
+    )
+
+    parser.add_argument(
+        "--database_env",
+        type=str,
+        help="Database instance to query/change; can be 'DEV' or 'PROD'.",
+        default="DEV",
+    )
+
+    parser.add_argument(
+        "--migration",
+        type=str,
+        help="Migration to run.",
+        choices=sorted(MIGRATIONS.keys()),
+        required=True,
+    )
+
+    parser.add_argument(
+        "--schema_name",
+        type=str,
+        help="Name of the schema to migrate; defaults to 'demeter' or 'weather', depending on the migration.",
+        default=None,
+    )
+
+    # set up args
+    args = parser.parse_args()
+    migration = args.migration
+    schema_name = args.schema_name
+    if schema_name is None:
+        schema_name = MIGRATIONS[migration][0].lower()
+
+    run_schema_migration(
+        database_host=args.database_host,
+        database_env=args.database_env,
+        schema_name=schema_name,
+        migration=migration,
+        migrations=MIGRATIONS,
+    )
+
+    if migration in BACKFILLS:
+        BACKFILLS[migration](
+            database_host=args.database_host, database_env=args.database_env
+        )
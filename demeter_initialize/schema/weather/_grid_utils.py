@@ -5,7 +5,11 @@ import subprocess
 from datetime import timezone
 from os.path import isfile
 from tempfile import NamedTemporaryFile
-from typing import Any, Tuple
+from typing import (
+    Any,
+    Optional,
+    Tuple,
+)
 
 from geo_utils.general import estimate_utm_crs, hemisphere_from_centroid
 from geo_utils.raster import build_transform_utm, create_array_skeleton
@@ -26,6 +30,8 @@ from rasterio.profiles import DefaultGTiffProfile
 from shapely.geometry import Polygon
 from sqlalchemy.engine import Connection
 
+from demeter.weather.utils.time import tzf
+
 
 def determine_raster_origin(
     geometry_dd: Polygon,
@@ -346,3 +352,50 @@ def add_rast_metadata(cursor: Any, raster_5km_id: int, profile: dict) -> None:
         "profile": profile_json,
     }
     cursor.execute(stmt, args)
+
+
+def insert_cells(cursor: Any, world_utm_id: Optional[int] = None) -> None:
+    """Insert a weather.cell row for each valid pixel of the raster of `world_utm_id` (or of every raster if None).
+
+    Cells that already exist are skipped, so this can also be used to fill `cell` for an existing weather grid.
+    """
+    stmt = """
+    insert into cell(cell_id, world_utm_id, rast_col, rast_row, centroid)
+    select P.val::integer, R.world_utm_id, P.x, P.y,
+        ST_Point(ROUND(ST_X(C.point)::numeric, 5), ROUND(ST_Y(C.point)::numeric, 5), 4326)
+    from raster_5km R
+    cross join lateral ST_PixelAsCentroids(R.rast_cell_id, 1, true) P
+    cross join lateral ST_Transform(P.geom, 4326) C(point)
+    where (%(world_utm_id)s::smallint is null or R.world_utm_id = %(world_utm_id)s::smallint)
+    and P.val > 0
+    on conflict (cell_id) do nothing
+    """
+    args = {"world_utm_id": world_utm_id}
+    cursor.execute(stmt, args)
+
+
+def insert_cell_timezones(cursor: Any, world_utm_id: Optional[int] = None) -> None:
+    """Fill weather.cell.timezone for the cells of `world_utm_id` (or of every raster if None) that don't have one.
+
+    Time zones are looked up once per cell centroid here, so that `timezones_for_points()` is a join on `cell`.
+    """
+    stmt = """
+    select cell_id, ST_X(centroid) as lng, ST_Y(centroid) as lat
+    from cell
+    where (%(world_utm_id)s::smallint is null or world_utm_id = %(world_utm_id)s::smallint)
+    and timezone is null
+    """
+    cursor.execute(stmt, {"world_utm_id": world_utm_id})
+    cells = cursor.fetchall()
+
+    stmt = """
+    update cell
+    set timezone = u.timezone
+    from unnest(%(cell_ids)s::integer[], %(timezones)s::text[]) as u(cell_id, timezone)
+    where cell.cell_id = u.cell_id
+    """
+    args = {
+        "cell_ids": [int(c[0]) for c in cells],
+        "timezones": [tzf.timezone_at(lng=c[1], lat=c[2]) for c in cells],
+    }
+    cursor.execute(stmt, args)
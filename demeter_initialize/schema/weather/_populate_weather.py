@@ -24,6 +24,8 @@ from ._grid_utils import (
     add_rast_metadata,
     add_raster,
     create_raster_for_utm_polygon,
+    insert_cell_timezones,
+    insert_cells,
     insert_utm_polygon,
 )
 
@@ -98,11 +100,51 @@ def _populate_weather_grid(conn: Connection):
             # add raster metadata
             add_rast_metadata(cursor, raster_5km_id, profile)
 
+            # add a `cell` row for each valid pixel of the raster
+            insert_cells(cursor, raster_5km_id)
+            insert_cell_timezones(cursor, raster_5km_id)
+
             raster_5km_id += 1
 
             conn.connection.commit()
 
 
+def _populate_weather_cells(conn: Connection):
+    """Fill `cell` (and its time zones) for a weather grid that was populated before the table existed.
+
+    Cells are added one raster at a time, committing after each, and rasters whose cells are already there are
+    skipped, so an interrupted backfill can be re-run.
+    """
+    with conn.connection.cursor() as cursor:
+        cursor.execute("select world_utm_id from raster_5km order by world_utm_id")
+        world_utm_ids = [int(r[0]) for r in cursor.fetchall()]
+
+        for world_utm_id in world_utm_ids:
+            logging.info("Adding cells of world_utm_id %s", world_utm_id)
+            insert_cells(cursor, world_utm_id)
+            insert_cell_timezones(cursor, world_utm_id)
+            conn.connection.commit()
+
+
+def populate_weather_cells(database_host: str, database_env: str):
+    """Main function for filling `cell` from an existing weather grid (see the "weather_cell" migration).
+
+    Args:
+        database_host (str): Host of database to query/change; can be 'AWS' or 'LOCAL'.
+        database_env (str): Database instance to query/change; can be 'DEV' or 'PROD'.
+    """
+
+    # ensure appropriate set-up
+    database_env_name, ssh_env_name = check_and_format_db_connection_args(
+        host=database_host, env=database_env, superuser=True
+    )
+
+    logging.info("Populating weather cells")
+    conn = getConnection(env_name=database_env_name, ssh_env_name=ssh_env_name)
+    _populate_weather_cells(conn=conn)
+    conn.close()
+
+
 def populate_weather(database_host: str, database_env: str):
     """Main function for populating weather grid.
 
@@ -6,20 +6,11 @@ from typing import (
     Sequence,
 )
 
-from joblib import Memory  # type: ignore
-
 from demeter.data import Field
 from demeter.db import TableId
 
 from ..summary import Summary
 
-# TODO:  Support joblib from command-line
-# from joblib import Memory as cache
-
-# TODO: CLI arg
-location = "/tmp/demeter/"
-memory = Memory(location, verbose=0)
-
 
 @dataclass(frozen=True)
 class FieldGroupSummary(Summary):
@@ -40,89 +31,57 @@ class FieldGroupSummary(Summary):
     field_count: int
 
 
-@memory.cache(ignore=["cursor"])  # type: ignore
 def getFieldGroupSummaries(
     cursor: Any,
 ) -> Dict[TableId, FieldGroupSummary]:
+    # Depths, children and subtree counts all come from grouper_closure (see schema_demeter.sql), so this is a set of
+    # index lookups per grouper rather than a recursive walk of the whole hierarchy
     stmt = """
-  with recursive descendent as (
-    select *,
-           0 as depth
-    from test_demeter.grouper G
-    where parent_grouper_id is null
-    UNION ALL
-    select G.*,
-           depth + 1
-    from descendent D
-    join test_demeter.grouper G on D.grouper_id = G.parent_grouper_id
-
-  ), fields as (
-    select D.grouper_id,
-           coalesce(
+  select G.grouper_id,
+         G.parent_grouper_id,
+         G.name,
+         G.details->>'external_id' as external_id,
+         A.depth,
+         F.fields,
+         children.grouper_ids,
+         S.total_group_count,
+         jsonb_array_length(children.grouper_ids) as group_count,
+         S.total_field_count,
+         F.field_count
+  from grouper G
+  cross join lateral (
+    select max(C.depth) as depth
+    from grouper_closure C
+    where C.descendant_grouper_id = G.grouper_id
+  ) A
+  cross join lateral (
+    select coalesce(jsonb_agg(C.descendant_grouper_id), '[]') as grouper_ids
+    from grouper_closure C
+    where C.ancestor_grouper_id = G.grouper_id and C.depth = 1
+  ) children
+  cross join lateral (
+    select count(distinct C.descendant_grouper_id) as total_group_count,
+           count(F.field_id) as total_field_count
+    from grouper_closure C
+    left join field F on F.grouper_id = C.descendant_grouper_id
+    where C.ancestor_grouper_id = G.grouper_id
+  ) S
+  cross join lateral (
+    select coalesce(
              jsonb_agg(to_jsonb(F.*))
                filter
                (where F.field_id is not null),
              '[]'
-           ) as fields
-    from descendent D
-    left join test_demeter.field F on D.grouper_id = F.grouper_id
-    group by D.grouper_id
-
-  ), ancestor_counts as (
-    select D.grouper_id as ancestor_grouper_id,
-           D.parent_grouper_id,
-           D.grouper_id,
-           jsonb_array_length(F.fields) as field_count
-    from descendent D
-    join fields F on D.grouper_id = F.grouper_id
-    where not exists (
-      select *
-      from descendent D2
-      where D2.parent_grouper_id = D.grouper_id
-    )
-    UNION ALL
-    select D.parent_grouper_id as ancestor_grouper_id,
-           D.parent_grouper_id,
-           D.grouper_id,
-           AC.field_count
-           from ancestor_counts AC
-           join descendent D on AC.ancestor_grouper_id = D.grouper_id
-           join fields F on D.grouper_id = F.grouper_id
-  ), aggregate_counts as (
-    select ancestor_grouper_id as grouper_id,
-           sum(AC.field_count) filter (where ancestor_grouper_id = grouper_id) as field_count,
-
-           sum(field_count) as total_field_count,
-           count(*) as total_group_count
-    from ancestor_counts AC
-    group by ancestor_grouper_id
-
-  ) select D.*,
-           F.fields as fields,
-           grouper_ids,
-           AC.total_group_count,
-           jsonb_array_length(grouper_ids) as group_count,
-           AC.total_field_count,
-           AC.field_count as field_count
-    from descendent D
-    join aggregate_counts AC on D.grouper_id = AC.grouper_id
-    join fields F on D.grouper_id = F.grouper_id
-    left join lateral (
-      select coalesce(
-               jsonb_agg(D2.grouper_id)
-                 filter
-                 (where D2.grouper_id is not null),
-              '[]'
-             ) as grouper_ids
-      from descendent D2
-      where D.grouper_id = D2.parent_grouper_id
-      group by D.grouper_id
-    ) children on true
-    order by depth asc,
-             AC.total_group_count,
-             group_count,
-             AC.total_field_count,
-             AC.field_count
+           ) as fields,
+           count(F.field_id) as field_count
+    from field F
+    where F.grouper_id = G.grouper_id
+  ) F
+  order by A.depth asc,
+           S.total_group_count,
+           group_count,
+           S.total_field_count,
+           F.field_count
   """
     cursor.execute(stmt)
     results = cursor.fetchall()